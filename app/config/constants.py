@@ -1,13 +1,93 @@
+import os
 from typing import Final
 #定数クラス
 
 class GSIAPI:
-    BASE_URL:Final[str] = "https://msearch.gsi.go.jp"
+    #検証環境などでスタブサーバーに向ける場合は環境変数で上書き
+    BASE_URL:Final[str] = os.getenv("GSI_BASE_URL", "https://msearch.gsi.go.jp")
     ADDRESS_SEARCH: Final[str] = f"{BASE_URL}/address-search/AddressSearch"
     TIMEOUT: Final[str] = 10
+    #接続プール(同時接続数、keep-aliveで保持する接続数と保持秒数)
+    MAX_CONNECTIONS: Final[int] = 20
+    MAX_KEEPALIVE_CONNECTIONS: Final[int] = 10
+    KEEPALIVE_EXPIRY: Final[float] = 30
+    #一時的なエラー(接続失敗、429、5xx)のリトライ回数とバックオフ秒数
+    MAX_RETRIES: Final[int] = 2
+    BACKOFF_BASE: Final[float] = 0.2
+    BACKOFF_MAX: Final[float] = 2
+    RETRY_STATUS_CODES: Final[frozenset] = frozenset({429, 500, 502, 503, 504})
+    #サーキットブレーカー(連続失敗回数、遮断する秒数)
+    FAILURE_THRESHOLD: Final[int] = 5
+    RESET_TIMEOUT: Final[float] = 30
+
+class Geocoding:
+    #メモリ上にキャッシュする住所の件数
+    MEMORY_CACHE_SIZE: Final[int] = 10000
+    #住所が見つかった場合の有効期限(秒)
+    FOUND_TTL: Final[int] = 30 * 24 * 60 * 60
+    #住所が見つからなかった場合の有効期限(秒)
+    NOT_FOUND_TTL: Final[int] = 24 * 60 * 60
+
+class GeocodeStatus:
+    PENDING: Final[str] = "pending"
+    RESOLVED: Final[str] = "resolved"
+    FAILED: Final[str] = "failed"
+
+class GeocodeWorker:
+    #同時に処理するワーカー数
+    CONCURRENCY: Final[int] = 4
+    QUEUE_SIZE: Final[int] = 10000
+    #一時的なエラーの場合の最大試行回数とリトライ間隔(秒)
+    MAX_ATTEMPTS: Final[int] = 5
+    RETRY_BASE: Final[float] = 10
+    RETRY_MAX: Final[float] = 600
+
+class StoreImport:
+    #アップロードされたCSVをCOPYに渡す単位(バイト)
+    CHUNK_SIZE: Final[int] = 1024 * 1024
+    #CLIでジオコーディングする場合の同時実行数
+    GEOCODE_CONCURRENCY: Final[int] = 8
+
+class StoreBatch:
+    #1リクエストで登録できる店舗数
+    MAX_SIZE: Final[int] = 1000
+
+class Export:
+    #サーバーサイドカーソルから1回に取得する件数
+    YIELD_PER: Final[int] = 1000
+
+class Cluster:
+    #クラスタのセルはズームレベル+GRID_OFFSETのタイル(1タイルを8x8に分割)
+    GRID_OFFSET: Final[int] = 3
+    MAX_ZOOM: Final[int] = 20
+    #1リクエストで集計できる最大セル数
+    MAX_CELLS: Final[int] = 10000
+    CACHE_SIZE: Final[int] = 200000
+
+class Tile:
+    MAX_ZOOM: Final[int] = 22
+    EXTENT: Final[int] = 4096
+    LAYER_NAME: Final[str] = "stores"
+    CACHE_SIZE: Final[int] = 10000
+    #CDN・ブラウザでのキャッシュ秒数
+    CACHE_MAX_AGE: Final[int] = 60
+    MEDIA_TYPE: Final[str] = "application/vnd.mapbox-vector-tile"
+
+class ResponseCache:
+    #店舗一覧(検索条件毎)のキャッシュ件数
+    STORES_SIZE: Final[int] = 1000
+    #店舗詳細のキャッシュ件数
+    STORE_SIZE: Final[int] = 10000
+    #有効期限(秒)
+    TTL: Final[int] = 300
+
+class TagCache:
+    #メモリ上に保持するタグ名(タグ名 -> タグのPK)の件数
+    SIZE: Final[int] = 10000
 
 class EndPoints:
     STORES:Final[str] = "/stores"
+    METRICS:Final[str] = "/metrics"
 
 class HttpMethod:
     GET:Final[str] = "GET"
@@ -7,11 +7,29 @@ from fastapi.exceptions import RequestValidationError
 from starlette.middleware.cors import CORSMiddleware
 
 from app.middleware.auth import AuthMiddleware
-from app.routers import stores
+from app.routers import metrics, stores
+from app.services.geocode_worker import (start_geocode_worker,
+                                         stop_geocode_worker)
+from app.services.gsi_api import close_http_client, get_http_client
 from app.utils import translation
 from config.logging_config import setup_logger
+from database import dispose_engine, get_async_engine
 
-app =FastAPI(dependencies=[Depends(translation.get_locale)])
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    #起動時にDBエンジン(コネクションプール)と国土地理院API用のHTTPクライアントを生成
+    get_async_engine()
+    get_http_client()
+    #ジオコーディングのワーカーを起動
+    await start_geocode_worker()
+    yield
+    #終了時にワーカーを停止し、プール内の接続を破棄
+    await stop_geocode_worker()
+    await close_http_client()
+    await dispose_engine()
+
+app =FastAPI(lifespan=lifespan, dependencies=[Depends(translation.get_locale)])
 
 #バリデーションチェックエラーを日本語化
 app.add_exception_handler(
@@ -28,6 +46,7 @@ app.add_middleware(
 )
 
 app.include_router(stores.router)
+app.include_router(metrics.router)
 
 #ミドルウェア
 app.add_middleware(AuthMiddleware)
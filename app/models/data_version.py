@@ -0,0 +1,13 @@
+from sqlalchemy import BigInteger, Column, String, TIMESTAMP
+from sqlalchemy.sql import func
+from database import Base
+
+
+# データの変更回数(条件付きGETのETag用)
+# 対象テーブルへの書き込み毎にトリガーで加算する(db/create.sql)
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, server_default="0")
+    updated_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
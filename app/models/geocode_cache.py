@@ -0,0 +1,17 @@
+from sqlalchemy import Boolean, Column, String, TIMESTAMP
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION
+from sqlalchemy.sql import func
+from database import Base
+
+
+# 住所ジオコーディング結果のキャッシュ
+class GeocodeCache(Base):
+    __tablename__ = "geocode_cache"
+
+    address_key = Column(String(200), primary_key=True)
+    found = Column(Boolean, nullable=False)
+    lat = Column(DOUBLE_PRECISION, nullable=True)
+    lng = Column(DOUBLE_PRECISION, nullable=True)
+    expires_at = Column(TIMESTAMP, nullable=False, index=True)
+    created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
+    updated_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
@@ -1,6 +1,6 @@
 import uuid
-from sqlalchemy import Column, Integer, String, TIMESTAMP, ForeignKey, UniqueConstraint, Table
-from sqlalchemy.dialects.postgresql import UUID, DOUBLE_PRECISION
+from sqlalchemy import Column, Integer, String, TIMESTAMP, ForeignKey, UniqueConstraint, Table, Index, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, DOUBLE_PRECISION
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.models.stores_tags_table import stores_tags_table
@@ -8,16 +8,53 @@ from database import Base
 
 class Store(Base):
     __tablename__ = "stores"
+    __table_args__ = (
+        # 表示範囲(緯度経度)検索用
+        Index("ix_stores_lat_lng", "lat", "lng"),
+        # 起動時にジオコーディング処理待ちの店舗を取得する用
+        Index(
+            "ix_stores_geocode_pending",
+            "id",
+            postgresql_where=text("geocode_status = 'pending'"),
+        ),
+        # 店舗名の部分一致検索用(pg_trgm拡張)
+        Index(
+            "ix_stores_store_name_trgm",
+            "store_name",
+            postgresql_using="gin",
+            postgresql_ops={"store_name": "gin_trgm_ops"},
+        ),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     store_id = Column(UUID(as_uuid=True), unique=True, nullable=False, default=uuid.uuid4)
     store_name = Column(String(100), nullable=False)
     address = Column(String(100), nullable=False)
     content = Column(String(100), nullable=False)
-    lat = Column(DOUBLE_PRECISION, nullable=False)
-    lng = Column(DOUBLE_PRECISION, nullable=False)
+    # 住所のジオコーディングが完了するまではNULL
+    lat = Column(DOUBLE_PRECISION, nullable=True)
+    lng = Column(DOUBLE_PRECISION, nullable=True)
+    # ジオコーディングの状態(pending: 処理待ち, resolved: 完了, failed: 失敗)
+    geocode_status = Column(String(20), nullable=False, server_default="resolved")
+    geocode_attempts = Column(Integer, nullable=False, server_default="0")
+    geocode_error = Column(String(200), nullable=True)
+    # 紐づくタグ名(タグ名順)。一覧・詳細で中間テーブルを結合・集約しないための非正規化カラム
+    # 中間テーブル、タグ名の変更時にトリガーで更新する(db/create.sql)
+    tag_names = Column("tags", ARRAY(String(100)), nullable=False, server_default=text("'{}'"))
     created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
-    updated_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
+    # 更新時(ジオコーディング結果の反映を含む)に現在日時を設定する
+    updated_at = Column(TIMESTAMP, nullable=False, server_default=func.now(), onupdate=func.now())
 
     # Tagオブジェクトとの多対多リレーション
-    tags = relationship("Tag", secondary=stores_tags_table, back_populates="stores")
\ No newline at end of file
+    tags = relationship("Tag", secondary=stores_tags_table, back_populates="stores")
+
+
+# タグによる店舗の絞り込み(@>, &&)用
+Index("ix_stores_tags", Store.tag_names, postgresql_using="gin")
+
+# 近傍検索(earthdistance拡張のKNN検索)用
+Index(
+    "ix_stores_earth",
+    func.ll_to_earth(Store.lat, Store.lng),
+    postgresql_using="gist",
+)
@@ -10,9 +10,10 @@ from database import Base
 class Tag(Base):
     __tablename__ = "tags"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     tag_id = Column(UUID(as_uuid=True), unique=True, nullable=False, default=uuid.uuid4)
-    tag_name = Column(String(100), nullable=False)
+    # 同時登録で同名のタグが重複しないよう一意とする
+    tag_name = Column(String(100), unique=True, nullable=False)
     created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
     updated_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
 
@@ -0,0 +1,349 @@
+import math
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import Delete, Integer, Select, cast, delete, func, select
+
+from app.models.store import Store
+from app.models.stores_tags_table import stores_tags_table
+from app.utils.geo import MAX_MERCATOR_LAT, BoundingBox
+
+
+def tags_column():
+    """
+    店舗に紐づくタグ名の配列(タグ名順、タグなしの場合は空配列)
+    中間テーブルを結合・集約せず、トリガーで更新しているstores.tagsを使用する
+    """
+    return Store.tag_names.label("tags")
+
+
+def bounding_box_conditions(bbox: Optional[BoundingBox]) -> list:
+    """
+    緯度経度の範囲条件を作成する(ix_stores_lat_lngを使用)
+    """
+    if bbox is None:
+        return []
+
+    conditions = []
+    if bbox.min_lat is not None:
+        conditions.append(Store.lat >= bbox.min_lat)
+    if bbox.max_lat is not None:
+        conditions.append(Store.lat <= bbox.max_lat)
+    if bbox.min_lng is not None:
+        conditions.append(Store.lng >= bbox.min_lng)
+    if bbox.max_lng is not None:
+        conditions.append(Store.lng <= bbox.max_lng)
+    return conditions
+
+
+def escape_like(value: str, escape: str = "\\") -> str:
+    """
+    LIKE検索のワイルドカード(%, _)をエスケープする
+    """
+    return (
+        value.replace(escape, escape * 2)
+        .replace("%", f"{escape}%")
+        .replace("_", f"{escape}_")
+    )
+
+
+def store_name_contains(serach_name: str):
+    """
+    店舗名の部分一致条件(ix_stores_store_name_trgmを使用)
+    """
+    return Store.store_name.ilike(f"%{escape_like(serach_name)}%", escape="\\")
+
+
+def tag_condition(tag_names: List[str], match_all: bool):
+    """
+    タグで絞り込む条件を作成する(ix_stores_tagsを使用)
+
+    Args:
+        tag_names (List[str]): タグ名
+        match_all (bool): 全てのタグを持つ店舗に絞り込むか(Falseの場合はいずれか)
+
+    Returns:
+        全て含む場合は@>、いずれかを含む場合は&&の条件
+    """
+    tag_names = sorted(set(tag_names))
+    if match_all:
+        return Store.tag_names.contains(tag_names)
+    return Store.tag_names.overlap(tag_names)
+
+
+def select_stores_stmt(
+    serach_name: Optional[str] = None,
+    tag_names: Optional[List[str]] = None,
+    match_all: bool = True,
+    bbox: Optional[BoundingBox] = None,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None,
+    order_by_similarity: bool = False,
+) -> Select:
+    """
+    店舗一覧取得のSQLを作成する
+    ページングはStore.idによるキーセット方式(OFFSETを使わない)
+
+    Args:
+        serach_name (Optional[str]): 検索文字
+        tag_names (Optional[List[str]]): タグ名
+        match_all (bool): 全てのタグを持つ店舗に絞り込むか(Falseの場合はいずれか)
+        bbox (Optional[BoundingBox]): 表示範囲
+        after_id (Optional[int]): 前ページ最後の店舗のID
+        limit (Optional[int]): 取得件数
+        order_by_similarity (bool): 検索文字との類似度が高い順に並べるか
+
+    Returns:
+        Select: 店舗一覧取得のSQL
+    """
+    stmt = (
+        select(
+            Store.id,
+            Store.store_id,
+            Store.store_name,
+            Store.address,
+            Store.content,
+            Store.lat,
+            Store.lng,
+            tags_column(),
+        )
+    )
+
+    # 検索条件リスト
+    conditions: List = []
+
+    # 検索文字あり
+    if serach_name:
+        conditions.append(store_name_contains(serach_name))
+
+    if tag_names:
+        conditions.append(tag_condition(tag_names, match_all))
+
+    # 表示範囲あり
+    conditions.extend(bounding_box_conditions(bbox))
+
+    # 前ページの続きから取得
+    if after_id is not None:
+        conditions.append(Store.id > after_id)
+
+    # 検索条件が指定されている場合、where句に条件を追加
+    if conditions:
+        stmt = stmt.where(*conditions)
+
+    if order_by_similarity and serach_name:
+        stmt = stmt.order_by(
+            func.similarity(Store.store_name, serach_name).desc(), Store.id.asc()
+        )
+    else:
+        stmt = stmt.order_by(Store.id.asc())
+
+    if limit is not None:
+        stmt = stmt.limit(limit)
+
+    return stmt
+
+
+def select_export_stores_stmt() -> Select:
+    """
+    全店舗をエクスポートするSQLを作成する
+    集約を行わず、主キー順に先頭から逐次返せるようにする
+
+    Returns:
+        Select: 店舗エクスポートのSQL
+    """
+    return select(
+        Store.store_id,
+        Store.store_name,
+        Store.address,
+        Store.content,
+        Store.lat,
+        Store.lng,
+        tags_column(),
+        Store.created_at,
+        Store.updated_at,
+    ).order_by(Store.id.asc())
+
+
+def select_store_stmt(store_id: UUID) -> Select:
+    """
+    店舗取得のSQLを作成する
+
+    Args:
+        store_id (UUID): 店舗ID
+
+    Returns:
+        Select: 店舗取得のSQL
+    """
+    return select(
+        Store.store_id,
+        Store.store_name,
+        Store.address,
+        Store.content,
+        Store.lat,
+        Store.lng,
+        tags_column(),
+    ).where(Store.store_id == store_id)
+
+
+
+def select_store_for_delete_stmt(store_id: UUID) -> Select:
+    """
+    削除する店舗のIDと緯度経度を取得するSQLを作成する(stores_store_id_keyを使用)
+
+    Args:
+        store_id (UUID): 店舗ID
+
+    Returns:
+        Select: 店舗取得のSQL
+    """
+    return select(Store.id, Store.lat, Store.lng).where(Store.store_id == store_id)
+
+
+def delete_store_tags_stmt(store_pk: int) -> Delete:
+    """
+    店舗に紐づく中間テーブルを削除するSQLを作成する(uq_store_tagの先頭列を使用)
+
+    Args:
+        store_pk (int): 店舗の主キー
+
+    Returns:
+        Delete: 中間テーブル削除のSQL
+    """
+    return delete(stores_tags_table).where(stores_tags_table.c.store_id == store_pk)
+
+
+def delete_store_stmt(store_id: UUID) -> Delete:
+    """
+    店舗を削除するSQLを作成する
+
+    Args:
+        store_id (UUID): 店舗ID
+
+    Returns:
+        Delete: 店舗削除のSQL
+    """
+    return delete(Store).where(Store.store_id == store_id)
+
+def select_nearby_stores_stmt(
+    lat: float,
+    lng: float,
+    limit: int,
+    radius_m: Optional[float] = None,
+) -> Select:
+    """
+    指定地点から近い順に店舗を取得するSQLを作成する
+    ix_stores_earth(GiST)によるKNN検索で上位limit件に絞り込む
+
+    Args:
+        lat (float): 緯度
+        lng (float): 経度
+        limit (int): 取得件数
+        radius_m (Optional[float]): 検索半径(メートル)
+
+    Returns:
+        Select: 近傍店舗取得のSQL
+    """
+    origin = func.ll_to_earth(lat, lng)
+    store_point = func.ll_to_earth(Store.lat, Store.lng)
+    distance = func.earth_distance(store_point, origin)
+
+    nearest = (
+        select(Store.id, distance.label("distance_m"))
+        # ジオコーディング未完了の店舗は除く
+        .where(Store.lat.isnot(None))
+        .order_by(store_point.op("<->")(origin))
+        .limit(limit)
+    )
+
+    # 検索半径あり(earth_boxで索引を使って絞り込み、earth_distanceで厳密に判定)
+    if radius_m is not None:
+        nearest = nearest.where(
+            func.earth_box(origin, radius_m).op("@>")(store_point),
+            distance <= radius_m,
+        )
+
+    nearest = nearest.subquery("nearest")
+
+    return (
+        select(
+            Store.store_id,
+            Store.store_name,
+            Store.address,
+            Store.content,
+            Store.lat,
+            Store.lng,
+            tags_column(),
+            nearest.c.distance_m,
+        )
+        .join(nearest, nearest.c.id == Store.id)
+        .order_by(nearest.c.distance_m.asc(), Store.id.asc())
+    )
+
+
+def tile_x_column(zoom: int):
+    """
+    経度から指定ズームのタイルX座標を求めるカラム
+    """
+    n = float(2 ** zoom)
+    return cast(func.floor((Store.lng + 180.0) / 360.0 * n), Integer)
+
+
+def tile_y_column(zoom: int):
+    """
+    緯度から指定ズームのタイルY座標を求めるカラム(北が0)
+    """
+    n = float(2 ** zoom)
+    lat = func.greatest(func.least(Store.lat, MAX_MERCATOR_LAT), -MAX_MERCATOR_LAT)
+    return cast(
+        func.floor((1.0 - func.asinh(func.tan(func.radians(lat))) / math.pi) / 2.0 * n),
+        Integer,
+    )
+
+
+def select_store_clusters_stmt(cell_zoom: int, bbox: BoundingBox) -> Select:
+    """
+    範囲内の店舗をセル(タイル)単位に集計するSQLを作成する
+
+    Args:
+        cell_zoom (int): セルとするタイルのズームレベル
+        bbox (BoundingBox): 集計範囲
+
+    Returns:
+        Select: セル毎の件数と重心を取得するSQL
+    """
+    cell_x = tile_x_column(cell_zoom).label("x")
+    cell_y = tile_y_column(cell_zoom).label("y")
+    return (
+        select(
+            cell_x,
+            cell_y,
+            func.count().label("count"),
+            func.avg(Store.lat).label("lat"),
+            func.avg(Store.lng).label("lng"),
+        )
+        .where(*bounding_box_conditions(bbox))
+        .group_by(cell_x, cell_y)
+    )
+
+
+def select_tile_stores_stmt(bbox: BoundingBox) -> Select:
+    """
+    タイル範囲内の店舗(店舗ID、店舗名、タグ)を取得するSQLを作成する
+
+    Args:
+        bbox (BoundingBox): タイルの範囲
+
+    Returns:
+        Select: タイル内店舗取得のSQL
+    """
+    return (
+        select(
+            Store.store_id,
+            Store.store_name,
+            Store.lat,
+            Store.lng,
+            tags_column(),
+        )
+        .where(*bounding_box_conditions(bbox))
+        .order_by(Store.id.asc())
+    )
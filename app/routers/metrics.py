@@ -0,0 +1,67 @@
+from logging import getLogger
+from typing import Dict
+
+import humps
+from fastapi import APIRouter
+
+from app.config.constants import EndPoints
+from app.schemas.metrics import (CacheStatsResponse, DBPoolsStatusResponse,
+                                 GeocodingStatsResponse, GSIStatsResponse)
+from app.services.geocode_worker import geocode_worker_stats
+from app.services.geocoding import geocoding_stats
+from app.services.gsi_api import gsi_stats
+from app.services.store_events import cache_stats
+from database import get_pool_status
+
+router = APIRouter(prefix=EndPoints.METRICS, tags=["metrics"])
+
+logger = getLogger("app")
+
+
+# GETでコネクションプールの使用状況を取得
+@router.get("/db", response_model=DBPoolsStatusResponse)
+def read_db_pool_status():
+    """
+    コネクションプールの使用状況を取得する
+
+    Returns:
+        _type_: コネクションプール使用状況レスポンスモデル
+    """
+    return humps.camelize(get_pool_status())
+
+
+# GETでキャッシュの統計情報を取得
+@router.get("/cache", response_model=Dict[str, CacheStatsResponse])
+def read_cache_stats():
+    """
+    店舗関連キャッシュのヒット・ミス・追い出し件数を取得する
+
+    Returns:
+        _type_: キャッシュ名毎のキャッシュ統計レスポンスモデル
+    """
+    return cache_stats()
+
+
+# GETで国土地理院APIの呼び出し状況を取得
+@router.get("/gsi", response_model=GSIStatsResponse)
+def read_gsi_stats():
+    """
+    国土地理院APIのサーキットブレーカーの状態とリトライ回数を取得する
+
+    Returns:
+        _type_: 国土地理院API呼び出し状況レスポンスモデル
+    """
+    return gsi_stats()
+
+
+# GETでジオコーディングの状況を取得
+@router.get("/geocoding", response_model=GeocodingStatsResponse)
+def read_geocoding_stats():
+    """
+    同じ住所の同時リクエストを相乗りさせた回数、キャッシュの統計情報、
+    バックグラウンド処理の待ち件数を取得する
+
+    Returns:
+        _type_: ジオコーディング状況レスポンスモデル
+    """
+    return {**geocoding_stats(), **geocode_worker_stats()}
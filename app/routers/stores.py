@@ -1,90 +1,278 @@
 import uuid
 from logging import getLogger
-from typing import List, Union
+from typing import Dict, List, Optional, Union
 from uuid import UUID
 
 import humps
-from fastapi import (APIRouter, Depends, HTTPException, Query, Request,
-                     Response, status)
-from sqlalchemy import asc, delete, desc, func, insert, literal, select, update
-from sqlalchemy.orm import Session
-
-from app.config.constants import GSIAPI, EndPoints
+from fastapi import (APIRouter, Depends, File, HTTPException, Path, Query,
+                     Request, Response, UploadFile, status)
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import constr
+from sqlalchemy import asc, desc, func, insert, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.constants import (Cluster, EndPoints, GeocodeStatus,
+                                  StoreBatch, StoreImport, Tile)
 from app.models.store import Store
 from app.models.stores_tags_table import stores_tags_table
 from app.models.tag import Tag
-from app.schemas.stores import (StoreCreateRequest, StoreResponse,
+from app.queries.stores import (delete_store_stmt, delete_store_tags_stmt,
+                                select_nearby_stores_stmt,
+                                select_store_for_delete_stmt, select_store_stmt,
+                                select_stores_stmt)
+from app.schemas.stores import (ClustersResponse, NearbyStoresResponse,
+                                StoreCreateRequest, StoreGeocodeResponse,
+                                StoreImportResponse, StoreResponse,
                                 StoresResponse, StoreUpdateRequest)
-from app.services.gsi_api import fetch_coordinates_from_gsi
-from app.utils.db_exceptions import handle_db_exception
+from app.services.data_version import get_validators
+from app.services.geocode_worker import enqueue_geocode
+from app.services.store_cache import (cache_response, current_generation,
+                                      store_cache, stores_cache)
+from app.services.store_batch import create_stores
+from app.services.store_clusters import cell_range, get_clusters
+from app.services.store_events import clear_store_caches, store_changed
+from app.services.store_export import EXPORT_FORMATS, stream_stores
+from app.services.store_import import import_stores
+from app.services.store_tiles import get_tile, validate_tile
+from app.services.store_update import update_store_and_tags
+from app.services.tags import cache_tag_ids, resolve_tag_ids
+from app.utils.conditional import (Validators, is_not_modified,
+                                   not_modified_response, validator_headers)
+from app.utils.cursor import decode_cursor, encode_cursor, filter_fingerprint
+from app.utils.db_exceptions import handle_db_exception, is_data_exception
+from app.utils.geo import BoundingBox, parse_bbox, validate_bounding_box
+from app.utils.geojson import feature_collection, point_feature
+from app.utils.json_response import (JSON_MEDIA_TYPE, dumps, json_response,
+                                     rows_to_dicts)
 from config.logging_config import setup_logger
-from database import get_db
+from database import get_async_db
 
 router = APIRouter(prefix=EndPoints.STORES, tags=["stores"])
 
+# 店舗レスポンスのカラム(StoreResponseの項目順)
+STORE_FIELDS = tuple(humps.decamelize(field) for field in StoreResponse.__fields__)
+
+GEOJSON_MEDIA_TYPE = "application/geo+json"
+
 logger = getLogger("app")
 
 
 # GETで店舗一覧を取得
 @router.get("/", response_model=StoresResponse)
-def read_stores(
+async def read_stores(
+    request: Request,
     serach_name: Union[str] = Query(None, max_length=100),
     tag_name: Union[str] = Query(None, max_length=100),
-    db: Session = Depends(get_db),
+    tags: Optional[List[constr(max_length=100)]] = Query(None),
+    match: str = Query("all", pattern="^(all|any)$"),
+    min_lat: Optional[float] = Query(None, alias="minLat", ge=-90, le=90),
+    max_lat: Optional[float] = Query(None, alias="maxLat", ge=-90, le=90),
+    min_lng: Optional[float] = Query(None, alias="minLng", ge=-180, le=180),
+    max_lng: Optional[float] = Query(None, alias="maxLng", ge=-180, le=180),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, max_length=200),
+    sort: str = Query("id", pattern="^(id|similarity)$"),
+    response_format: str = Query("json", alias="format", pattern="^(json|geojson)$"),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     店舗一覧を取得する
+    If-None-Match、If-Modified-Sinceが最新のデータと一致する場合は304を返す
 
     Args:
         serach_name (Union[str, None], optional): 検索文字
         tag_name (Union[str, None], optional): タグ名
+        tags (Optional[List[str]], optional): タグ名(複数指定可)
+        match (str, optional): タグの一致条件(all: 全て含む, any: いずれかを含む)
+        min_lat (Optional[float], optional): 表示範囲の最小緯度
+        max_lat (Optional[float], optional): 表示範囲の最大緯度
+        min_lng (Optional[float], optional): 表示範囲の最小経度
+        max_lng (Optional[float], optional): 表示範囲の最大経度
+        limit (Optional[int], optional): 取得件数
+        cursor (Optional[str], optional): 前ページのレスポンスのnextCursor
+        sort (str, optional): 並び順(id: 登録順, similarity: 検索文字との類似度順)
+        response_format (str, optional): レスポンス形式(json, geojson: GeoJSONのFeatureCollection)
+
+    Raises:
+        HTTPException: 表示範囲の上下限が逆転している場合 (400 Bad Request)
+        HTTPException: カーソルが不正な場合 (400 Bad Request)
+        HTTPException: 類似度順でカーソルを指定した場合 (400 Bad Request)
 
     Returns:
-        _type_: 複数店舗レスポンスモデル
+        _type_: 複数店舗レスポンスモデル(更新がない場合は304 Not Modified)
     """
 
     logger.info(f"店舗一覧取得リクエスト")
 
+    bbox = validate_bounding_box(BoundingBox(min_lat, max_lat, min_lng, max_lng))
+
+    # tag_nameとtagsをまとめて1つの条件として扱う
+    tag_names = sorted({name for name in [tag_name, *(tags or [])] if name})
+    match_all = match == "all"
+
+    # 検索条件が異なるページのカーソルを使えないよう、条件の識別子をカーソルに含める
+    fingerprint = filter_fingerprint({
+        "serach_name": serach_name or None,
+        "tag_names": tag_names,
+        "match": match,
+        "bbox": list(bbox),
+    })
+    after_id = decode_cursor(cursor, fingerprint) if cursor else None
+
+    # 類似度順はStore.id順ではないため、キーセット方式のページングはできない
+    order_by_similarity = sort == "similarity"
+    if order_by_similarity and cursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="類似度順ではカーソルを指定できません",
+        )
+
+    # キャッシュ済みの場合はDBにアクセスしない
+    cache_key = (
+        serach_name or None,
+        tuple(tag_names),
+        match if tag_names else None,
+        tuple(bbox),
+        after_id,
+        limit,
+        sort,
+        response_format,
+    )
+    cached = stores_cache.get(cache_key)
+    if cached is not None:
+        logger.info("店舗一覧キャッシュ使用")
+        return stores_json_response(request, *cached, response_format)
+
+    generation = current_generation()
     try:
-        stmt = (
-            select(
-                Store.store_id,
-                Store.store_name,
-                Store.address,
-                Store.content,
-                Store.lat,
-                Store.lng,
-                func.coalesce(
-                    func.array_agg(Tag.tag_name).filter(Tag.tag_name != None),
-                    literal([]),
-                ).label("tags"),
-            )
-            .outerjoin(stores_tags_table, stores_tags_table.c.store_id == Store.id)
-            .outerjoin(Tag, stores_tags_table.c.tag_id == Tag.id)
-            .order_by(Store.id.asc())
-            .group_by(Store.id)
+        # 一覧のSQLより先にバージョンを取得する(取得の間に更新された場合は古いETagとなり、次回再取得される)
+        validators = await get_validators(db)
+        if validators is not None and is_not_modified(request.headers, validators):
+            logger.info("店舗一覧の更新なし")
+            return not_modified_response(validators)
+
+        stmt = select_stores_stmt(
+            serach_name=serach_name,
+            tag_names=tag_names,
+            match_all=match_all,
+            bbox=bbox,
+            after_id=after_id,
+            # 次ページの有無を判定するため1件多く取得
+            limit=limit + 1 if limit else None,
+            order_by_similarity=order_by_similarity,
         )
+        stores = (await db.execute(stmt)).all()
+    except Exception as e:
+        logger.error(f"DB処理失敗: {e.__class__.__name__}: {e}")
+        handle_db_exception(e)
+    finally:
+        logger.info("DB処理終了")
 
-        # 検索条件リスト
-        conditions: List[str] = []
+    next_cursor = None
+    if limit and len(stores) > limit:
+        stores = stores[:limit]
+        if not order_by_similarity:
+            next_cursor = encode_cursor(stores[-1].id, fingerprint)
 
-        # 検索文字あり
-        if serach_name:
-            conditions.append(Store.store_name.ilike(f"%{serach_name}%"))
+    # レスポンスモデルでの再検証を行わずにエンコードし、エンコード結果をキャッシュする
+    # 店舗の項目は店舗取得と同じ形式とする(ジオコーディング未完了の緯度経度はnull)
+    # nextCursorは最終ページでは出力しない
+    if response_format == "geojson":
+        body = dumps(stores_feature_collection(stores, next_cursor))
+    else:
+        response = {"stores": rows_to_dicts(stores, STORE_FIELDS)}
+        if next_cursor is not None:
+            response["nextCursor"] = next_cursor
+        body = dumps(response)
+    cache_response(stores_cache, cache_key, (validators, body), generation)
 
-        if tag_name:
-            subquery = (
-                select(stores_tags_table.c.store_id)
-                .join(Tag, stores_tags_table.c.tag_id == Tag.id)
-                .where(Tag.tag_name == tag_name)
-            )
-            conditions.append(Store.id.in_(subquery))
+    return stores_json_response(request, validators, body, response_format)
+
+
+def stores_feature_collection(stores: List[Row], next_cursor: Optional[str]) -> dict:
+    """
+    店舗一覧をGeoJSONのFeatureCollectionにする
+    レスポンスモデルを介さずに行のタプルから直接作成する
+
+    Args:
+        stores (List[Row]): 店舗一覧取得のSQLの結果
+        next_cursor (Optional[str]): 次ページのカーソル
+
+    Returns:
+        dict: GeoJSONのFeatureCollection
+    """
+    features = (
+        point_feature(
+            store.lng,
+            store.lat,
+            {"storeName": store.store_name, "tags": store.tags},
+            str(store.store_id),
+        )
+        for store in stores
+    )
+    if next_cursor is None:
+        return feature_collection(features)
+    return feature_collection(features, nextCursor=next_cursor)
+
+
+def stores_json_response(
+    request: Request,
+    validators: Optional[Validators],
+    body: bytes,
+    response_format: str,
+) -> Response:
+    return conditional_json_response(
+        request,
+        validators,
+        body,
+        GEOJSON_MEDIA_TYPE if response_format == "geojson" else JSON_MEDIA_TYPE,
+    )
+
+
+def conditional_json_response(
+    request: Request,
+    validators: Optional[Validators],
+    body: bytes,
+    media_type: str = JSON_MEDIA_TYPE,
+) -> Response:
+    """
+    エンコード済みのJSONにETag、Last-Modifiedを付けて返す
+    クライアントの保持する内容が最新の場合は本文なしの304を返す
+    """
+    if validators is None:
+        return json_response(body, media_type)
+    if is_not_modified(request.headers, validators):
+        return not_modified_response(validators)
+    return json_response(body, media_type, validator_headers(validators))
+
+# GETで指定地点に近い店舗を取得
+@router.get("/nearby", response_model=NearbyStoresResponse)
+async def read_nearby_stores(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    limit: int = Query(20, ge=1, le=100),
+    radius_m: Optional[float] = Query(None, alias="radiusM", gt=0, le=100000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    指定地点から近い順に店舗を取得する
+
+    Args:
+        lat (float): 緯度
+        lng (float): 経度
+        limit (int, optional): 取得件数
+        radius_m (Optional[float], optional): 検索半径(メートル)
 
-        # 検索条件が指定されている場合、where句に条件を追加
-        if conditions:
-            stmt = stmt.where(*conditions)
+    Returns:
+        _type_: 近傍店舗一覧レスポンスモデル
+    """
 
-        stores = db.execute(stmt).mappings().all()
+    logger.info(f"近傍店舗取得リクエスト: lat={lat}, lng={lng}, limit={limit}, radius_m={radius_m}")
+
+    try:
+        stmt = select_nearby_stores_stmt(lat, lng, limit, radius_m)
+        stores = (await db.execute(stmt)).mappings().all()
     except Exception as e:
         logger.error(f"DB処理失敗: {e.__class__.__name__}: {e}")
         handle_db_exception(e)
@@ -93,12 +281,117 @@ def read_stores(
 
     return {"stores": humps.camelize(stores)}
 
+# GETでズームレベル毎の店舗クラスタを取得
+@router.get("/clusters", response_model=ClustersResponse)
+async def read_store_clusters(
+    z: int = Query(..., ge=0, le=Cluster.MAX_ZOOM),
+    bbox: str = Query(..., max_length=100),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    表示範囲内の店舗をグリッド単位にまとめ、セル毎の重心と件数を取得する
+
+    Args:
+        z (int): ズームレベル
+        bbox (str): 表示範囲("最小経度,最小緯度,最大経度,最大緯度")
+
+    Raises:
+        HTTPException: 表示範囲が不正な場合 (400 Bad Request)
+        HTTPException: 表示範囲が広すぎる場合 (400 Bad Request)
+
+    Returns:
+        _type_: 店舗クラスタ一覧レスポンスモデル
+    """
+
+    logger.info(f"店舗クラスタ取得リクエスト: z={z}, bbox={bbox}")
+
+    bounding_box = parse_bbox(bbox)
+    cell_range(z, bounding_box)
+
+    try:
+        clusters = await get_clusters(db, z, bounding_box)
+    except Exception as e:
+        logger.error(f"DB処理失敗: {e.__class__.__name__}: {e}")
+        handle_db_exception(e)
+    finally:
+        logger.info("DB処理終了")
+
+    return {"zoom": z, "clusters": clusters}
+
+# GETで店舗マーカーのベクタータイルを取得
+@router.get("/tiles/{z}/{x}/{y}.mvt")
+async def read_store_tile(
+    z: int = Path(..., ge=0, le=Tile.MAX_ZOOM),
+    x: int = Path(..., ge=0),
+    y: int = Path(..., ge=0),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    タイル内の店舗(ID、店舗名、タグ)をMapbox Vector Tile形式で取得する
+
+    Args:
+        z (int): ズームレベル
+        x (int): タイルX座標
+        y (int): タイルY座標
+
+    Raises:
+        HTTPException: タイル座標が範囲外の場合 (400 Bad Request)
+
+    Returns:
+        Response: Mapbox Vector Tile形式のバイト列
+    """
+
+    logger.info(f"タイル取得リクエスト: z={z}, x={x}, y={y}")
+
+    validate_tile(z, x, y)
+
+    try:
+        tile = await get_tile(db, z, x, y)
+    except Exception as e:
+        logger.error(f"DB処理失敗: {e.__class__.__name__}: {e}")
+        handle_db_exception(e)
+    finally:
+        logger.info("DB処理終了")
+
+    return Response(
+        content=tile,
+        media_type=Tile.MEDIA_TYPE,
+        headers={"Cache-Control": f"public, max-age={Tile.CACHE_MAX_AGE}"},
+    )
+
+# GETで全店舗をエクスポート
+@router.get("/export")
+async def export_stores(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv|geojson)$"),
+):
+    """
+    全店舗をNDJSON、CSV、GeoJSONのいずれかの形式で逐次出力する
+
+    Args:
+        export_format (str, optional): 出力形式(ndjson, csv, geojson)
+
+    Returns:
+        StreamingResponse: 店舗データ
+    """
+
+    logger.info(f"店舗エクスポートリクエスト: format={export_format}")
+
+    media_type, extension = EXPORT_FORMATS[export_format]
+    return StreamingResponse(
+        stream_stores(export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="stores.{extension}"'},
+    )
+
+
 # GETで特定の店舗を取得
 @router.get("/{store_id}", response_model=StoreResponse)
-def read_store(store_id: UUID,
-               db: Session = Depends(get_db)):
+async def read_store(store_id: UUID,
+                     request: Request,
+                     db: AsyncSession = Depends(get_async_db)):
     """
     指定した店舗IDの情報を取得する
+    If-None-Match、If-Modified-Sinceが最新のデータと一致する場合は304を返す
 
     Args:
         store_id (UUID): 取得対象の店舗ID
@@ -107,32 +400,28 @@ def read_store(store_id: UUID,
         HTTPException: 店舗が存在しない場合 (404 Not Found)
 
     Returns:
-        _type_: 単一店舗レスポンスモデル
+        _type_: 単一店舗レスポンスモデル(更新がない場合は304 Not Modified)
     """
 
     logger.info(f"店舗取得リクエスト: {store_id}")
 
+    # キャッシュ済みの場合はDBにアクセスしない
+    cached = store_cache.get(store_id)
+    if cached is not None:
+        logger.info("店舗キャッシュ使用")
+        return conditional_json_response(request, *cached)
+
+    generation = current_generation()
+
     logger.info("DB処理開始")
     try:
-        stmt = (
-            select(
-                Store.store_id,
-                Store.store_name,
-                Store.address,
-                Store.content,
-                Store.lat,
-                Store.lng,
-                func.coalesce(
-                    func.array_agg(Tag.tag_name).filter(Tag.tag_name != None),
-                    literal([]),
-                ).label("tags"),
-            )
-            .outerjoin(stores_tags_table, stores_tags_table.c.store_id == Store.id)
-            .outerjoin(Tag, stores_tags_table.c.tag_id == Tag.id)
-            .where(Store.store_id == store_id)
-            .group_by(Store.id)
-        )
-        store = db.execute(stmt).mappings().first()
+        validators = await get_validators(db)
+        if validators is not None and is_not_modified(request.headers, validators):
+            logger.info(f"店舗の更新なし: {store_id}")
+            return not_modified_response(validators)
+
+        stmt = select_store_stmt(store_id)
+        store = (await db.execute(stmt)).first()
     except Exception as e:
         logger.error(f"DB処理失敗: {e.__class__.__name__}: {e}")
         handle_db_exception(e)
@@ -146,117 +435,105 @@ def read_store(store_id: UUID,
             detail="該当する店舗が存在しませんでした",
         )
 
-    return humps.camelize(store)
+    body = dumps(rows_to_dicts([store], STORE_FIELDS)[0])
+    cache_response(store_cache, store_id, (validators, body), generation)
 
+    return conditional_json_response(request, validators, body)
 
-# POSTで店舗を作成
-@router.post("/")
-async def create_store(store: StoreCreateRequest,
-                       db: Session = Depends(get_db)):
+
+# GETで店舗のジオコーディング状態を取得
+@router.get("/{store_id}/geocode", response_model=StoreGeocodeResponse)
+async def read_store_geocode(store_id: UUID,
+                             db: AsyncSession = Depends(get_async_db)):
     """
-    新しい店舗情報を登録する
+    指定した店舗IDのジオコーディング状態と試行回数を取得する
 
     Args:
-        store (StoreCreateRequest): 店舗作成用のリクエストモデル
+        store_id (UUID): 取得対象の店舗ID
 
     Raises:
-        HTTPException: 国土地理院APIに接続できない場合 (400 Bad Request)
-        HTTPException: 国土地理院APIが不正なステータスコードを返した場合 (400 Bad Request)
-        HTTPException: 国土地理院APIへのリクエストが失敗した場合 (500 Internal Server Error)
-        HTTPException: 指定した住所が存在しない場合 (404 Not Found)
-        HTTPException: DB処理に失敗した場合 (500 Internal Server Error)
+        HTTPException: 店舗が存在しない場合 (404 Not Found)
 
     Returns:
-        Response: ステータスコード201を返却（店舗登録成功時）
+        _type_: ジオコーディング状態レスポンスモデル
     """
 
-    logger.info(f"新規店舗作成リクエスト: {store.storeName}")
-
-    params = {"q": store.address}
+    logger.info(f"ジオコーディング状態取得リクエスト: {store_id}")
 
     try:
-        # 国土地理院のAPIから緯度と経度を取得
-        resp = await fetch_coordinates_from_gsi(params)
-        data = resp.json()
-    except HTTPException as e:
-        raise e
+        stmt = select(
+            Store.store_id,
+            Store.geocode_status,
+            Store.geocode_attempts,
+            Store.geocode_error,
+            Store.lat,
+            Store.lng,
+        ).where(Store.store_id == store_id)
+        store = (await db.execute(stmt)).mappings().first()
     except Exception as e:
-        logger.exception("外部API呼び出し失敗")
-        raise HTTPException(status_code=500, detail="サーバー内部エラー")
-
-    data = resp.json()
+        logger.error(f"DB処理失敗: {e.__class__.__name__}: {e}")
+        handle_db_exception(e)
 
-    if not data:
-        logger.warning(f"該当する住所が存在しませんでした:{store.address}")
+    if store is None:
+        logger.warning(f"該当する店舗が存在しませんでした:{store_id}")
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="該当する住所が見つかりません"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="該当する店舗が存在しませんでした",
         )
 
-    geometry = data[0].get("geometry")
-    if not geometry or not geometry.get("coordinates"):
-        logger.warning(f"該当する住所が存在しませんでした:{store.address}")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="該当する住所が見つかりません"
-        )
+    return humps.camelize(store)
 
-    # 緯度、経度
-    lng, lat = geometry.get("coordinates")
 
-    # DBセッション開始
-    logger.info("トランザクション開始")
+def geocode_accepted_response(store_id: UUID) -> JSONResponse:
+    """
+    ジオコーディング処理待ちとして受け付けた旨のレスポンスを作成する
+    Locationヘッダーにジオコーディング状態の取得先を設定する
+    """
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"storeId": str(store_id), "geocodeStatus": GeocodeStatus.PENDING},
+        headers={"Location": f"{EndPoints.STORES}/{store_id}/geocode"},
+    )
 
-    try:
-        # トランザクション開始
-        with db.begin():
-            select_tags: List[str] = []
-            tag_stmt = select(Tag.id, Tag.tag_name).where(
-                Tag.tag_name.in_(store.tags)
-            )
 
-            # DB取得処理
-            select_tags = db.execute(tag_stmt).mappings().all()
+# POSTで店舗を作成
+@router.post("/")
+async def create_store(store: StoreCreateRequest,
+                       db: AsyncSession = Depends(get_async_db)):
+    """
+    新しい店舗情報を登録する
 
-            set_select_tags = {
-                select_tag.get("tag_name") for select_tag in select_tags
-            }
+    Args:
+        store (StoreCreateRequest): 店舗作成用のリクエストモデル
 
-            tag_ids: List[str] = []
+    緯度、経度はバックグラウンドでジオコーディングする
 
-            if select_tags:
-                tag_ids = [select_tag.get("id") for select_tag in select_tags]
+    Raises:
+        HTTPException: DB処理に失敗した場合 (500 Internal Server Error)
+
+    Returns:
+        JSONResponse: ステータスコード202を返却（店舗登録成功時）
+    """
+
+    logger.info(f"新規店舗作成リクエスト: {store.storeName}")
 
+    # DBセッション開始
+    logger.info("トランザクション開始")
+
+    try:
+        # トランザクション開始
+        async with db.begin():
+            # タグ名からタグのPKを取得(tagテーブルに存在しない場合、追加)
+            tag_ids: Dict[str, int] = {}
             if store.tags:
-                tags_values: List[Tag] = []
-
-                for store_tag in store.tags:
-                    # tagテーブルに存在しない場合、追加
-                    if store_tag not in set_select_tags:
-                        tag_id: uuid.UUID = uuid.uuid4()
-                        tag: Tag = Tag(tag_id=tag_id, tag_name=store_tag)
-                        tags_values.append(tag)
-
-                tags_dicts = [
-                    {"tag_id": t.tag_id, "tag_name": t.tag_name}
-                    for t in tags_values
-                ]
-                if tags_dicts:
-                    logger.info(
-                        f"新規タグ追加: {[t['tag_name'] for t in tags_dicts]}"
-                    )
-                    insert_tag_stmt = (
-                        insert(Tag).values(tags_dicts).returning(Tag.id)
-                    )
-                    res_tags_ids = db.execute(insert_tag_stmt).scalars().all()
-                    if res_tags_ids:
-                        tag_ids.extend(res_tags_ids)
+                tag_ids = await resolve_tag_ids(db, store.tags)
 
             store_dicts = {
                 "store_id": uuid.uuid4(),
                 "store_name": store.storeName,
                 "address": store.address,
                 "content": store.content,
-                "lat": lat,
-                "lng": lng,
+                "geocode_status": GeocodeStatus.PENDING,
             }
 
             store_id: str = None
@@ -265,7 +542,7 @@ async def create_store(store: StoreCreateRequest,
             insert_store_stmt = (
                 insert(Store).values(store_dicts).returning(Store.id)
             )
-            store_id = db.execute(insert_store_stmt).scalar_one()
+            store_id = (await db.execute(insert_store_stmt)).scalar_one()
 
             logger.info(
                 f"店舗登録成功: store_id={store_id}, name={store.storeName}"
@@ -274,7 +551,7 @@ async def create_store(store: StoreCreateRequest,
             # 中間テーブルにデータを追加
             if tag_ids:
                 stores_tags = []
-                for tag_id in tag_ids:
+                for tag_id in tag_ids.values():
                     stores_tags_dicts = {
                         "stores_tags_id": uuid.uuid4(),
                         "store_id": store_id,
@@ -286,20 +563,146 @@ async def create_store(store: StoreCreateRequest,
                 insert_stores_tags_stmt = insert(stores_tags_table).values(
                     stores_tags
                 )
-                db.execute(insert_stores_tags_stmt)
+                await db.execute(insert_stores_tags_stmt)
+
+    except Exception as e:
+        logger.error("トランザクション失敗")
+        handle_db_exception(e)
+    logger.info("トランザクション終了")
+
+    cache_tag_ids(tag_ids)
+    store_changed(store_dicts["store_id"])
+    enqueue_geocode(store_dicts["store_id"], store.address)
+
+    return geocode_accepted_response(store_dicts["store_id"])
+
+
+# POSTで複数の店舗を作成
+@router.post("/batch")
+async def create_stores_batch(stores: List[StoreCreateRequest],
+                              db: AsyncSession = Depends(get_async_db)):
+    """
+    複数の店舗情報を1つのトランザクションで登録する
 
+    Args:
+        stores (List[StoreCreateRequest]): 店舗作成用のリクエストモデル
+
+    緯度、経度はバックグラウンドでジオコーディングする
+
+    Raises:
+        HTTPException: 店舗が0件、または上限を超える場合 (400 Bad Request)
+        HTTPException: DB処理に失敗した場合 (500 Internal Server Error)
+
+    Returns:
+        JSONResponse: ステータスコード202と、登録した店舗IDをリクエスト順に返却
+    """
+
+    logger.info(f"店舗一括作成リクエスト: {len(stores)}件")
+
+    if not stores or len(stores) > StoreBatch.MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"一度に登録できる店舗は1件以上{StoreBatch.MAX_SIZE}件以下です",
+        )
+
+    logger.info("トランザクション開始")
+    try:
+        async with db.begin():
+            result = await create_stores(db, stores)
     except Exception as e:
         logger.error("トランザクション失敗")
         handle_db_exception(e)
     logger.info("トランザクション終了")
 
-    return Response(status_code=status.HTTP_201_CREATED)
+    cache_tag_ids(result.tag_ids)
+    # ジオコーディングはワーカーの同時実行数の範囲で行う(同じ住所は1回のみ取得)
+    for job in result.jobs:
+        store_changed(job.store_id)
+        enqueue_geocode(*job)
+
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "stores": [
+                {"storeId": str(job.store_id), "geocodeStatus": GeocodeStatus.PENDING}
+                for job in result.jobs
+            ]
+        },
+    )
+
+
+async def upload_chunks(upload: UploadFile):
+    """
+    アップロードされたファイルを一定サイズ毎に読み込む(COPYの入力用)
+    """
+    while chunk := await upload.read(StoreImport.CHUNK_SIZE):
+        yield chunk
+
+
+# POSTでCSVから店舗を一括登録
+@router.post("/import", response_model=StoreImportResponse)
+async def import_stores_csv(stores: UploadFile = File(...),
+                            tags: Optional[UploadFile] = File(None),
+                            stores_tags: Optional[UploadFile] = File(None),
+                            db: AsyncSession = Depends(get_async_db)):
+    """
+    db/bkと同じ列構成のCSVから店舗、タグ、中間テーブルを一括登録する
+    緯度経度のない店舗はバックグラウンドでジオコーディングする
+
+    Args:
+        stores (UploadFile): 店舗CSV
+        tags (Optional[UploadFile], optional): タグCSV
+        stores_tags (Optional[UploadFile], optional): 店舗とタグの中間テーブルCSV
+
+    Raises:
+        HTTPException: CSVの形式が不正な場合 (400 Bad Request)
+        HTTPException: DB処理に失敗した場合 (500 Internal Server Error)
+
+    Returns:
+        _type_: 店舗一括登録レスポンスモデル
+    """
+
+    logger.info(f"店舗一括登録リクエスト: {stores.filename}")
+
+    logger.info("トランザクション開始")
+    try:
+        async with db.begin():
+            conn = await db.connection()
+            result = await import_stores(
+                conn,
+                upload_chunks(stores),
+                upload_chunks(tags) if tags is not None else None,
+                upload_chunks(stores_tags) if stores_tags is not None else None,
+            )
+    except Exception as e:
+        # COPYの失敗、マージ時の型変換の失敗(不正なUUID、数値、日時)はCSVの不正とする
+        if is_data_exception(e):
+            logger.warning(f"CSVの形式が不正です: {e.__class__.__name__}: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="CSVの形式が不正です",
+            )
+        logger.error("トランザクション失敗")
+        handle_db_exception(e)
+    logger.info("トランザクション終了")
+
+    clear_store_caches()
+    for job in result.pending:
+        enqueue_geocode(*job)
+
+    return {
+        "storesInserted": result.stores_inserted,
+        "storesUpdated": result.stores_updated,
+        "tagsInserted": result.tags_inserted,
+        "storesTagsInserted": result.stores_tags_inserted,
+        "geocodePending": len(result.pending),
+    }
 
 
 # DELETEで店舗を作成
 @router.delete("/")
-def delete_store(store_id: UUID,
-                 db: Session = Depends(get_db)):
+async def delete_store(store_id: UUID,
+                       db: AsyncSession = Depends(get_async_db)):
     """
     店舗情報を削除する
     Args:
@@ -316,226 +719,83 @@ def delete_store(store_id: UUID,
     logger.info("トランザクション開始")
 
     try:
-        with db.begin():
-            store_stmt = select(Store.id).where(Store.store_id == store_id)
+        async with db.begin():
+            store_stmt = select_store_for_delete_stmt(store_id)
 
-            select_store_id = db.execute(store_stmt).scalar()
+            select_store = (await db.execute(store_stmt)).first()
 
-            if not select_store_id:
+            if not select_store:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="該当する店舗が存在しませんでした",
                 )
 
+            select_store_id = select_store.id
+
             # 中間テーブル削除
-            delete_stmt = delete(stores_tags_table).where(
-                stores_tags_table.c.store_id == select_store_id
-            )
-            db.execute(delete_stmt)
+            delete_stmt = delete_store_tags_stmt(select_store_id)
+            await db.execute(delete_stmt)
 
             logger.debug(f"中間テーブル削除成功: {store_id}")
 
             # 店舗を削除
-            delete_store_stmt = delete(Store).where(Store.store_id == store_id)
-            db.execute(delete_store_stmt)
+            await db.execute(delete_store_stmt(store_id))
             logger.info(f"店舗削除成功: {store_id}")
 
     except Exception as e:
         logger.error("トランザクション失敗")
         handle_db_exception(e)
 
-        logger.info("トランザクション終了")
-        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    logger.info("トランザクション終了")
+
+    store_changed(store_id, (select_store.lat, select_store.lng))
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.patch("/")
 async def update_store(store: StoreUpdateRequest,
-                       db: Session = Depends(get_db)):
+                       db: AsyncSession = Depends(get_async_db)):
     """
     店舗情報を更新するAPI
 
     Args:
         store (StoreUpdateRequest): 店舗更新リクエストモデル
 
+    住所が変更される場合、緯度、経度はバックグラウンドでジオコーディングする
+    タグを指定した場合は指定したタグに置き換える(空の場合は全て解除)
+
     Raises:
-        HTTPException: 国土地理院APIが応答しない場合
-        HTTPException: 指定住所が存在しない場合
         HTTPException: 該当店舗が存在しない場合
         HTTPException: データベース例外（整合性・接続等）が発生した場合
 
     Returns:
-        Response: HTTP 204 NO CONTENT（更新成功）
+        Response: HTTP 204 NO CONTENT（更新成功）、住所変更時はHTTP 202 ACCEPTED
     """
 
-    update_values = {}
-    # リクエストに店舗名が含まれている場合
-    if store.storeName is not None:
-        update_values["store_name"] = store.storeName
-
-    # リクエストに住所が含まれている場合
-    if store.address is not None:
-        params = {"q": store.address}
-
-    try:
-        # 国土地理院のAPIから緯度と経度を取得
-        resp = await fetch_coordinates_from_gsi(params)
-        data = resp.json()
-    except HTTPException as e:
-        raise e
-    except Exception as e:
-        logger.exception("外部API呼び出し失敗")
-        raise HTTPException(status_code=500, detail="サーバー内部エラー")
-
-    data = resp.json()
-
-    if not data:
-        logger.warning(f"該当する住所が存在しませんでした:{store.address}")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="該当する住所が見つかりません"
-        )
-
-    geometry = data[0].get("geometry")
-    if not geometry or not geometry.get("coordinates"):
-        logger.warning(f"該当する住所が存在しませんでした:{store.address}")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="該当する住所が見つかりません"
-        )
-
-    update_values["address"] = store.address
-
-    if store.content is not None:
-        update_values["content"] = store.content
-
     # DBセッション開始
     try:
-        with db.begin():
-
-            # 店舗名、住所、内容が更新される場合、DBを更新
-            if update_values:
-                update_stmt = (
-                    update(Store)
-                    .where(Store.store_id == store.storeId)
-                    .values(update_values)
-                )
-                db.execute(update_stmt)
-
-            store_stmt = select(Store.id).where(Store.store_id == store.storeId)
+        async with db.begin():
+            # 店舗の更新とタグの置き換えを1つのSQLで行う
+            # (住所が変更される場合、緯度、経度はジオコーディングが完了するまで変更前の値を保持する)
+            result = await update_store_and_tags(db, store)
 
-            # 店舗IDからPKを取得
-            select_store_id = db.execute(store_stmt).scalar()
-
-            if not select_store_id:
+            if result is None:
                 logger.info(f"該当する店舗が存在しませんでした:{store.storeId}")
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="該当する店舗が存在しませんでした",
                 )
 
-            # 既存タグの取得
-            select_stores_tags_stmt = (
-                select(
-                    stores_tags_table.c.stores_tags_id,
-                    Tag.tag_name,
-                )
-                .select_from(stores_tags_table)
-                .where(stores_tags_table.c.store_id == select_store_id)
-                .outerjoin(Tag, stores_tags_table.c.tag_id == Tag.id)
-            )
-
-            logger.info("店舗情報の取得開始")
-            select_stores_tags = (
-                db.execute(select_stores_tags_stmt).mappings().all()
-            )
-            logger.info("店舗情報の取得完了")
-
-            # 辞書形式で整理 {tag_name: {stores_tags_id, tag_name}}
-            select_stores_tags_objs = {}
-            for select_stores_tag in select_stores_tags:
-                tag_name = select_stores_tag.get("tag_name")
-                select_stores_tags_objs[tag_name] = select_stores_tag
-
-            # タグの差分更新
-            if store.tags:
-                tags: set[str] = set(store.tags)
-                if select_stores_tags_objs:
-                    select_stores_tags_names = set(select_stores_tags_objs.keys())
-                    # 削除するタグ名
-                    delete_tags_names = select_stores_tags_names - tags
-                    # 追加するタグ名
-                    add_tags_names = tags - select_stores_tags_names
-
-                    # 削除処理
-                    if delete_tags_names:
-                        select_stores_tags_ids = []
-
-                        for delete_tags_name in delete_tags_names:
-                            select_stores_tags_obj = select_stores_tags_objs.get(
-                                delete_tags_name
-                            )
-                            if select_stores_tags_obj:
-                                select_stores_tags_ids.append(
-                                    select_stores_tags_obj.get("stores_tags_id")
-                                )
-
-                        # 差分のあるタグを削除
-                        delete_stores_tags_stmt = delete(stores_tags_table).where(
-                            stores_tags_table.c.stores_tags_id.in_(
-                                select_stores_tags_ids
-                            )
-                        )
-                        db.execute(delete_stores_tags_stmt)
-
-                    # 追加処理
-                    if add_tags_names:
-                        tags_stmt = select(Tag.tag_name, Tag.id).where(
-                            Tag.tag_name.in_(add_tags_names)
-                        )
-
-                        select_tags = db.execute(tags_stmt).mappings().all()
-
-                        # タグテーブルに存在しない場合、追加
-                        if not select_tags:
-                            tags_dicts = []
-                            for add_tags_name in add_tags_names:
-                                tags_dict = {
-                                    "tag_id": uuid.uuid4(),
-                                    "tag_name": add_tags_name,
-                                }
-                                tags_dicts.append(tags_dict)
-
-                            logger.info("新規タグ作成開始")
-                            insert_tag_stmt = (
-                                insert(Tag)
-                                .values(tags_dicts)
-                                .returning(Tag.id, Tag.tag_name)
-                            )
-                            res_tags = db.execute(insert_tag_stmt).mappings().all()
-                            logger.info("新規タグ作成完了")
-                            select_tags.extend(res_tags)
-
-                        # 中間テーブルに追加（空リスト防止のためチェック）
-                        if select_tags:
-                            stores_tags_table_dicts = []
-                            for select_tag in select_tags:
-                                stores_tags_table_dict = {
-                                    "stores_tags_id": uuid.uuid4(),
-                                    "store_id": select_store_id,
-                                    "tag_id": select_tag.get("id"),
-                                }
-
-                                stores_tags_table_dicts.append(
-                                    stores_tags_table_dict
-                                )
-
-                            logger.info("中間テーブル更新開始")
-                            insert_stores_tags_table_stmt = insert(
-                                stores_tags_table
-                            ).values(stores_tags_table_dicts)
-                            db.execute(insert_stores_tags_table_stmt)
-                            logger.info("中間テーブル更新成功")
-
     except Exception as e:
         logger.error("トランザクション失敗")
         handle_db_exception(e)
 
-        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    cache_tag_ids(result.tag_ids)
+    store_changed(store.storeId, (result.lat, result.lng))
+
+    if store.address is not None:
+        enqueue_geocode(store.storeId, store.address)
+        return geocode_accepted_response(store.storeId)
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
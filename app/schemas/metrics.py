@@ -0,0 +1,53 @@
+import humps
+from pydantic import BaseModel, Field
+
+
+"""コネクションプール使用状況レスポンスモデル"""
+class DBPoolStatusResponse(BaseModel):
+    size: int
+    checkedIn: int
+    checkedOut: int
+    overflow: int
+    waits: int
+    timeouts: int
+
+    class Config:
+        alias_generator = humps.camelize
+        allow_population_by_field_name = True
+
+
+"""DB別コネクションプール使用状況レスポンスモデル"""
+class DBPoolsStatusResponse(BaseModel):
+    sync: DBPoolStatusResponse
+    async_: DBPoolStatusResponse = Field(alias="async")
+
+    class Config:
+        allow_population_by_field_name = True
+
+
+"""キャッシュ統計レスポンスモデル"""
+class CacheStatsResponse(BaseModel):
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+
+
+"""国土地理院API呼び出し状況レスポンスモデル"""
+class GSIStatsResponse(BaseModel):
+    state: str
+    failures: int
+    opened: int
+    rejected: int
+    retries: int
+
+
+"""ジオコーディング状況レスポンスモデル"""
+class GeocodingStatsResponse(BaseModel):
+    coalesced: int
+    inflight: int
+    cache: CacheStatsResponse
+    queued: int
+    retrying: int
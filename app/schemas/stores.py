@@ -13,8 +13,8 @@ class StoreResponse(BaseModel):
     storeName: str
     address: str
     content:str
-    lat: float
-    lng: float
+    lat: Optional[float]
+    lng: Optional[float]
     tags:Optional[List[str]]
 
     class Config:
@@ -25,11 +25,57 @@ class StoreResponse(BaseModel):
 """複数店舗レスポンスモデル"""
 class StoresResponse(BaseModel):
     stores:List[StoreResponse]
+    nextCursor:Optional[str] = None
+    class Config:
+        orm_mode = True
+        alias_generator = humps.camelize
+        allow_population_by_field_name = True
+
+"""近傍店舗レスポンスモデル"""
+class NearbyStoreResponse(StoreResponse):
+    distanceM: float
+
+"""近傍店舗一覧レスポンスモデル"""
+class NearbyStoresResponse(BaseModel):
+    stores:List[NearbyStoreResponse]
+    class Config:
+        orm_mode = True
+        alias_generator = humps.camelize
+        allow_population_by_field_name = True
+
+"""店舗クラスタレスポンスモデル"""
+class ClusterResponse(BaseModel):
+    lat: float
+    lng: float
+    count: int
+
+"""店舗クラスタ一覧レスポンスモデル"""
+class ClustersResponse(BaseModel):
+    zoom: int
+    clusters: List[ClusterResponse]
+
+"""ジオコーディング状態レスポンスモデル"""
+class StoreGeocodeResponse(BaseModel):
+    storeId: UUID
+    geocodeStatus: str
+    geocodeAttempts: int
+    geocodeError: Optional[str]
+    lat: Optional[float]
+    lng: Optional[float]
+
     class Config:
         orm_mode = True
         alias_generator = humps.camelize
         allow_population_by_field_name = True
 
+"""店舗一括登録レスポンスモデル"""
+class StoreImportResponse(BaseModel):
+    storesInserted: int
+    storesUpdated: int
+    tagsInserted: int
+    storesTagsInserted: int
+    geocodePending: int
+
 """店舗作成リクエストモデル"""
 class StoreCreateRequest(BaseModel):
     storeName: str = Field(min_length=1,max_length=100)
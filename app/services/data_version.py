@@ -0,0 +1,30 @@
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.data_version import DataVersion
+from app.utils.conditional import Validators, make_etag
+
+# 店舗、タグ、中間テーブルへの書き込みで加算されるバージョン
+STORES = "stores"
+
+
+async def get_validators(db: AsyncSession, name: str = STORES) -> Optional[Validators]:
+    """
+    データのバージョンからETagとLast-Modifiedを作成する(主キー検索1回のみ)
+
+    Args:
+        db (AsyncSession): DBセッション
+        name (str): バージョンの名前
+
+    Returns:
+        Optional[Validators]: ETagとLast-Modified。バージョンが未登録の場合はNone
+    """
+    stmt = select(DataVersion.version, DataVersion.updated_at).where(
+        DataVersion.name == name
+    )
+    row = (await db.execute(stmt)).first()
+    if row is None:
+        return None
+    return Validators(make_etag(name, row.version), row.updated_at)
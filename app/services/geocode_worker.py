@@ -0,0 +1,272 @@
+import asyncio
+import random
+from collections import Counter
+from logging import getLogger
+from typing import Iterable, List, NamedTuple, Optional, Set, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import select, update
+
+from app.config.constants import GeocodeStatus, GeocodeWorker
+from app.models.store import Store
+from app.services.geocoding import Coordinates, geocode_address
+from app.services.store_events import store_changed
+from database import get_async_session_local
+
+logger = getLogger("app")
+
+NOT_FOUND_ERROR = "該当する住所が見つかりません"
+
+
+class GeocodeJob(NamedTuple):
+    """ジオコーディング処理待ちの店舗"""
+    store_id: UUID
+    address: str
+
+
+_queue: Optional[asyncio.Queue] = None
+_workers: List[asyncio.Task] = []
+# リトライ待ちのジョブ(待機後にキューへ再投入する)
+_retrying: Set[asyncio.Task] = set()
+
+
+def enqueue_geocode(store_id: UUID, address: str) -> bool:
+    """
+    店舗のジオコーディングをキューに登録する
+    登録できなかった店舗は処理待ちのまま残り、次回のワーカー起動時に再登録される
+
+    Args:
+        store_id (UUID): 店舗ID
+        address (str): 住所
+
+    Returns:
+        bool: 登録できた場合True
+    """
+    if _queue is None:
+        logger.warning(f"ジオコーディングワーカー未起動のため登録を保留: {store_id}")
+        return False
+    try:
+        _queue.put_nowait(GeocodeJob(store_id, address))
+    except asyncio.QueueFull:
+        logger.warning(f"ジオコーディングキューが上限に達したため登録を保留: {store_id}")
+        return False
+    return True
+
+
+def geocode_worker_stats() -> dict:
+    """
+    キューに積まれている件数とリトライ待ちの件数を取得する
+    """
+    return {
+        "queued": _queue.qsize() if _queue is not None else 0,
+        "retrying": len(_retrying),
+    }
+
+
+async def _load_pending() -> List[GeocodeJob]:
+    AsyncSessionLocal = get_async_session_local()
+    async with AsyncSessionLocal() as db:
+        stmt = (
+            select(Store.store_id, Store.address)
+            .where(Store.geocode_status == GeocodeStatus.PENDING)
+            .order_by(Store.id)
+        )
+        rows = (await db.execute(stmt)).all()
+    return [GeocodeJob(row.store_id, row.address) for row in rows]
+
+
+async def start_geocode_worker() -> None:
+    """
+    ワーカーを起動し、前回停止時に処理待ちだった店舗をキューに登録する
+    """
+    global _queue
+    _queue = asyncio.Queue(maxsize=GeocodeWorker.QUEUE_SIZE)
+    for _ in range(GeocodeWorker.CONCURRENCY):
+        _workers.append(asyncio.create_task(_worker()))
+
+    # DB障害時も起動は継続する(処理待ちの店舗は次回起動時に再登録)
+    try:
+        jobs = await _load_pending()
+    except Exception as e:
+        logger.warning(f"ジオコーディング処理待ち店舗の取得失敗: {e.__class__.__name__}: {e}")
+        return
+    for job in jobs:
+        enqueue_geocode(*job)
+    if jobs:
+        logger.info(f"ジオコーディング処理待ち店舗を再登録: {len(jobs)}件")
+
+
+async def stop_geocode_worker() -> None:
+    """
+    ワーカーとリトライ待ちを全て停止する(未処理の店舗は処理待ちのままDBに残る)
+    """
+    global _queue
+    tasks = [*_workers, *_retrying]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    _workers.clear()
+    _retrying.clear()
+    _queue = None
+
+
+async def _worker() -> None:
+    while True:
+        job = await _queue.get()
+        try:
+            await process_job(job)
+        except Exception:
+            logger.exception(f"ジオコーディング処理失敗: {job.store_id}")
+        finally:
+            _queue.task_done()
+
+
+def retry_delay(attempts: int) -> float:
+    # 同時に失敗したジョブのリトライが集中しないようにジッターを入れる
+    delay = min(GeocodeWorker.RETRY_MAX, GeocodeWorker.RETRY_BASE * 2 ** (attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+async def _retry_later(job: GeocodeJob, delay: float) -> None:
+    await asyncio.sleep(delay)
+    enqueue_geocode(*job)
+
+
+async def _geocode(job: GeocodeJob) -> Tuple[Optional[Coordinates], Optional[str]]:
+    """
+    住所をジオコーディングする
+
+    Returns:
+        Tuple[Optional[Coordinates], Optional[str]]: (緯度, 経度)と一時的なエラーの内容
+    """
+    try:
+        return await geocode_address(job.address), None
+    except HTTPException as e:
+        return None, e.detail
+    except Exception as e:
+        return None, f"{e.__class__.__name__}: {e}"
+
+
+async def process_job(job: GeocodeJob) -> None:
+    """
+    住所をジオコーディングし、結果を店舗に反映する
+    国土地理院APIの一時的なエラーの場合は、試行回数が上限に達するまでリトライする
+
+    Args:
+        job (GeocodeJob): ジオコーディング処理待ちの店舗
+    """
+    coordinates, error = await _geocode(job)
+    result = await _apply_result(job, coordinates, error)
+    if result is None:
+        logger.info(f"ジオコーディング対象の住所が変更済みのため破棄: {job.store_id}")
+        return
+
+    geocode_status, attempts = result
+    if geocode_status == GeocodeStatus.PENDING:
+        delay = retry_delay(attempts)
+        logger.warning(
+            f"ジオコーディングをリトライ({attempts}回目失敗、{delay:.1f}秒後): "
+            f"{job.store_id} {error}"
+        )
+        task = asyncio.create_task(_retry_later(job, delay))
+        _retrying.add(task)
+        task.add_done_callback(_retrying.discard)
+    else:
+        logger.info(f"ジオコーディング終了: {job.store_id} status={geocode_status}")
+
+
+async def _apply_result(
+    job: GeocodeJob,
+    coordinates: Optional[Coordinates],
+    error: Optional[str],
+) -> Optional[Tuple[str, int]]:
+    """
+    ジオコーディング結果を店舗に反映する
+
+    Args:
+        job (GeocodeJob): ジオコーディング処理待ちの店舗
+        coordinates (Optional[Coordinates]): (緯度, 経度)。住所が見つからない場合はNone
+        error (Optional[str]): 一時的なエラーの内容
+
+    失敗した場合は変更前の住所の緯度経度を消去する
+
+    Returns:
+        Optional[Tuple[str, int]]: 反映後の状態と試行回数。
+            店舗が削除済み、または住所が変更済みの場合はNone
+    """
+    AsyncSessionLocal = get_async_session_local()
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            # 処理中に住所が更新された場合は新しいジョブの結果を優先する
+            store_stmt = (
+                select(Store.id, Store.lat, Store.lng, Store.geocode_attempts)
+                .where(
+                    Store.store_id == job.store_id,
+                    Store.address == job.address,
+                    Store.geocode_status == GeocodeStatus.PENDING,
+                )
+                .with_for_update()
+            )
+            store = (await db.execute(store_stmt)).first()
+            if store is None:
+                return None
+
+            attempts = store.geocode_attempts + 1
+            values = {"geocode_attempts": attempts}
+            if coordinates is not None:
+                values["lat"], values["lng"] = coordinates
+                values["geocode_status"] = GeocodeStatus.RESOLVED
+                values["geocode_error"] = None
+            elif error is None:
+                values["geocode_status"] = GeocodeStatus.FAILED
+                values["geocode_error"] = NOT_FOUND_ERROR
+            else:
+                values["geocode_status"] = (
+                    GeocodeStatus.FAILED
+                    if attempts >= GeocodeWorker.MAX_ATTEMPTS
+                    else GeocodeStatus.PENDING
+                )
+                values["geocode_error"] = error[:200]
+
+            # 処理待ちの店舗の緯度経度は変更前の住所のもの(新規登録の場合はNULL)
+            # 失敗した場合は変更前の地点に表示し続けないよう消去する
+            moved_away = (
+                values["geocode_status"] == GeocodeStatus.FAILED and store.lat is not None
+            )
+            if moved_away:
+                values["lat"] = values["lng"] = None
+
+            await db.execute(update(Store).where(Store.id == store.id).values(values))
+
+    if coordinates is not None:
+        store_changed(job.store_id, (store.lat, store.lng), coordinates)
+    elif moved_away:
+        store_changed(job.store_id, (store.lat, store.lng))
+
+    return values["geocode_status"], attempts
+
+
+async def resolve_jobs(jobs: Iterable[GeocodeJob], concurrency: int) -> Counter:
+    """
+    ワーカーを介さずに、同時実行数を制限してジオコーディングする(一括登録用)
+    一時的なエラーの店舗は処理待ちのまま残し、次回のワーカー起動時に再処理する
+
+    Args:
+        jobs (Iterable[GeocodeJob]): ジオコーディング処理待ちの店舗
+        concurrency (int): 同時実行数
+
+    Returns:
+        Counter: 状態毎の件数
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    statuses = Counter()
+
+    async def resolve(job: GeocodeJob) -> None:
+        async with semaphore:
+            coordinates, error = await _geocode(job)
+            result = await _apply_result(job, coordinates, error)
+        statuses[result[0] if result is not None else "skipped"] += 1
+
+    await asyncio.gather(*(resolve(job) for job in jobs))
+    return statuses
@@ -0,0 +1,198 @@
+import asyncio
+from datetime import timedelta
+from logging import getLogger
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql import func
+
+from app.config.constants import Geocoding
+from app.models.geocode_cache import GeocodeCache
+from app.services.gsi_api import fetch_coordinates_from_gsi
+from app.utils.address import normalize_address
+from app.utils.lru_cache import LRUCache
+from database import get_async_session_local
+
+logger = getLogger("app")
+
+# 正規化した住所 -> (緯度, 経度)。住所が見つからなかった場合はNone
+memory_cache = LRUCache(maxsize=Geocoding.MEMORY_CACHE_SIZE)
+
+_MISSING = object()
+
+# 正規化した住所 -> 実行中の取得処理。同じ住所の同時リクエストで結果を共有する
+_inflight: Dict[str, asyncio.Task] = {}
+
+# 実行中の取得処理に相乗りした回数
+_coalesced = 0
+
+Coordinates = Tuple[float, float]
+
+
+def parse_gsi_response(data) -> Optional[Coordinates]:
+    """
+    国土地理院APIのレスポンスから緯度と経度を取り出す
+
+    Returns:
+        Optional[Coordinates]: (緯度, 経度)。住所が見つからない場合はNone
+    """
+    if not data:
+        return None
+
+    geometry = data[0].get("geometry")
+    if not geometry or not geometry.get("coordinates"):
+        return None
+
+    lng, lat = geometry.get("coordinates")
+    return lat, lng
+
+
+async def _load_from_db(address_key: str):
+    """
+    DBのキャッシュから有効期限内の結果を取得する
+
+    Returns:
+        有効期限までの秒数と結果のタプル。キャッシュがない場合は_MISSING
+    """
+    AsyncSessionLocal = get_async_session_local()
+    async with AsyncSessionLocal() as db:
+        stmt = select(
+            GeocodeCache.found,
+            GeocodeCache.lat,
+            GeocodeCache.lng,
+            func.extract("epoch", GeocodeCache.expires_at - func.now()).label("ttl"),
+        ).where(
+            GeocodeCache.address_key == address_key,
+            GeocodeCache.expires_at > func.now(),
+        )
+        row = (await db.execute(stmt)).first()
+
+    if row is None:
+        return _MISSING
+    return float(row.ttl), ((row.lat, row.lng) if row.found else None)
+
+
+async def _save_to_db(address_key: str, coordinates: Optional[Coordinates], ttl: int) -> None:
+    """
+    ジオコーディング結果をDBのキャッシュに保存する(既存の場合は上書き)
+    """
+    values = {
+        "address_key": address_key,
+        "found": coordinates is not None,
+        "lat": coordinates[0] if coordinates else None,
+        "lng": coordinates[1] if coordinates else None,
+        "expires_at": func.now() + timedelta(seconds=ttl),
+    }
+    stmt = insert(GeocodeCache).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[GeocodeCache.address_key],
+        set_={
+            "found": stmt.excluded.found,
+            "lat": stmt.excluded.lat,
+            "lng": stmt.excluded.lng,
+            "expires_at": stmt.excluded.expires_at,
+            "updated_at": func.now(),
+        },
+    )
+
+    AsyncSessionLocal = get_async_session_local()
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            await db.execute(stmt)
+
+
+def geocoding_stats() -> dict:
+    """
+    同時リクエストの相乗り回数とメモリキャッシュの統計情報を取得する
+    """
+    return {
+        "coalesced": _coalesced,
+        "inflight": len(_inflight),
+        "cache": memory_cache.stats(),
+    }
+
+
+def _finish_inflight(address_key: str, task: asyncio.Task) -> None:
+    if _inflight.get(address_key) is task:
+        del _inflight[address_key]
+    # 待機していた呼び出し元が全てキャンセルされた場合も例外を回収済みにする
+    if not task.cancelled():
+        task.exception()
+
+
+async def geocode_address(address: str) -> Optional[Coordinates]:
+    """
+    住所から緯度と経度を取得する
+    メモリ → DB → 国土地理院APIの順に参照し、APIの結果は両方のキャッシュに保存する
+    同じ住所の取得処理が実行中の場合は、その結果を共有する
+
+    Args:
+        address (str): 住所
+
+    Raises:
+        HTTPException: 国土地理院APIの呼び出しに失敗した場合
+
+    Returns:
+        Optional[Coordinates]: (緯度, 経度)。住所が見つからない場合はNone
+    """
+    global _coalesced
+    address_key = normalize_address(address)
+
+    cached = memory_cache.get(address_key, _MISSING)
+    if cached is not _MISSING:
+        logger.info(f"ジオコーディングキャッシュ使用(メモリ): {address_key}")
+        return cached
+
+    task = _inflight.get(address_key)
+    if task is not None:
+        _coalesced += 1
+        logger.info(f"ジオコーディング実行中のため結果を共有: {address_key}")
+    else:
+        task = asyncio.ensure_future(_resolve(address, address_key))
+        _inflight[address_key] = task
+        task.add_done_callback(lambda t: _finish_inflight(address_key, t))
+
+    # 呼び出し元がキャンセルされても共有している取得処理は継続する
+    return await asyncio.shield(task)
+
+
+async def _resolve(address: str, address_key: str) -> Optional[Coordinates]:
+    """
+    DBのキャッシュまたは国土地理院APIから緯度と経度を取得し、キャッシュに保存する
+    """
+    # キャッシュ用DBの障害で店舗登録を失敗させないよう、例外はログ出力のみとする
+    try:
+        loaded = await _load_from_db(address_key)
+    except Exception as e:
+        logger.warning(f"ジオコーディングキャッシュ取得失敗: {e.__class__.__name__}: {e}")
+        loaded = _MISSING
+
+    if loaded is not _MISSING:
+        ttl, coordinates = loaded
+        logger.info(f"ジオコーディングキャッシュ使用(DB): {address_key}")
+        memory_cache.set(address_key, coordinates, ttl=ttl)
+        return coordinates
+
+    try:
+        # 国土地理院のAPIから緯度と経度を取得
+        resp = await fetch_coordinates_from_gsi({"q": address})
+        coordinates = parse_gsi_response(resp.json())
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.exception("外部API呼び出し失敗")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="サーバー内部エラー",
+        )
+
+    ttl = Geocoding.FOUND_TTL if coordinates else Geocoding.NOT_FOUND_TTL
+    memory_cache.set(address_key, coordinates, ttl=ttl)
+    try:
+        await _save_to_db(address_key, coordinates, ttl)
+    except Exception as e:
+        logger.warning(f"ジオコーディングキャッシュ保存失敗: {e.__class__.__name__}: {e}")
+
+    return coordinates
@@ -1,49 +1,151 @@
+import asyncio
+import random
 import traceback
 from logging import getLogger
+from typing import Optional
 
 from fastapi import HTTPException, status
-from httpx import AsyncClient, HTTPStatusError, RequestError
+from httpx import AsyncClient, HTTPStatusError, Limits, RequestError, Response
 
 from app.config.constants import GSIAPI
+from app.utils.circuit_breaker import CircuitBreaker
 
 logger = getLogger("app")
 
+# プロセス内で共有するHTTPクライアント(keep-aliveで接続を再利用する)
+_client: Optional[AsyncClient] = None
 
-async def fetch_coordinates_from_gsi(params: dict):
+breaker = CircuitBreaker(
+    failure_threshold=GSIAPI.FAILURE_THRESHOLD, reset_timeout=GSIAPI.RESET_TIMEOUT
+)
+
+# リトライした回数
+_retries = 0
+
+
+def get_http_client() -> AsyncClient:
     """
-    国土地理院のAPIから緯度と経度を取得する
+    プロセス内で共有するHTTPクライアントを取得する(初回呼び出し時のみ生成)
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = AsyncClient(
+            timeout=GSIAPI.TIMEOUT,
+            limits=Limits(
+                max_connections=GSIAPI.MAX_CONNECTIONS,
+                max_keepalive_connections=GSIAPI.MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=GSIAPI.KEEPALIVE_EXPIRY,
+            ),
+        )
+    return _client
 
-    Args:
-        params (dict): パラメータ
+
+async def close_http_client() -> None:
+    """
+    HTTPクライアントを破棄し、保持している接続を全て閉じる
+    """
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.aclose()
+
+
+def gsi_stats() -> dict:
+    """
+    サーキットブレーカーの状態とリトライ回数を取得する
+    """
+    return {**breaker.stats(), "retries": _retries}
+
+
+def _backoff(attempt: int) -> float:
+    # 複数リクエストのリトライが同時に集中しないようにジッターを入れる
+    return random.uniform(0, min(GSIAPI.BACKOFF_MAX, GSIAPI.BACKOFF_BASE * 2 ** attempt))
+
+
+async def _get_with_retry(client: AsyncClient, params: dict) -> Response:
+    """
+    一時的なエラー(接続失敗、429、5xx)の場合はバックオフしながらリトライする
     """
-    async with AsyncClient() as client:
-        logger.info(f"[GSI API] リクエスト開始 params={params}")
+    global _retries
+    for attempt in range(GSIAPI.MAX_RETRIES + 1):
         try:
-            # 国土地理院のAPIから緯度と経度を取得
             resp = await client.get(
                 url=GSIAPI.ADDRESS_SEARCH, params=params, timeout=GSIAPI.TIMEOUT
             )
-            resp.raise_for_status()
         except RequestError as e:
-            logger.error(f"ネットワーク接続に失敗: \n{traceback.format_exc()}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="国土地理院APIから応答がありません",
-            )
+            if attempt == GSIAPI.MAX_RETRIES:
+                raise
+            reason = f"{e.__class__.__name__}: {e}"
+        else:
+            if resp.status_code not in GSIAPI.RETRY_STATUS_CODES or attempt == GSIAPI.MAX_RETRIES:
+                return resp
+            reason = f"status={resp.status_code}"
 
-        except HTTPStatusError as e:
-            logger.error(f"HTTPステータスエラー: \n{traceback.format_exc()}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="国土地理院APIから応答がありません",
-            )
+        _retries += 1
+        delay = _backoff(attempt)
+        logger.warning(f"[GSI API] リトライ {attempt + 1}回目({delay:.2f}秒後) {reason}")
+        await asyncio.sleep(delay)
 
-        except Exception as e:
-            logger.error(f"サーバーエラー: \n{traceback.format_exc()}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="国土地理院APIへのリクエストが失敗しました",
-            )
-        logger.info(f"[GSI API] リクエスト終了 status={resp.status_code}")
+
+async def fetch_coordinates_from_gsi(params: dict):
+    """
+    国土地理院のAPIから緯度と経度を取得する
+
+    Args:
+        params (dict): パラメータ
+
+    Raises:
+        HTTPException: サーキットブレーカー作動中の場合 (503 Service Unavailable)
+    """
+    if not breaker.allow():
+        logger.warning(f"[GSI API] 連続失敗のためリクエストを中止 params={params}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="国土地理院APIが一時的に利用できません",
+        )
+
+    logger.info(f"[GSI API] リクエスト開始 params={params}")
+    recorded = False
+    try:
+        # 国土地理院のAPIから緯度と経度を取得
+        resp = await _get_with_retry(get_http_client(), params)
+        resp.raise_for_status()
+    except RequestError as e:
+        breaker.record_failure()
+        recorded = True
+        logger.error(f"ネットワーク接続に失敗: \n{traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="国土地理院APIから応答がありません",
+        )
+
+    except HTTPStatusError as e:
+        # 4xxはリクエスト側の問題のためAPIは稼働しているとみなす
+        if e.response.status_code in GSIAPI.RETRY_STATUS_CODES:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        recorded = True
+        logger.error(f"HTTPステータスエラー: \n{traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="国土地理院APIから応答がありません",
+        )
+
+    except Exception as e:
+        breaker.record_failure()
+        recorded = True
+        logger.error(f"サーバーエラー: \n{traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="国土地理院APIへのリクエストが失敗しました",
+        )
+    finally:
+        # キャンセルされた場合は結果を記録せずに試行を終了する
+        if not recorded:
+            breaker.release()
+
+    breaker.record_success()
+    logger.info(f"[GSI API] リクエスト終了 status={resp.status_code}")
 
     return resp
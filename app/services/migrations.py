@@ -0,0 +1,399 @@
+from logging import getLogger
+from typing import Callable, Dict, List, NamedTuple, Sequence, Set, Union
+
+from sqlalchemy import ForeignKeyConstraint, UniqueConstraint, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+# create_allの対象とするため、全てのモデルを読み込む
+from app.models import data_version, geocode_cache, store, stores_tags_table, tag  # noqa: F401
+from database import Base
+
+logger = getLogger("app")
+
+# 複数のプロセス(デプロイ時の複数コンテナなど)から同時に実行された場合に直列化する
+LOCK_ID = 74_210_001
+
+# SQL文字列、またはcreate_allのように同期接続を受け取る関数
+Step = Union[str, Callable[[Connection], None]]
+
+
+class Migration(NamedTuple):
+    """スキーマのバージョン毎の変更(既存のDBに対しても冪等に実行できること)"""
+    version: int
+    description: str
+    steps: Sequence[Step]
+
+
+def _create_all(conn: Connection) -> None:
+    # 既存のテーブルは変更しない(不足分は後続のバージョンで追加する)
+    Base.metadata.create_all(conn, checkfirst=True)
+
+
+def _add_constraint(table: str, name: str, definition: str) -> str:
+    """
+    制約が存在しない場合のみ追加するSQL
+    """
+    return f"""
+    do $$ begin
+      if not exists (select 1 from pg_constraint where conname = '{name}') then
+        alter table {table} add constraint {name} {definition} ;
+      end if ;
+    end $$
+    """
+
+
+def _replace_trigger(name: str, table: str, definition: str) -> List[str]:
+    return [f"drop trigger if exists {name} on {table}", f"create trigger {name} {definition}"]
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "モデルからテーブルを作成", [
+        "create extension if not exists cube",
+        "create extension if not exists earthdistance",
+        "create extension if not exists pg_trgm",
+        _create_all,
+    ]),
+    Migration(2, "ジオコーディングの状態", [
+        "alter table stores alter column lat drop not null",
+        "alter table stores alter column lng drop not null",
+        "alter table stores add column if not exists"
+        " geocode_status character varying(20) default 'resolved' not null",
+        "alter table stores add column if not exists"
+        " geocode_attempts integer default 0 not null",
+        "alter table stores add column if not exists"
+        " geocode_error character varying(200)",
+    ]),
+    Migration(3, "同名タグの統合とタグ名の一意制約", [
+        # 同名のタグはIDが最小のタグに統合する(店舗毎に紐付けが重複する場合は1件を残す)
+        """
+        create temp table tag_merge on commit drop as
+        select id as old_id, min(id) over (partition by tag_name) as new_id from tags
+        """,
+        # 統合後に重複する紐付けを先に削除する(uq_store_tagが既にある場合に更新が失敗しないよう)
+        # 統合先のタグへの紐付けがあればそれを、なければIDが最小の紐付けを残す
+        """
+        delete from stores_tags sst using tag_merge m
+        where sst.tag_id = m.old_id
+          and m.old_id <> m.new_id
+          and exists (
+            select 1
+            from stores_tags k
+            join tag_merge km on km.old_id = k.tag_id
+            where k.store_id = sst.store_id
+              and km.new_id = m.new_id
+              and (k.tag_id = m.new_id or k.id < sst.id)
+          )
+        """,
+        """
+        update stores_tags sst set tag_id = m.new_id
+        from tag_merge m
+        where sst.tag_id = m.old_id and m.old_id <> m.new_id
+        """,
+        """
+        delete from tags t using tag_merge m
+        where t.id = m.old_id and m.old_id <> m.new_id
+        """,
+        _add_constraint("tags", "tags_tag_name_key", "unique (tag_name)"),
+    ]),
+    Migration(4, "外部キー、一意制約と検索・更新用の索引", [
+        # 紐付け先のない行、重複した紐付けは制約の追加前に削除する
+        """
+        delete from stores_tags sst
+        where not exists (select 1 from stores st where st.id = sst.store_id)
+           or not exists (select 1 from tags t where t.id = sst.tag_id)
+        """,
+        """
+        delete from stores_tags a using stores_tags b
+        where a.store_id = b.store_id and a.tag_id = b.tag_id and a.id > b.id
+        """,
+        _add_constraint("stores", "stores_store_id_key", "unique (store_id)"),
+        _add_constraint("tags", "tags_tag_id_key", "unique (tag_id)"),
+        _add_constraint("stores_tags", "stores_tags_stores_tags_id_key", "unique (stores_tags_id)"),
+        _add_constraint("stores_tags", "uq_store_tag", "unique (store_id, tag_id)"),
+        _add_constraint(
+            "stores_tags", "stores_tags_store_id_fkey", "foreign key (store_id) references stores (id)"
+        ),
+        _add_constraint(
+            "stores_tags", "stores_tags_tag_id_fkey", "foreign key (tag_id) references tags (id)"
+        ),
+        "create index if not exists ix_stores_lat_lng on stores (lat, lng)",
+        "create index if not exists ix_stores_geocode_pending"
+        " on stores (id) where geocode_status = 'pending'",
+        "create index if not exists ix_stores_earth on stores using gist (ll_to_earth(lat, lng))",
+        "create index if not exists ix_stores_store_name_trgm"
+        " on stores using gin (store_name gin_trgm_ops)",
+        "create index if not exists ix_stores_tags_tag_id_store_id on stores_tags (tag_id, store_id)",
+        "create index if not exists ix_geocode_cache_expires_at on geocode_cache (expires_at)",
+    ]),
+    Migration(5, "条件付きGET用のデータバージョン", [
+        "insert into data_versions (name) values ('stores') on conflict do nothing",
+        """
+        create or replace function bump_stores_version() returns trigger as $$
+        begin
+          update data_versions
+          set version = version + 1, updated_at = clock_timestamp()
+          where name = 'stores' ;
+          return null ;
+        end ;
+        $$ language plpgsql
+        """,
+        *_replace_trigger(
+            "trg_stores_version", "stores",
+            "after insert or update or delete or truncate on stores"
+            " for each statement execute function bump_stores_version()",
+        ),
+        *_replace_trigger(
+            "trg_stores_tags_version", "stores_tags",
+            "after insert or update or delete or truncate on stores_tags"
+            " for each statement execute function bump_stores_version()",
+        ),
+        *_replace_trigger(
+            "trg_tags_version", "tags",
+            "after insert or update or delete or truncate on tags"
+            " for each statement execute function bump_stores_version()",
+        ),
+    ]),
+    Migration(6, "店舗のタグ名配列", [
+        "alter table stores add column if not exists"
+        " tags character varying(100)[] default '{}' not null",
+        "create index if not exists ix_stores_tags on stores using gin (tags)",
+        """
+        create or replace function refresh_store_tags(store_ids integer[]) returns void as $$
+          update stores st
+          set tags = coalesce((
+            select array_agg(t.tag_name order by t.tag_name)
+            from stores_tags sst
+            join tags t on t.id = sst.tag_id
+            where sst.store_id = st.id
+          ), '{}')
+          where st.id = any(store_ids) ;
+        $$ language sql
+        """,
+        """
+        create or replace function stores_tags_inserted() returns trigger as $$
+        begin
+          perform refresh_store_tags(array(select distinct store_id from new_rows)) ;
+          return null ;
+        end ;
+        $$ language plpgsql
+        """,
+        """
+        create or replace function stores_tags_deleted() returns trigger as $$
+        begin
+          perform refresh_store_tags(array(select distinct store_id from old_rows)) ;
+          return null ;
+        end ;
+        $$ language plpgsql
+        """,
+        """
+        create or replace function stores_tags_updated() returns trigger as $$
+        begin
+          perform refresh_store_tags(array(
+            select store_id from old_rows union select store_id from new_rows
+          )) ;
+          return null ;
+        end ;
+        $$ language plpgsql
+        """,
+        """
+        create or replace function tags_renamed() returns trigger as $$
+        begin
+          perform refresh_store_tags(array(
+            select store_id from stores_tags where tag_id = new.id
+          )) ;
+          return null ;
+        end ;
+        $$ language plpgsql
+        """,
+        *_replace_trigger(
+            "trg_stores_tags_insert_tags", "stores_tags",
+            "after insert on stores_tags referencing new table as new_rows"
+            " for each statement execute function stores_tags_inserted()",
+        ),
+        *_replace_trigger(
+            "trg_stores_tags_delete_tags", "stores_tags",
+            "after delete on stores_tags referencing old table as old_rows"
+            " for each statement execute function stores_tags_deleted()",
+        ),
+        *_replace_trigger(
+            "trg_stores_tags_update_tags", "stores_tags",
+            "after update on stores_tags referencing old table as old_rows new table as new_rows"
+            " for each statement execute function stores_tags_updated()",
+        ),
+        *_replace_trigger(
+            "trg_tags_rename_tags", "tags",
+            "after update of tag_name on tags for each row"
+            " when (old.tag_name is distinct from new.tag_name)"
+            " execute function tags_renamed()",
+        ),
+        # 既存の店舗のタグ名配列を作成する
+        "select refresh_store_tags(array(select id from stores))",
+    ]),
+]
+
+# 書き込み時にデータバージョンとタグ名配列を更新するトリガー
+EXPECTED_TRIGGERS: Dict[str, str] = {
+    "trg_stores_version": "stores",
+    "trg_stores_tags_version": "stores_tags",
+    "trg_tags_version": "tags",
+    "trg_stores_tags_insert_tags": "stores_tags",
+    "trg_stores_tags_delete_tags": "stores_tags",
+    "trg_stores_tags_update_tags": "stores_tags",
+    "trg_tags_rename_tags": "tags",
+}
+
+_CREATE_MIGRATIONS_TABLE = """
+    create table if not exists schema_migrations (
+      version integer not null primary key
+      , description character varying(200) not null
+      , applied_at timestamp(6) with time zone default CURRENT_TIMESTAMP not null
+    )
+"""
+
+_INSERT_MIGRATION = text(
+    "insert into schema_migrations (version, description) values (:version, :description)"
+)
+
+
+class SchemaReport(NamedTuple):
+    """未適用のバージョンと、不足している索引・制約・トリガー"""
+    pending: List[int]
+    missing_indexes: List[str]
+    missing_foreign_keys: List[str]
+    missing_triggers: List[str]
+
+    @property
+    def ok(self) -> bool:
+        return not (
+            self.pending or self.missing_indexes
+            or self.missing_foreign_keys or self.missing_triggers
+        )
+
+
+def expected_indexes() -> Set[str]:
+    """
+    モデルに定義されている索引と一意制約(一意制約の索引)の名前
+    名前のない一意制約はPostgreSQLの命名規則(テーブル名_カラム名_key)とする
+    """
+    names = set()
+    for table in Base.metadata.tables.values():
+        names.update(index.name for index in table.indexes)
+        for constraint in table.constraints:
+            if isinstance(constraint, UniqueConstraint):
+                columns = "_".join(column.name for column in constraint.columns)
+                names.add(constraint.name or f"{table.name}_{columns}_key")
+    return names
+
+
+def expected_foreign_keys() -> Set[str]:
+    """
+    モデルに定義されている外部キーの名前(名前のない外部キーはテーブル名_カラム名_fkey)
+    """
+    names = set()
+    for table in Base.metadata.tables.values():
+        for constraint in table.constraints:
+            if isinstance(constraint, ForeignKeyConstraint):
+                columns = "_".join(column.name for column in constraint.columns)
+                names.add(constraint.name or f"{table.name}_{columns}_fkey")
+    return names
+
+
+async def _applied_versions(conn: AsyncConnection) -> Set[int]:
+    result = await conn.exec_driver_sql("select version from schema_migrations")
+    return {row.version for row in result}
+
+
+async def _run_step(conn: AsyncConnection, step: Step) -> None:
+    if callable(step):
+        await conn.run_sync(step)
+    else:
+        await conn.exec_driver_sql(step)
+
+
+async def migrate(engine: AsyncEngine) -> List[int]:
+    """
+    未適用のバージョンを順番に適用する(バージョン毎に1トランザクション)
+    適用済みのバージョンはschema_migrationsに記録し、再実行しない
+
+    Args:
+        engine (AsyncEngine): 非同期エンジン
+
+    Returns:
+        List[int]: 今回適用したバージョン
+    """
+    applied_now: List[int] = []
+    async with engine.connect() as conn:
+        await conn.exec_driver_sql(_CREATE_MIGRATIONS_TABLE)
+        await conn.commit()
+
+        # セッション単位のロックのため、各バージョンのコミット後も保持される
+        await conn.exec_driver_sql(f"select pg_advisory_lock({LOCK_ID})")
+        await conn.commit()
+        try:
+            applied = await _applied_versions(conn)
+            await conn.commit()
+            for migration in MIGRATIONS:
+                if migration.version in applied:
+                    continue
+                logger.info(f"マイグレーション開始: {migration.version} {migration.description}")
+                try:
+                    for step in migration.steps:
+                        await _run_step(conn, step)
+                    await conn.execute(
+                        _INSERT_MIGRATION,
+                        {"version": migration.version, "description": migration.description},
+                    )
+                    await conn.commit()
+                except Exception:
+                    await conn.rollback()
+                    logger.exception(f"マイグレーション失敗: {migration.version}")
+                    raise
+                applied_now.append(migration.version)
+                logger.info(f"マイグレーション終了: {migration.version}")
+        finally:
+            await conn.exec_driver_sql(f"select pg_advisory_unlock({LOCK_ID})")
+            await conn.commit()
+
+    return applied_now
+
+
+async def check_schema(engine: AsyncEngine) -> SchemaReport:
+    """
+    既存のDBについて、未適用のバージョンと不足している索引・外部キー・トリガーを確認する(変更は行わない)
+
+    Args:
+        engine (AsyncEngine): 非同期エンジン
+
+    Returns:
+        SchemaReport: 確認結果
+    """
+    async with engine.connect() as conn:
+        exists = (await conn.exec_driver_sql(
+            "select to_regclass('schema_migrations') is not null"
+        )).scalar()
+        applied = await _applied_versions(conn) if exists else set()
+
+        indexes = {
+            row.indexname for row in await conn.exec_driver_sql(
+                "select indexname from pg_indexes where schemaname = current_schema()"
+            )
+        }
+        foreign_keys = {
+            row.conname for row in await conn.exec_driver_sql(
+                "select conname from pg_constraint where contype = 'f'"
+                " and connamespace = current_schema()::regnamespace"
+            )
+        }
+        triggers = {
+            row.tgname for row in await conn.exec_driver_sql(
+                "select tgname from pg_trigger where not tgisinternal"
+            )
+        }
+
+    return SchemaReport(
+        pending=[m.version for m in MIGRATIONS if m.version not in applied],
+        missing_indexes=sorted(expected_indexes() - indexes),
+        missing_foreign_keys=sorted(expected_foreign_keys() - foreign_keys),
+        missing_triggers=sorted(set(EXPECTED_TRIGGERS) - triggers),
+    )
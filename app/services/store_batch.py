@@ -0,0 +1,87 @@
+import uuid
+from logging import getLogger
+from typing import Dict, List, NamedTuple
+
+from sqlalchemy import Integer, insert, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from app.config.constants import GeocodeStatus
+from app.models.store import Store
+from app.models.stores_tags_table import stores_tags_table
+from app.schemas.stores import StoreCreateRequest
+from app.services.geocode_worker import GeocodeJob
+from app.services.tags import resolve_tag_ids
+
+logger = getLogger("app")
+
+
+class BatchResult(NamedTuple):
+    """一括作成した店舗(リクエスト順)と、使用したタグ"""
+    jobs: List[GeocodeJob]
+    tag_ids: Dict[str, int]
+
+
+def _insert_stores_tags_stmt(store_pks: List[int], tag_pks: List[int]):
+    """
+    中間テーブルへの登録を1つのSQLにする
+    (件数に関わらずバインド変数は配列3つのため、パラメータ数の上限に影響されない)
+    """
+    return insert(stores_tags_table).from_select(
+        ["stores_tags_id", "store_id", "tag_id"],
+        select(
+            func.unnest(
+                literal([uuid.uuid4() for _ in store_pks], ARRAY(UUID(as_uuid=True)))
+            ),
+            func.unnest(literal(store_pks, ARRAY(Integer))),
+            func.unnest(literal(tag_pks, ARRAY(Integer))),
+        ),
+    )
+
+
+async def create_stores(db: AsyncSession, stores: List[StoreCreateRequest]) -> BatchResult:
+    """
+    複数の店舗をまとめて登録する
+    タグの取得・追加、店舗の追加、中間テーブルの追加をそれぞれ1つのSQLで行う
+    緯度、経度はジオコーディング処理待ちとする。トランザクションは呼び出し元で管理する
+
+    Args:
+        db (AsyncSession): DBセッション(トランザクション内)
+        stores (List[StoreCreateRequest]): 店舗作成用のリクエストモデル
+
+    Returns:
+        BatchResult: 登録した店舗のジオコーディング対象と、使用したタグ
+    """
+    tag_ids = await resolve_tag_ids(db, (tag for store in stores for tag in store.tags))
+
+    store_dicts = [
+        {
+            "store_id": uuid.uuid4(),
+            "store_name": store.storeName,
+            "address": store.address,
+            "content": store.content,
+            "geocode_status": GeocodeStatus.PENDING,
+        }
+        for store in stores
+    ]
+    insert_stores_stmt = insert(Store).values(store_dicts).returning(Store.id, Store.store_id)
+    # RETURNINGの順序は保証されないため、店舗UUIDでPKを対応付ける
+    store_pks = {
+        row.store_id: row.id for row in (await db.execute(insert_stores_stmt)).all()
+    }
+
+    link_store_pks: List[int] = []
+    link_tag_pks: List[int] = []
+    for store, store_dict in zip(stores, store_dicts):
+        for tag_name in dict.fromkeys(store.tags):
+            link_store_pks.append(store_pks[store_dict["store_id"]])
+            link_tag_pks.append(tag_ids[tag_name])
+
+    if link_store_pks:
+        await db.execute(_insert_stores_tags_stmt(link_store_pks, link_tag_pks))
+
+    logger.info(f"店舗一括作成: 店舗={len(store_dicts)}件, 中間テーブル={len(link_store_pks)}件")
+
+    jobs = [GeocodeJob(store_dict["store_id"], store_dict["address"]) for store_dict in store_dicts]
+    return BatchResult(jobs, tag_ids)
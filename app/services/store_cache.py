@@ -0,0 +1,42 @@
+from typing import Any, Hashable, Optional
+from uuid import UUID
+
+from app.config.constants import ResponseCache
+from app.utils.lru_cache import LRUCache
+
+# 検索条件 -> 店舗一覧レスポンス
+stores_cache = LRUCache(maxsize=ResponseCache.STORES_SIZE, ttl=ResponseCache.TTL)
+# 店舗ID -> 店舗詳細レスポンス
+store_cache = LRUCache(maxsize=ResponseCache.STORE_SIZE, ttl=ResponseCache.TTL)
+
+# 無効化が発生する度に加算し、DB取得中に無効化された結果をキャッシュしないために使用
+_generation = 0
+
+
+def current_generation() -> int:
+    return _generation
+
+
+def cache_response(cache: LRUCache, key: Hashable, value: Any, generation: int) -> None:
+    """
+    DB取得開始時点から無効化が発生していない場合のみ、レスポンスをキャッシュする
+    """
+    if generation == _generation:
+        cache.set(key, value)
+
+
+def invalidate_store(store_id: Optional[UUID] = None) -> None:
+    """
+    店舗の登録・更新・削除に伴い、一覧と該当店舗のキャッシュを無効化する
+
+    Args:
+        store_id (Optional[UUID]): 変更のあった店舗ID(Noneの場合は全店舗)
+    """
+    global _generation
+    _generation += 1
+    stores_cache.clear()
+    if store_id is None:
+        store_cache.clear()
+    else:
+        store_cache.pop(UUID(str(store_id)))
+
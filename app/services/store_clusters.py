@@ -0,0 +1,119 @@
+from logging import getLogger
+from typing import List, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.constants import Cluster
+from app.queries.stores import select_store_clusters_stmt
+from app.utils.geo import (BoundingBox, lat_to_tile_y, lng_to_tile_x,
+                           point_tiles, tile_bounds)
+from app.utils.lru_cache import LRUCache
+
+logger = getLogger("app")
+
+# (ズーム, セルX, セルY) -> クラスタ(店舗なしのセルはNone)
+cluster_cache = LRUCache(maxsize=Cluster.CACHE_SIZE)
+
+# 無効化が発生する度に加算し、集計中に無効化されたセルをキャッシュしないために使用
+_generation = 0
+
+
+def cell_zoom(zoom: int) -> int:
+    return zoom + Cluster.GRID_OFFSET
+
+
+def cell_range(zoom: int, bbox: BoundingBox) -> Tuple[int, int, int, int]:
+    """
+    範囲を覆うセルの範囲(x_min, y_min, x_max, y_max)を求める
+
+    Raises:
+        HTTPException: 範囲内のセル数が上限を超える場合 (400 Bad Request)
+    """
+    z = cell_zoom(zoom)
+    x_min, x_max = lng_to_tile_x(bbox.min_lng, z), lng_to_tile_x(bbox.max_lng, z)
+    y_min, y_max = lat_to_tile_y(bbox.max_lat, z), lat_to_tile_y(bbox.min_lat, z)
+
+    if (x_max - x_min + 1) * (y_max - y_min + 1) > Cluster.MAX_CELLS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="表示範囲が広すぎます",
+        )
+    return x_min, y_min, x_max, y_max
+
+
+async def get_clusters(db: AsyncSession, zoom: int, bbox: BoundingBox) -> List[dict]:
+    """
+    範囲内の店舗クラスタを取得する
+    キャッシュにないセルのみDBで集計し、集計結果はセル単位でキャッシュする
+
+    Args:
+        db (AsyncSession): DBセッション
+        zoom (int): ズームレベル
+        bbox (BoundingBox): 取得範囲
+
+    Returns:
+        List[dict]: クラスタ(lat, lng, count)のリスト
+    """
+    z = cell_zoom(zoom)
+    x_min, y_min, x_max, y_max = cell_range(zoom, bbox)
+
+    cells = [(x, y) for x in range(x_min, x_max + 1) for y in range(y_min, y_max + 1)]
+    missing = [cell for cell in cells if (zoom, *cell) not in cluster_cache]
+
+    if missing:
+        # 未キャッシュのセルを覆う矩形をまとめて1回で集計する
+        mx_min, mx_max = min(x for x, _ in missing), max(x for x, _ in missing)
+        my_min, my_max = min(y for _, y in missing), max(y for _, y in missing)
+        logger.info(
+            f"クラスタ集計: zoom={zoom}, x={mx_min}-{mx_max}, y={my_min}-{my_max}"
+        )
+
+        generation = _generation
+        stmt = select_store_clusters_stmt(z, tile_bounds(mx_min, my_min, mx_max, my_max, z))
+        rows = (await db.execute(stmt)).mappings().all()
+
+        fresh = {
+            (mx, my): None
+            for mx in range(mx_min, mx_max + 1)
+            for my in range(my_min, my_max + 1)
+        }
+        for row in rows:
+            if (row["x"], row["y"]) in fresh:
+                fresh[(row["x"], row["y"])] = {
+                    "lat": float(row["lat"]),
+                    "lng": float(row["lng"]),
+                    "count": row["count"],
+                }
+
+        # 集計中に無効化が発生した場合は結果をキャッシュしない
+        if generation == _generation:
+            for (mx, my), cluster in fresh.items():
+                cluster_cache.set((zoom, mx, my), cluster)
+    else:
+        fresh = {}
+
+    clusters = []
+    for cell in cells:
+        cluster = fresh[cell] if cell in fresh else cluster_cache.get((zoom, *cell))
+        if cluster is not None:
+            clusters.append(cluster)
+    return clusters
+
+
+def invalidate_store_location(lat: float, lng: float) -> None:
+    """
+    地点を含むセルのキャッシュを全ズームレベルで無効化する
+
+    Args:
+        lat (float): 緯度
+        lng (float): 経度
+    """
+    global _generation
+    if lat is None or lng is None:
+        return
+
+    _generation += 1
+    for zoom in range(Cluster.MAX_ZOOM + 1):
+        for x, y in point_tiles(lat, lng, cell_zoom(zoom)):
+            cluster_cache.pop((zoom, x, y))
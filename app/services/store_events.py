@@ -0,0 +1,44 @@
+from typing import Optional, Tuple
+from uuid import UUID
+
+from app.services import store_cache, store_clusters, store_tiles, tags
+
+
+def store_changed(
+    store_id: Optional[UUID],
+    *locations: Tuple[Optional[float], Optional[float]],
+) -> None:
+    """
+    店舗の登録・更新・削除後に、変更のあった店舗と地点に関するキャッシュを無効化する
+
+    Args:
+        store_id (Optional[UUID]): 変更のあった店舗ID
+        locations (Tuple[Optional[float], Optional[float]]): 変更前後の(緯度, 経度)
+    """
+    store_cache.invalidate_store(store_id)
+    for lat, lng in locations:
+        store_clusters.invalidate_store_location(lat, lng)
+        store_tiles.invalidate_store_location(lat, lng)
+
+
+def clear_store_caches() -> None:
+    """
+    店舗関連の全キャッシュを破棄する
+    """
+    store_cache.invalidate_store(None)
+    store_clusters.cluster_cache.clear()
+    store_tiles.tile_cache.clear()
+    tags.tag_cache.clear()
+
+
+def cache_stats() -> dict:
+    """
+    店舗関連の各キャッシュの統計情報を取得する
+    """
+    return {
+        "stores": store_cache.stores_cache.stats(),
+        "store": store_cache.store_cache.stats(),
+        "clusters": store_clusters.cluster_cache.stats(),
+        "tiles": store_tiles.tile_cache.stats(),
+        "tags": tags.tag_cache.stats(),
+    }
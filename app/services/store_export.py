@@ -0,0 +1,119 @@
+import csv
+import io
+import json
+from logging import getLogger
+from typing import AsyncIterator, Iterable, List
+
+from sqlalchemy.engine import Row
+
+from app.config.constants import Export
+from app.queries.stores import select_export_stores_stmt
+from app.utils.geojson import point_feature
+from database import get_async_engine
+
+logger = getLogger("app")
+
+# 形式 -> (Content-Type, 拡張子)
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "geojson": ("application/geo+json", "geojson"),
+}
+
+CSV_COLUMNS = [
+    "storeId", "storeName", "address", "content",
+    "lat", "lng", "tags", "createdAt", "updatedAt",
+]
+
+
+def export_record(row: Row) -> dict:
+    """
+    エクスポートする店舗の1行をキャメルケースの辞書にする
+    """
+    return {
+        "storeId": str(row.store_id),
+        "storeName": row.store_name,
+        "address": row.address,
+        "content": row.content,
+        "lat": row.lat,
+        "lng": row.lng,
+        "tags": list(row.tags),
+        "createdAt": row.created_at.isoformat(),
+        "updatedAt": row.updated_at.isoformat(),
+    }
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _encode_ndjson(rows: Iterable[Row]) -> str:
+    return "".join(_dumps(export_record(row)) + "\n" for row in rows)
+
+
+def _encode_csv(rows: Iterable[Row]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for row in rows:
+        record = export_record(row)
+        # タグはJSON配列の文字列として1列に出力する
+        record["tags"] = _dumps(record["tags"])
+        writer.writerow(record[column] for column in CSV_COLUMNS)
+    return buffer.getvalue()
+
+
+def _encode_geojson(rows: List[Row], first: bool) -> str:
+    features = []
+    for row in rows:
+        record = export_record(row)
+        lng, lat = record.pop("lng"), record.pop("lat")
+        features.append(_dumps(point_feature(lng, lat, record, record["storeId"])))
+    return ("" if first else ",") + ",".join(features)
+
+
+async def stream_stores(export_format: str) -> AsyncIterator[bytes]:
+    """
+    全店舗をサーバーサイドカーソルで少しずつ取得し、指定形式に変換して返す
+    全件をメモリに載せないため、店舗数が増えてもメモリ使用量は一定となる
+    リクエストのDBセッションはレスポンス送信前に閉じられるため、専用の接続を使用する
+
+    Args:
+        export_format (str): 出力形式(ndjson, csv, geojson)
+
+    Returns:
+        AsyncIterator[bytes]: 出力データ
+    """
+    logger.info(f"店舗エクスポート開始: format={export_format}")
+    count = 0
+
+    if export_format == "csv":
+        # Excelで文字化けしないようBOMを付ける
+        yield ("\ufeff" + ",".join(CSV_COLUMNS) + "\n").encode("utf-8")
+    elif export_format == "geojson":
+        yield b'{"type":"FeatureCollection","features":['
+
+    try:
+        async with get_async_engine().connect() as conn:
+            async with conn.begin():
+                stmt = select_export_stores_stmt().execution_options(
+                    yield_per=Export.YIELD_PER
+                )
+                result = await conn.stream(stmt)
+                async for rows in result.partitions():
+                    if export_format == "ndjson":
+                        chunk = _encode_ndjson(rows)
+                    elif export_format == "csv":
+                        chunk = _encode_csv(rows)
+                    else:
+                        chunk = _encode_geojson(rows, first=count == 0)
+                    count += len(rows)
+                    yield chunk.encode("utf-8")
+    except Exception as e:
+        # ヘッダー送信後のためステータスコードは変更できない(途中で切断される)
+        logger.error(f"店舗エクスポート失敗: {e.__class__.__name__}: {e}")
+        raise
+
+    if export_format == "geojson":
+        yield b"]}"
+
+    logger.info(f"店舗エクスポート終了: format={export_format}, count={count}")
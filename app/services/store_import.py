@@ -0,0 +1,244 @@
+from logging import getLogger
+from typing import AsyncIterable, List, NamedTuple, Optional, Union
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.config.constants import GeocodeStatus
+from app.services.geocode_worker import GeocodeJob
+
+logger = getLogger("app")
+
+# COPYの入力(ファイルパスまたはバイト列の非同期イテレータ)
+CopySource = Union[str, AsyncIterable[bytes]]
+
+# db/bkのCSVと同じ列構成
+STORES_COLUMNS = [
+    "id", "store_id", "store_name", "address", "content",
+    "lat", "lng", "created_at", "updated_at",
+]
+TAGS_COLUMNS = ["id", "tag_id", "tag_name", "created_at", "updated_at"]
+STORES_TAGS_COLUMNS = [
+    "id", "stores_tags_id", "store_id", "tag_id", "created_at", "updated_at",
+]
+
+# CSVの値は全て文字列で取り込み、型変換はマージ時にまとめて行う
+# (トランザクション終了時に破棄する一時テーブル)
+_CREATE_STAGING = [
+    """
+    create temp table import_stores (
+      id text, store_id text, store_name text, address text, content text
+      , lat text, lng text, created_at text, updated_at text
+    ) on commit drop
+    """,
+    """
+    create temp table import_tags (
+      id text, tag_id text, tag_name text, created_at text, updated_at text
+    ) on commit drop
+    """,
+    """
+    create temp table import_stores_tags (
+      id text, stores_tags_id text, store_id text, tag_id text
+      , created_at text, updated_at text
+    ) on commit drop
+    """,
+]
+
+# CSVのUUIDは{}で囲まれているため取り除く(未指定の店舗UUIDはマージ前に採番済み)
+# 同じ店舗UUIDの行が複数ある場合は後の行を優先する
+_MERGE_STORES = text(
+    """
+    with source as (
+      select distinct on (store_uuid) *
+      from (
+        select
+          nullif(id, '')::bigint as id
+          , btrim(store_id, '{} ')::uuid as store_uuid
+          , store_name, address, content
+          , nullif(lat, '')::double precision as lat
+          , nullif(lng, '')::double precision as lng
+          , coalesce(nullif(created_at, '')::timestamp, CURRENT_TIMESTAMP) as created_at
+          , coalesce(nullif(updated_at, '')::timestamp, CURRENT_TIMESTAMP) as updated_at
+        from import_stores
+      ) s
+      order by store_uuid, id desc nulls last
+    )
+    , merged as (
+      insert into stores (
+        store_id, store_name, address, content, lat, lng
+        , geocode_status, created_at, updated_at
+      )
+      select
+        store_uuid, store_name, address, content, lat, lng
+        , case when lat is null or lng is null then :pending else :resolved end
+        , created_at, updated_at
+      from source
+      on conflict (store_id) do update set
+        store_name = excluded.store_name
+        , address = excluded.address
+        , content = excluded.content
+        -- 緯度経度が未指定の場合は既存の値を保持し、住所が変わった場合のみ再取得する
+        , lat = coalesce(excluded.lat, stores.lat)
+        , lng = coalesce(excluded.lng, stores.lng)
+        , geocode_status = case
+            when excluded.geocode_status = :resolved then :resolved
+            when stores.address is distinct from excluded.address then :pending
+            else stores.geocode_status
+          end
+        , geocode_attempts = case
+            when excluded.geocode_status = :resolved
+              or stores.address is distinct from excluded.address then 0
+            else stores.geocode_attempts
+          end
+        , geocode_error = case
+            when excluded.geocode_status = :resolved
+              or stores.address is distinct from excluded.address then null
+            else stores.geocode_error
+          end
+        , updated_at = CURRENT_TIMESTAMP
+      returning (xmax = 0) as inserted
+    )
+    select
+      count(*) filter (where inserted) as inserted
+      , count(*) filter (where not inserted) as updated
+    from merged
+    """
+)
+
+# タグ名が既に存在する場合は既存のタグを使用する(tags_tag_name_key)
+_MERGE_TAGS = text(
+    """
+    insert into tags (tag_id, tag_name, created_at, updated_at)
+    select distinct on (s.tag_name)
+      coalesce(nullif(btrim(s.tag_id, '{} '), '')::uuid, gen_random_uuid())
+      , s.tag_name
+      , coalesce(nullif(s.created_at, '')::timestamp, CURRENT_TIMESTAMP)
+      , coalesce(nullif(s.updated_at, '')::timestamp, CURRENT_TIMESTAMP)
+    from import_tags s
+    where s.tag_name <> ''
+    order by s.tag_name, nullif(s.id, '')::bigint
+    on conflict (tag_name) do nothing
+    """
+)
+
+# CSV内の店舗ID、タグIDをCSVの店舗UUID、タグ名を介してDBのIDに置き換える
+_MERGE_STORES_TAGS = text(
+    """
+    insert into stores_tags (stores_tags_id, store_id, tag_id)
+    select
+      coalesce(nullif(btrim(sst.stores_tags_id, '{} '), '')::uuid, gen_random_uuid())
+      , st.id
+      , t.id
+    from import_stores_tags sst
+    join import_stores s on s.id = sst.store_id
+    join stores st on st.store_id = btrim(s.store_id, '{} ')::uuid
+    join import_tags it on it.id = sst.tag_id
+    join tags t on t.tag_name = it.tag_name
+    on conflict do nothing
+    """
+)
+
+_SELECT_PENDING = text(
+    """
+    select st.store_id, st.address
+    from stores st
+    where st.store_id in (select btrim(store_id, '{} ')::uuid from import_stores)
+      and st.geocode_status = :pending
+    order by st.id
+    """
+)
+
+
+class ImportResult(NamedTuple):
+    """一括登録の結果件数と、ジオコーディングが必要な店舗"""
+    stores_inserted: int
+    stores_updated: int
+    tags_inserted: int
+    stores_tags_inserted: int
+    pending: List[GeocodeJob]
+
+
+async def _copy(conn: AsyncConnection, table: str, columns: List[str], source: CopySource) -> int:
+    """
+    CSVをCOPYで一時テーブルに取り込む
+
+    Returns:
+        int: 取り込んだ行数
+    """
+    raw = await conn.get_raw_connection()
+    status = await raw.driver_connection.copy_to_table(
+        table,
+        source=source,
+        columns=columns,
+        format="csv",
+        header=True,
+        encoding="utf-8",
+    )
+    # 戻り値は"COPY <行数>"
+    return int(status.split()[-1])
+
+
+async def import_stores(
+    conn: AsyncConnection,
+    stores: CopySource,
+    tags: Optional[CopySource] = None,
+    stores_tags: Optional[CopySource] = None,
+) -> ImportResult:
+    """
+    db/bkと同じ列構成のCSVを一時テーブルにCOPYし、店舗、タグ、中間テーブルにまとめて登録する
+    店舗UUIDが一致する店舗は更新する。緯度経度のない店舗はジオコーディング処理待ちにする
+    トランザクションは呼び出し元で管理する
+
+    Args:
+        conn (AsyncConnection): DB接続(asyncpg)
+        stores (CopySource): 店舗CSV
+        tags (Optional[CopySource]): タグCSV
+        stores_tags (Optional[CopySource]): 店舗とタグの中間テーブルCSV
+
+    Returns:
+        ImportResult: 登録結果
+    """
+    for ddl in _CREATE_STAGING:
+        await conn.execute(text(ddl))
+
+    copied = await _copy(conn, "import_stores", STORES_COLUMNS, stores)
+    logger.info(f"店舗CSV取り込み: {copied}件")
+    if tags is not None:
+        copied = await _copy(conn, "import_tags", TAGS_COLUMNS, tags)
+        logger.info(f"タグCSV取り込み: {copied}件")
+    if stores_tags is not None:
+        copied = await _copy(conn, "import_stores_tags", STORES_TAGS_COLUMNS, stores_tags)
+        logger.info(f"中間テーブルCSV取り込み: {copied}件")
+
+    # 店舗UUIDが未指定の行は、中間テーブルの対応付けのためここで採番する
+    await conn.execute(
+        text(
+            "update import_stores set store_id = gen_random_uuid()::text"
+            " where nullif(btrim(store_id, '{} '), '') is null"
+        )
+    )
+
+    # 結合、重複チェックの前に統計情報を更新する
+    for table in ("import_stores", "import_tags", "import_stores_tags"):
+        await conn.execute(text(f"analyze {table}"))
+
+    params = {"pending": GeocodeStatus.PENDING, "resolved": GeocodeStatus.RESOLVED}
+    stores_result = (await conn.execute(_MERGE_STORES, params)).one()
+    tags_inserted = (await conn.execute(_MERGE_TAGS)).rowcount
+    stores_tags_inserted = (await conn.execute(_MERGE_STORES_TAGS)).rowcount
+
+    pending_rows = (await conn.execute(_SELECT_PENDING, params)).all()
+
+    result = ImportResult(
+        stores_inserted=stores_result.inserted,
+        stores_updated=stores_result.updated,
+        tags_inserted=tags_inserted,
+        stores_tags_inserted=stores_tags_inserted,
+        pending=[GeocodeJob(row.store_id, row.address) for row in pending_rows],
+    )
+    logger.info(
+        f"一括登録: 店舗追加={result.stores_inserted}, 店舗更新={result.stores_updated}, "
+        f"タグ追加={result.tags_inserted}, 中間テーブル追加={result.stores_tags_inserted}, "
+        f"ジオコーディング待ち={len(result.pending)}"
+    )
+    return result
@@ -0,0 +1,99 @@
+import json
+from logging import getLogger
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.constants import Tile
+from app.queries.stores import select_tile_stores_stmt
+from app.utils.geo import point_tiles, tile_bounds, tile_pixel
+from app.utils.lru_cache import LRUCache
+from app.utils.mvt import PointFeature, encode_point_layer
+
+logger = getLogger("app")
+
+# (ズーム, タイルX, タイルY) -> エンコード済みタイル
+tile_cache = LRUCache(maxsize=Tile.CACHE_SIZE)
+
+# 無効化が発生する度に加算し、生成中に無効化されたタイルをキャッシュしないために使用
+_generation = 0
+
+
+def validate_tile(z: int, x: int, y: int) -> None:
+    """
+    タイル座標がズームレベルの範囲内かチェックする
+
+    Raises:
+        HTTPException: タイル座標が範囲外の場合 (400 Bad Request)
+    """
+    n = 2 ** z
+    if not (0 <= x < n and 0 <= y < n):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="タイル座標が不正です",
+        )
+
+
+async def get_tile(db: AsyncSession, z: int, x: int, y: int) -> bytes:
+    """
+    店舗マーカーのベクタータイルを取得する(未キャッシュの場合のみ生成)
+
+    Args:
+        db (AsyncSession): DBセッション
+        z (int): ズームレベル
+        x (int): タイルX座標
+        y (int): タイルY座標
+
+    Returns:
+        bytes: Mapbox Vector Tile形式のバイト列
+    """
+    tile = tile_cache.get((z, x, y))
+    if tile is not None:
+        return tile
+
+    logger.info(f"タイル生成: z={z}, x={x}, y={y}")
+
+    generation = _generation
+    stmt = select_tile_stores_stmt(tile_bounds(x, y, x, y, z))
+    rows = (await db.execute(stmt)).mappings().all()
+
+    features = []
+    for row in rows:
+        px, py = tile_pixel(row["lat"], row["lng"], x, y, z, Tile.EXTENT)
+        features.append(
+            # 地物IDは設定しない(内部の主キーを公開しないため。店舗は属性のstoreIdで識別する)
+            PointFeature(
+                x=px,
+                y=py,
+                properties={
+                    "storeId": str(row["store_id"]),
+                    "storeName": row["store_name"],
+                    # MVTの属性値は配列を持てないためJSON文字列で格納する
+                    "tags": json.dumps(row["tags"], ensure_ascii=False),
+                },
+            )
+        )
+    tile = encode_point_layer(Tile.LAYER_NAME, features, Tile.EXTENT)
+
+    # 生成中に無効化が発生した場合は結果をキャッシュしない
+    if generation == _generation:
+        tile_cache.set((z, x, y), tile)
+    return tile
+
+
+def invalidate_store_location(lat: float, lng: float) -> None:
+    """
+    地点を含むタイルのキャッシュを全ズームレベルで無効化する
+
+    Args:
+        lat (float): 緯度
+        lng (float): 経度
+    """
+    global _generation
+    if lat is None or lng is None:
+        return
+
+    _generation += 1
+    for z in range(Tile.MAX_ZOOM + 1):
+        for x, y in point_tiles(lat, lng, z):
+            tile_cache.pop((z, x, y))
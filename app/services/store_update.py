@@ -0,0 +1,150 @@
+from logging import getLogger
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from sqlalchemy import TextClause, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.constants import GeocodeStatus
+from app.schemas.stores import StoreUpdateRequest
+
+logger = getLogger("app")
+
+# 店舗を行ロックし、変更前の緯度経度を取得したうえで更新する
+# (リクエストに含まれない項目は変更しない。タグのみの更新でも更新日時は更新する)
+_UPDATE_STORE_CTE = """
+    with old as (
+      select id, lat, lng from stores where store_id = :store_id for update
+    )
+    , updated as (
+      update stores st set
+        store_name = coalesce(cast(:store_name as varchar), st.store_name)
+        , address = coalesce(cast(:address as varchar), st.address)
+        , content = coalesce(cast(:content as varchar), st.content)
+        -- 住所が変更される場合はジオコーディング処理待ちにする(緯度経度は完了まで保持)
+        , geocode_status = case
+            when cast(:address as varchar) is null then st.geocode_status else :pending
+          end
+        , geocode_attempts = case
+            when cast(:address as varchar) is null then st.geocode_attempts else 0
+          end
+        , geocode_error = case
+            when cast(:address as varchar) is null then st.geocode_error
+          end
+        , updated_at = CURRENT_TIMESTAMP
+      from old
+      where st.id = old.id
+    )
+"""
+
+_UPDATE_STORE = text(
+    _UPDATE_STORE_CTE
+    + """
+    select old.lat, old.lng, null::integer as tag_id, null::varchar as tag_name
+    from old
+    """
+)
+
+# タグを指定されたタグ名に置き換える
+# 未登録のタグは追加し(店舗が存在する場合のみ)、指定外のタグの紐付けを削除、不足分を追加する
+# 同時に追加されたタグはON CONFLICTで待機後もこのSQLのスナップショットからは見えないため、
+# 結果のタグが不足する場合は呼び出し元で再実行する
+_UPDATE_STORE_TAGS = text(
+    _UPDATE_STORE_CTE
+    + """
+    , wanted as (
+      select distinct unnest(cast(:tag_names as varchar[])) as tag_name
+    )
+    , inserted_tags as (
+      insert into tags (tag_id, tag_name)
+      select gen_random_uuid(), w.tag_name
+      from wanted w
+      where exists (select 1 from old)
+      on conflict (tag_name) do nothing
+      returning id, tag_name
+    )
+    , tag_ids as (
+      select id, tag_name from inserted_tags
+      union all
+      select t.id, t.tag_name from tags t join wanted w on w.tag_name = t.tag_name
+    )
+    , deleted as (
+      delete from stores_tags sst
+      using old
+      where sst.store_id = old.id
+        and sst.tag_id not in (select id from tag_ids)
+    )
+    , linked as (
+      insert into stores_tags (stores_tags_id, store_id, tag_id)
+      select gen_random_uuid(), old.id, tag_ids.id
+      from old cross join tag_ids
+      on conflict (store_id, tag_id) do nothing
+    )
+    select old.lat, old.lng, tag_ids.id as tag_id, tag_ids.tag_name
+    from old left join tag_ids on true
+    """
+)
+
+
+class UpdateResult(NamedTuple):
+    """変更前の緯度経度と、紐付けたタグ"""
+    lat: Optional[float]
+    lng: Optional[float]
+    tag_ids: Dict[str, int]
+
+
+def update_store_stmt(store: StoreUpdateRequest) -> Tuple[TextClause, Dict[str, Any]]:
+    """
+    店舗更新のSQLとパラメータを作成する(タグを指定した場合はタグの置き換えを含むSQL)
+
+    Args:
+        store (StoreUpdateRequest): 店舗更新リクエストモデル
+
+    Returns:
+        Tuple[TextClause, Dict[str, Any]]: SQLとパラメータ
+    """
+    params = {
+        "store_id": store.storeId,
+        "store_name": store.storeName,
+        "address": store.address,
+        "content": store.content,
+        "pending": GeocodeStatus.PENDING,
+    }
+    if store.tags is None:
+        return _UPDATE_STORE, params
+
+    params["tag_names"] = list(dict.fromkeys(store.tags))
+    return _UPDATE_STORE_TAGS, params
+
+
+async def update_store_and_tags(
+    db: AsyncSession,
+    store: StoreUpdateRequest,
+) -> Optional[UpdateResult]:
+    """
+    店舗の更新とタグの置き換えを1つのSQLで行う(通常は1往復)
+    タグがNoneの場合はタグを変更せず、空の場合は全てのタグの紐付けを削除する
+    トランザクションは呼び出し元で管理する
+
+    Args:
+        db (AsyncSession): DBセッション(トランザクション内)
+        store (StoreUpdateRequest): 店舗更新リクエストモデル
+
+    Returns:
+        Optional[UpdateResult]: 更新結果。店舗が存在しない場合はNone
+    """
+    stmt, params = update_store_stmt(store)
+    rows = (await db.execute(stmt, params)).all()
+    linked = {row.tag_name for row in rows if row.tag_name is not None}
+    if store.tags is not None and rows and len(linked) < len(params["tag_names"]):
+        # 同時に追加されたタグを、コミット済みの状態で紐付け直す(同じ内容のため冪等)
+        logger.info(f"同時に追加されたタグがあるため再実行: {store.storeId}")
+        rows = (await db.execute(stmt, params)).all()
+
+    if not rows:
+        return None
+
+    return UpdateResult(
+        lat=rows[0].lat,
+        lng=rows[0].lng,
+        tag_ids={row.tag_name: row.tag_id for row in rows if row.tag_name is not None},
+    )
@@ -0,0 +1,81 @@
+import uuid
+from logging import getLogger
+from typing import Dict, Iterable, List
+
+from sqlalchemy import select, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.constants import TagCache
+from app.models.tag import Tag
+from app.utils.lru_cache import LRUCache
+
+logger = getLogger("app")
+
+# タグ名 -> タグのPK(コミット済みのタグのみ保持する)
+# タグは削除・改名しない前提。DBを直接変更した場合はclear_store_caches()で破棄する
+tag_cache = LRUCache(maxsize=TagCache.SIZE)
+
+
+def _upsert_tags_stmt(tag_names: List[str]):
+    """
+    未登録のタグを追加し、追加・既存を問わずタグ名とPKを返すSQL(1往復)
+
+    既存タグはCTEと同じスナップショットで取得するため、同時に追加された
+    (ON CONFLICTで待機した)タグは含まれない場合がある
+    """
+    inserted = (
+        insert(Tag)
+        .values([{"tag_id": uuid.uuid4(), "tag_name": name} for name in tag_names])
+        .on_conflict_do_nothing(index_elements=[Tag.tag_name])
+        .returning(Tag.id, Tag.tag_name)
+        .cte("inserted")
+    )
+    existing = select(Tag.id, Tag.tag_name).where(Tag.tag_name.in_(tag_names))
+    return union_all(select(inserted.c.id, inserted.c.tag_name), existing)
+
+
+async def resolve_tag_ids(db: AsyncSession, tag_names: Iterable[str]) -> Dict[str, int]:
+    """
+    タグ名からタグのPKを取得する。未登録のタグは追加する
+    キャッシュ済みのタグはDBにアクセスしない。追加したタグはコミット後にcache_tag_idsでキャッシュする
+
+    Args:
+        db (AsyncSession): DBセッション(トランザクション内)
+        tag_names (Iterable[str]): タグ名
+
+    Returns:
+        Dict[str, int]: タグ名 -> タグのPK
+    """
+    tag_ids: Dict[str, int] = {}
+    missing: List[str] = []
+    for name in dict.fromkeys(tag_names):
+        tag_id = tag_cache.get(name)
+        if tag_id is None:
+            missing.append(name)
+        else:
+            tag_ids[name] = tag_id
+
+    if not missing:
+        return tag_ids
+
+    rows = (await db.execute(_upsert_tags_stmt(missing))).all()
+    tag_ids.update({row.tag_name: row.id for row in rows})
+
+    # 同時に追加されたタグは、コミット済みの状態を取得し直す
+    raced = [name for name in missing if name not in tag_ids]
+    if raced:
+        logger.info(f"同時に追加されたタグを再取得: {raced}")
+        stmt = select(Tag.id, Tag.tag_name).where(Tag.tag_name.in_(raced))
+        rows = (await db.execute(stmt)).all()
+        tag_ids.update({row.tag_name: row.id for row in rows})
+
+    return tag_ids
+
+
+def cache_tag_ids(tag_ids: Dict[str, int]) -> None:
+    """
+    コミット済みのタグをキャッシュする(ロールバックされたタグをキャッシュしないよう、コミット後に呼び出す)
+    """
+    for name, tag_id in tag_ids.items():
+        tag_cache.set(name, tag_id)
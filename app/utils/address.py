@@ -0,0 +1,26 @@
+import re
+import unicodedata
+
+# ハイフンとして扱う文字(NFKC正規化で"-"に変換されないもの)
+_HYPHEN_PATTERN = re.compile("[‐‑‒–—―−⁃]")
+# 長音記号は数字に挟まれた場合のみハイフンとして扱う(カタカナ語の長音は残す)
+_CHOON_BETWEEN_DIGITS = re.compile(r"(?<=\d)ー(?=\d)")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_address(address: str) -> str:
+    """
+    住所を表記ゆれを吸収したキャッシュキーに正規化する
+    全角英数字・記号を半角に、各種ハイフン(例: ６－１３－９)を"-"に統一する
+
+    Args:
+        address (str): 住所
+
+    Returns:
+        str: 正規化した住所
+    """
+    normalized = unicodedata.normalize("NFKC", address)
+    normalized = _CHOON_BETWEEN_DIGITS.sub("-", normalized)
+    normalized = _HYPHEN_PATTERN.sub("-", normalized)
+    normalized = _SPACES.sub(" ", normalized).strip()
+    return normalized
@@ -0,0 +1,80 @@
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    外部APIの連続失敗を検知して呼び出しを遮断するサーキットブレーカー
+
+    連続失敗回数がfailure_thresholdに達するとOPENとなり、reset_timeout秒の間は
+    呼び出しを拒否する。経過後はHALF_OPENとして1件のみ試行を許可し、
+    成功すればCLOSED、失敗すれば再度OPENに戻す。
+    asyncioの単一スレッドから使用する前提のためロックは持たない。
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.reset()
+
+    def reset(self) -> None:
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._trial_running = False
+        return self._state
+
+    def allow(self) -> bool:
+        """
+        呼び出しを許可するか判定する(HALF_OPENでは試行中の1件のみ許可)
+
+        Returns:
+            bool: 許可する場合True
+        """
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._trial_running:
+            self._trial_running = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self._state = CLOSED
+        self._failures = 0
+        self._trial_running = False
+
+    def release(self) -> None:
+        """
+        結果を記録せずに試行を終了する(呼び出しがキャンセルされた場合など)
+        """
+        self._trial_running = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != OPEN:
+                self.opened += 1
+            self._state = OPEN
+            self._opened_at = time.monotonic()
+            self._trial_running = False
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": self._failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,87 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Mapping, NamedTuple, Optional
+
+from fastapi import Response, status
+
+
+class Validators(NamedTuple):
+    """条件付きGETの検証に使用するETagとLast-Modified"""
+    etag: str
+    last_modified: Optional[datetime]
+
+
+def make_etag(*parts) -> str:
+    """
+    弱いETagを作成する(内容のバイト列ではなくデータのバージョンから作成するため)
+    """
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+
+def _opaque_tag(etag: str) -> str:
+    # 弱い比較のため、W/の有無は区別しない
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    If-None-MatchのいずれかのETagが一致するか判定する(弱い比較)
+    """
+    if if_none_match.strip() == "*":
+        return True
+    tag = _opaque_tag(etag)
+    return any(_opaque_tag(candidate) == tag for candidate in if_none_match.split(","))
+
+
+def _to_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def is_not_modified(headers: Mapping[str, str], validators: Validators) -> bool:
+    """
+    リクエストの条件付きヘッダーから、クライアントの保持する内容が最新か判定する
+    If-None-Matchがある場合はIf-Modified-Sinceを無視する(RFC 9110)
+
+    Args:
+        headers (Mapping[str, str]): リクエストヘッダー
+        validators (Validators): 現在のETagとLast-Modified
+
+    Returns:
+        bool: 最新の場合True(304 Not Modifiedを返す)
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, validators.etag)
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is None or validators.last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    # HTTP日付の精度は秒のため、秒未満を切り捨てて比較する
+    last_modified = _to_utc(validators.last_modified).replace(microsecond=0)
+    return last_modified <= _to_utc(since)
+
+
+def validator_headers(validators: Validators) -> dict:
+    """
+    ETag、Last-Modifiedと、毎回再検証させるCache-Controlのヘッダー
+    """
+    headers = {"ETag": validators.etag, "Cache-Control": "no-cache"}
+    if validators.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(
+            _to_utc(validators.last_modified), usegmt=True
+        )
+    return headers
+
+
+def not_modified_response(validators: Validators) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=validator_headers(validators),
+    )
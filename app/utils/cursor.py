@@ -0,0 +1,56 @@
+import base64
+import binascii
+import hashlib
+import json
+
+from fastapi import HTTPException, status
+
+# stores.idの上限(serial)。範囲外のIDはSQLのパラメータにできないため、カーソルの不正として扱う
+MAX_CURSOR_ID = 2**31 - 1
+
+
+def filter_fingerprint(filters: dict) -> str:
+    """
+    検索条件からカーソルに埋め込む識別子を作成する
+    """
+    normalized = json.dumps(filters, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def encode_cursor(last_id: int, fingerprint: str) -> str:
+    """
+    最後に返却した店舗のIDと検索条件の識別子からカーソルを作成する
+    """
+    payload = json.dumps({"id": last_id, "f": fingerprint}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, fingerprint: str) -> int:
+    """
+    カーソルから最後に返却した店舗のIDを取得する
+
+    Raises:
+        HTTPException: カーソルが不正(IDが範囲外の場合を含む)、または検索条件が異なる場合 (400 Bad Request)
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        last_id = payload["id"]
+        cursor_fingerprint = payload["f"]
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="カーソルが不正です",
+        )
+
+    if (
+        not isinstance(last_id, int)
+        or isinstance(last_id, bool)
+        or not 0 < last_id <= MAX_CURSOR_ID
+        or cursor_fingerprint != fingerprint
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="カーソルが不正です",
+        )
+    return last_id
@@ -1,10 +1,30 @@
 from logging import getLogger
-from sqlalchemy.exc import IntegrityError, OperationalError
+from asyncpg.exceptions import DataError as AsyncpgDataError
+from sqlalchemy.exc import DBAPIError, IntegrityError, OperationalError
 import traceback
 from fastapi import HTTPException, status
 
 logger = getLogger("app")
 
+# SQLSTATEのクラス22(データ例外: 型変換の失敗、範囲外の値など)
+DATA_EXCEPTION_CLASS = "22"
+
+
+def is_data_exception(exc: Exception) -> bool:
+    """
+    入力値が不正なことによるDB例外か(型変換の失敗など)
+    asyncpgの例外はSQLAlchemyでは汎用のDBAPIErrorになるため、SQLSTATEと元の例外で判定する
+    """
+    if isinstance(exc, AsyncpgDataError):
+        return True
+    if not isinstance(exc, DBAPIError):
+        return False
+    sqlstate = getattr(exc.orig, "sqlstate", None) or ""
+    return sqlstate.startswith(DATA_EXCEPTION_CLASS) or isinstance(
+        getattr(exc.orig, "__cause__", None), AsyncpgDataError
+    )
+
+
 def handle_db_exception(exc):
     """DB例外の共通処理"""
 
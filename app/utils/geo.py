@@ -0,0 +1,131 @@
+import math
+from typing import NamedTuple, Optional, Set, Tuple
+
+from fastapi import HTTPException, status
+
+# Webメルカトルで表現できる緯度の上限
+MAX_MERCATOR_LAT = 85.05112878
+
+
+class BoundingBox(NamedTuple):
+    """緯度経度の範囲(未指定の辺はNone)"""
+    min_lat: Optional[float] = None
+    max_lat: Optional[float] = None
+    min_lng: Optional[float] = None
+    max_lng: Optional[float] = None
+
+    def is_empty(self) -> bool:
+        return all(value is None for value in self)
+
+
+def validate_bounding_box(bbox: BoundingBox) -> BoundingBox:
+    """
+    範囲の上下限が逆転していないかチェックする
+
+    Raises:
+        HTTPException: 下限が上限を超えている場合 (400 Bad Request)
+    """
+    if (
+        bbox.min_lat is not None and bbox.max_lat is not None and bbox.min_lat > bbox.max_lat
+    ) or (
+        bbox.min_lng is not None and bbox.max_lng is not None and bbox.min_lng > bbox.max_lng
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="緯度経度の範囲指定が不正です",
+        )
+    return bbox
+
+
+def lng_to_tile_x(lng: float, zoom: int) -> int:
+    """
+    経度から指定ズームのタイルX座標を求める
+    """
+    n = 2 ** zoom
+    x = int(math.floor((lng + 180.0) / 360.0 * n))
+    return min(max(x, 0), n - 1)
+
+
+def lat_to_tile_y(lat: float, zoom: int) -> int:
+    """
+    緯度から指定ズームのタイルY座標を求める(北が0)
+    """
+    n = 2 ** zoom
+    lat = min(max(lat, -MAX_MERCATOR_LAT), MAX_MERCATOR_LAT)
+    lat_rad = math.radians(lat)
+    y = int(math.floor((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n))
+    return min(max(y, 0), n - 1)
+
+
+def tile_pixel(lat: float, lng: float, x: int, y: int, zoom: int, extent: int) -> Tuple[int, int]:
+    """
+    地点のタイル(x, y)内のピクセル座標を求める
+    """
+    n = 2 ** zoom
+    lat = min(max(lat, -MAX_MERCATOR_LAT), MAX_MERCATOR_LAT)
+    world_x = (lng + 180.0) / 360.0 * n
+    world_y = (1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n
+    return round((world_x - x) * extent), round((world_y - y) * extent)
+
+
+def tile_x_to_lng(x: int, zoom: int) -> float:
+    """
+    タイルX座標の西端の経度を求める
+    """
+    return x / (2 ** zoom) * 360.0 - 180.0
+
+
+def tile_y_to_lat(y: int, zoom: int) -> float:
+    """
+    タイルY座標の北端の緯度を求める
+    """
+    return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / (2 ** zoom)))))
+
+
+def tile_bounds(x_min: int, y_min: int, x_max: int, y_max: int, zoom: int) -> BoundingBox:
+    """
+    タイル範囲(両端含む)を覆う緯度経度の範囲を求める
+    """
+    return BoundingBox(
+        min_lat=tile_y_to_lat(y_max + 1, zoom),
+        max_lat=tile_y_to_lat(y_min, zoom),
+        min_lng=tile_x_to_lng(x_min, zoom),
+        max_lng=tile_x_to_lng(x_max + 1, zoom),
+    )
+
+
+def point_tiles(lat: float, lng: float, zoom: int, eps: float = 1e-9) -> Set[Tuple[int, int]]:
+    """
+    地点を含むタイルを求める
+    タイル境界上の地点はDB側の計算と丸めが異なる可能性があるため、隣接タイルも含める
+    """
+    return {
+        (lng_to_tile_x(lng + d_lng, zoom), lat_to_tile_y(lat + d_lat, zoom))
+        for d_lat in (-eps, eps)
+        for d_lng in (-eps, eps)
+    }
+
+
+def parse_bbox(value: str) -> BoundingBox:
+    """
+    "最小経度,最小緯度,最大経度,最大緯度"形式の文字列を範囲に変換する
+
+    Raises:
+        HTTPException: 形式が不正な場合 (400 Bad Request)
+    """
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(v) for v in value.split(","))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="緯度経度の範囲指定が不正です",
+        )
+
+    if not (-90 <= min_lat <= 90 and -90 <= max_lat <= 90
+            and -180 <= min_lng <= 180 and -180 <= max_lng <= 180):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="緯度経度の範囲指定が不正です",
+        )
+
+    return validate_bounding_box(BoundingBox(min_lat, max_lat, min_lng, max_lng))
@@ -0,0 +1,50 @@
+from typing import Any, Dict, Iterable, Optional
+
+# GeoJSON(RFC 7946)の定義
+# https://datatracker.ietf.org/doc/html/rfc7946
+
+
+def point_feature(
+    lng: Optional[float],
+    lat: Optional[float],
+    properties: Dict[str, Any],
+    feature_id: Optional[str] = None,
+) -> dict:
+    """
+    ポイント地物を作成する(緯度経度がない場合はgeometryをnullとする)
+
+    Args:
+        lng (Optional[float]): 経度
+        lat (Optional[float]): 緯度
+        properties (Dict[str, Any]): 属性
+        feature_id (Optional[str]): 地物ID
+
+    Returns:
+        dict: GeoJSONのFeature
+    """
+    feature = {
+        "type": "Feature",
+        "geometry": (
+            {"type": "Point", "coordinates": [lng, lat]}
+            if lng is not None and lat is not None
+            else None
+        ),
+        "properties": properties,
+    }
+    if feature_id is not None:
+        feature["id"] = feature_id
+    return feature
+
+
+def feature_collection(features: Iterable[dict], **members: Any) -> dict:
+    """
+    地物の集合を作成する
+
+    Args:
+        features (Iterable[dict]): 地物
+        members (Any): FeatureCollectionに追加する項目(ページングのカーソルなど)
+
+    Returns:
+        dict: GeoJSONのFeatureCollection
+    """
+    return {"type": "FeatureCollection", "features": list(features), **members}
@@ -0,0 +1,51 @@
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+import humps
+import orjson
+from fastapi import Response
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+@lru_cache(maxsize=None)
+def _row_layout(fields: Tuple[str, ...]) -> Tuple[Callable, Tuple[str, ...]]:
+    # カラム名からキャメルケースのキーへの変換は、カラムの組み合わせ毎に1回だけ行う
+    return attrgetter(*fields), tuple(humps.camelize(field) for field in fields)
+
+
+def rows_to_dicts(rows: Iterable[Any], fields: Sequence[str]) -> List[dict]:
+    """
+    SQLの結果の行を、カラム名をキャメルケースにしたキーの辞書にする
+    humps.camelizeのように値を再帰的に走査せず、指定したカラムのみを順番通りに取り出す
+    値がNoneの項目もnullとして出力する
+
+    Args:
+        rows (Iterable[Any]): SQLの結果の行
+        fields (Sequence[str]): 取り出すカラム名(2つ以上)
+
+    Returns:
+        List[dict]: 辞書のリスト
+    """
+    getter, keys = _row_layout(tuple(fields))
+    return [dict(zip(keys, getter(row))) for row in rows]
+
+
+def dumps(content: Any) -> bytes:
+    """
+    JSONにエンコードする
+    FastAPIのJSONResponseと同じく、区切り文字の空白なし、非ASCII文字はUTF-8のまま出力する
+    """
+    return orjson.dumps(content)
+
+
+def json_response(
+    body: bytes,
+    media_type: str = JSON_MEDIA_TYPE,
+    headers: Optional[dict] = None,
+) -> Response:
+    """
+    エンコード済みのJSONをレスポンスにする(レスポンスモデルの検証は行わない)
+    """
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -0,0 +1,127 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Mapbox Vector Tile(v2)の定義
+# https://github.com/mapbox/vector-tile-spec/tree/master/2.1
+MVT_VERSION = 2
+DEFAULT_EXTENT = 4096
+
+_WIRE_VARINT = 0
+_WIRE_LENGTH_DELIMITED = 2
+
+# Tile.layers
+_TILE_LAYERS = 3
+# Layer
+_LAYER_NAME = 1
+_LAYER_FEATURES = 2
+_LAYER_KEYS = 3
+_LAYER_VALUES = 4
+_LAYER_EXTENT = 5
+_LAYER_VERSION = 15
+# Feature
+_FEATURE_ID = 1
+_FEATURE_TAGS = 2
+_FEATURE_TYPE = 3
+_FEATURE_GEOMETRY = 4
+# Value
+_VALUE_STRING = 1
+
+_GEOM_TYPE_POINT = 1
+_COMMAND_MOVE_TO = 1
+
+
+class PointFeature(NamedTuple):
+    """ポイント地物(x, yはタイル内のピクセル座標。idは省略可)"""
+    x: int
+    y: int
+    properties: Dict[str, str]
+    id: Optional[int] = None
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        bits = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(bits | 0x80)
+        else:
+            out.append(bits)
+            return bytes(out)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 31)
+
+
+def _field_key(field: int, wire_type: int) -> bytes:
+    return _varint((field << 3) | wire_type)
+
+
+def _uint_field(field: int, value: int) -> bytes:
+    return _field_key(field, _WIRE_VARINT) + _varint(value)
+
+
+def _bytes_field(field: int, data: bytes) -> bytes:
+    return _field_key(field, _WIRE_LENGTH_DELIMITED) + _varint(len(data)) + data
+
+
+def _packed_field(field: int, values: Iterable[int]) -> bytes:
+    return _bytes_field(field, b"".join(_varint(v) for v in values))
+
+
+def encode_point_layer(
+    name: str,
+    features: Iterable[PointFeature],
+    extent: int = DEFAULT_EXTENT,
+) -> bytes:
+    """
+    ポイント地物のみからなる1レイヤーのタイルをエンコードする
+    地物が存在しない場合は空のタイル(0バイト)を返す
+
+    Args:
+        name (str): レイヤー名
+        features (Iterable[PointFeature]): 地物
+        extent (int): タイル内の座標の分解能
+
+    Returns:
+        bytes: Mapbox Vector Tile形式のバイト列
+    """
+    keys: Dict[str, int] = {}
+    values: Dict[str, int] = {}
+    encoded_features: List[bytes] = []
+
+    for feature in features:
+        tags: List[int] = []
+        for key, value in feature.properties.items():
+            tags.append(keys.setdefault(key, len(keys)))
+            tags.append(values.setdefault(value, len(values)))
+
+        geometry: Tuple[int, ...] = (
+            (_COMMAND_MOVE_TO & 0x7) | (1 << 3),
+            _zigzag(feature.x),
+            _zigzag(feature.y),
+        )
+        encoded_features.append(
+            (_uint_field(_FEATURE_ID, feature.id) if feature.id is not None else b"")
+            + _packed_field(_FEATURE_TAGS, tags)
+            + _uint_field(_FEATURE_TYPE, _GEOM_TYPE_POINT)
+            + _packed_field(_FEATURE_GEOMETRY, geometry)
+        )
+
+    if not encoded_features:
+        return b""
+
+    layer = bytearray()
+    layer += _uint_field(_LAYER_VERSION, MVT_VERSION)
+    layer += _bytes_field(_LAYER_NAME, name.encode("utf-8"))
+    for encoded_feature in encoded_features:
+        layer += _bytes_field(_LAYER_FEATURES, encoded_feature)
+    for key in keys:
+        layer += _bytes_field(_LAYER_KEYS, key.encode("utf-8"))
+    for value in values:
+        layer += _bytes_field(
+            _LAYER_VALUES, _bytes_field(_VALUE_STRING, value.encode("utf-8"))
+        )
+    layer += _uint_field(_LAYER_EXTENT, extent)
+
+    return _bytes_field(_TILE_LAYERS, bytes(layer))
@@ -0,0 +1,81 @@
+# bench_store_serialization.py
+# 店舗一覧レスポンスのシリアライズ時間を、従来の処理(humps.camelize + レスポンスモデルでの検証)と
+# 高速化した処理(カラム名から直接キャメルケースの辞書を作成 + orjson)で比較する
+#
+# 例) DATABASE_URL=postgresql://... python benchmarks/bench_store_serialization.py
+import asyncio
+import os
+import sys
+import time
+import uuid
+from collections import namedtuple
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import humps
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.routers.stores import STORE_FIELDS
+from app.schemas.stores import StoresResponse
+from app.utils.json_response import dumps, rows_to_dicts
+
+Row = namedtuple("Row", ["id", *STORE_FIELDS])
+
+SIZES = [1_000, 10_000, 100_000]
+REPEAT = 3
+
+
+def make_rows(size):
+    return [
+        Row(
+            i,
+            uuid.uuid4(),
+            f"店舗{i}",
+            f"東京都中央区銀座{i % 10}-{i % 20}-{i % 30}",
+            "目元専門の美容エステサロン。【月～土】11:00～20:00",
+            35.0 + i * 1e-5,
+            139.0 + i * 1e-5,
+            ["タグ1", "タグ2"] if i % 2 else [],
+        )
+        for i in range(size)
+    ]
+
+
+async def legacy(rows, field):
+    content = {"stores": humps.camelize([row._asdict() for row in rows]), "nextCursor": None}
+    value = await serialize_response(field=field, response_content=content, exclude_none=True)
+    return JSONResponse(value).body
+
+
+async def fast(rows, field):
+    return dumps({"stores": rows_to_dicts(rows, STORE_FIELDS)})
+
+
+async def measure(func, rows, field):
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        body = await func(rows, field)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, body
+
+
+async def main():
+    field = create_response_field(name="Response", type_=StoresResponse)
+    print(f"{'件数':>8} {'従来(ms)':>10} {'高速化(ms)':>12} {'倍率':>6}")
+    for size in SIZES:
+        rows = make_rows(size)
+        legacy_time, legacy_body = await measure(legacy, rows, field)
+        fast_time, fast_body = await measure(fast, rows, field)
+        assert fast_body == legacy_body, "出力が一致しません"
+        print(
+            f"{size:>8} {legacy_time * 1000:>10.1f} {fast_time * 1000:>12.1f} "
+            f"{legacy_time / fast_time:>6.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,9 +1,57 @@
 # create_tables.py
-from flask import app
-from .database import engine, Base
-from . import models
-
-# アプリ起動時にテーブル作成
-@app.on_event("startup")
-def on_startup():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+# モデルからテーブルを作成し、未適用のマイグレーション(索引、外部キー、トリガー)を適用する
+# 何度実行しても良い(デプロイ時に実行する)
+#
+# 例) python create_tables.py
+#     python create_tables.py --check  # 変更せずに不足している索引などを表示する
+import argparse
+import asyncio
+import sys
+from logging import getLogger
+
+from app.services.migrations import check_schema, migrate
+from config.logging_config import setup_logger
+from database import dispose_engine, get_async_engine
+
+logger = getLogger("app")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="テーブルの作成とマイグレーション")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="変更せずに、未適用のバージョンと不足している索引・外部キー・トリガーを表示する",
+    )
+    return parser.parse_args()
+
+
+async def main(args: argparse.Namespace) -> int:
+    try:
+        engine = get_async_engine()
+        if not args.check:
+            applied = await migrate(engine)
+            logger.info(f"マイグレーション適用: {applied or 'なし'}")
+
+        report = await check_schema(engine)
+    finally:
+        await dispose_engine()
+
+    for label, names in (
+        ("未適用のバージョン", report.pending),
+        ("不足している索引", report.missing_indexes),
+        ("不足している外部キー", report.missing_foreign_keys),
+        ("不足しているトリガー", report.missing_triggers),
+    ):
+        if names:
+            logger.warning(f"{label}: {', '.join(map(str, names))}")
+
+    if not report.ok:
+        return 1
+    logger.info("スキーマは最新です")
+    return 0
+
+
+if __name__ == "__main__":
+    setup_logger()
+    sys.exit(asyncio.run(main(parse_args())))
@@ -1,8 +1,14 @@
 import os
+from threading import Lock
 
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
+                                    create_async_engine)
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 Base = declarative_base()
 
@@ -13,12 +19,167 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL is not set")
 
+#非同期接続用URL(未指定の場合はDATABASE_URLのドライバをasyncpgに置き換える)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or make_url(DATABASE_URL).set(
+    drivername="postgresql+asyncpg"
+).render_as_string(hide_password=False)
+
+#コネクションプール設定(環境変数で上書き可能)
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "10"))
+STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+
+class PoolStatsMixin:
+    """接続待ち・タイムアウト回数を記録するコネクションプールのMixin"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waits = 0
+        self.timeouts = 0
+
+    def _do_get(self):
+        # プールとオーバーフローが上限に達している場合は接続の返却待ちになる
+        if self._max_overflow > -1 and self.checkedout() >= self.size() + self._max_overflow:
+            self.waits += 1
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+
+
+class InstrumentedQueuePool(PoolStatsMixin, QueuePool):
+    """同期エンジン用のコネクションプール"""
+
+
+class InstrumentedAsyncQueuePool(PoolStatsMixin, AsyncAdaptedQueuePool):
+    """非同期エンジン用のコネクションプール"""
+
+
+_engine = None
+_session_local = None
+_async_engine = None
+_async_session_local = None
+_engine_lock = Lock()
+
+
+def _connect_args() -> dict:
+    connect_args = {"connect_timeout": CONNECT_TIMEOUT}
+    if STATEMENT_TIMEOUT_MS > 0:
+        connect_args["options"] = f"-c statement_timeout={STATEMENT_TIMEOUT_MS}"
+    return connect_args
+
+
+def _async_connect_args() -> dict:
+    connect_args = {"timeout": CONNECT_TIMEOUT}
+    if STATEMENT_TIMEOUT_MS > 0:
+        connect_args["server_settings"] = {"statement_timeout": str(STATEMENT_TIMEOUT_MS)}
+    return connect_args
+
+
 def get_engine():
-    return create_engine(DATABASE_URL)
+    """
+    プロセス内で共有するエンジンを取得する(初回呼び出し時のみ生成)
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine(
+                    DATABASE_URL,
+                    poolclass=InstrumentedQueuePool,
+                    pool_size=POOL_SIZE,
+                    max_overflow=MAX_OVERFLOW,
+                    pool_recycle=POOL_RECYCLE,
+                    pool_timeout=POOL_TIMEOUT,
+                    pool_pre_ping=POOL_PRE_PING,
+                    connect_args=_connect_args(),
+                )
+    return _engine
+
 
 def get_session_local():
-    engine = get_engine()
-    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    global _session_local
+    if _session_local is None:
+        _session_local = sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+    return _session_local
+
+
+def get_async_engine():
+    """
+    プロセス内で共有する非同期エンジン(asyncpg)を取得する(初回呼び出し時のみ生成)
+    """
+    global _async_engine
+    if _async_engine is None:
+        with _engine_lock:
+            if _async_engine is None:
+                _async_engine = create_async_engine(
+                    ASYNC_DATABASE_URL,
+                    poolclass=InstrumentedAsyncQueuePool,
+                    pool_size=POOL_SIZE,
+                    max_overflow=MAX_OVERFLOW,
+                    pool_recycle=POOL_RECYCLE,
+                    pool_timeout=POOL_TIMEOUT,
+                    pool_pre_ping=POOL_PRE_PING,
+                    connect_args=_async_connect_args(),
+                )
+    return _async_engine
+
+
+def get_async_session_local():
+    global _async_session_local
+    if _async_session_local is None:
+        _async_session_local = async_sessionmaker(
+            bind=get_async_engine(),
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _async_session_local
+
+
+def _pool_status(pool) -> dict:
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "waits": getattr(pool, "waits", 0),
+        "timeouts": getattr(pool, "timeouts", 0),
+    }
+
+
+def get_pool_status() -> dict:
+    """
+    コネクションプールの使用状況を取得する
+    """
+    return {
+        "sync": _pool_status(get_engine().pool),
+        "async": _pool_status(get_async_engine().pool),
+    }
+
+
+async def dispose_engine():
+    """
+    エンジンを破棄し、プール内の接続を全て閉じる
+    """
+    global _engine, _session_local, _async_engine, _async_session_local
+    with _engine_lock:
+        engine, async_engine = _engine, _async_engine
+        _engine = None
+        _session_local = None
+        _async_engine = None
+        _async_session_local = None
+    if engine is not None:
+        engine.dispose()
+    if async_engine is not None:
+        await async_engine.dispose()
+
 
 def get_db():
     SessionLocal = get_session_local()
@@ -26,4 +187,10 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    AsyncSessionLocal = get_async_session_local()
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -12,6 +12,13 @@
   この機能は A5:SQL Mk-2でのみ有効であることに注意してください。
 */
 
+-- 近傍検索用の拡張
+create extension if not exists cube ;
+create extension if not exists earthdistance ;
+
+-- 店舗名の部分一致検索用の拡張
+create extension if not exists pg_trgm ;
+
 -- 店舗
 -- * RestoreFromTempTable
 create table stores (
@@ -20,8 +27,12 @@ create table stores (
   , store_name character varying(100) not null
   , address character varying(100) not null
   , content character varying(100) not null
-  , lat double precision not null
-  , lng double precision not null
+  , lat double precision
+  , lng double precision
+  , geocode_status character varying(20) default 'resolved' not null
+  , geocode_attempts integer default 0 not null
+  , geocode_error character varying(200)
+  , tags character varying(100)[] default '{}' not null
   , created_at timestamp(6) without time zone default CURRENT_TIMESTAMP not null
   , updated_at timestamp(6) without time zone default CURRENT_TIMESTAMP not null
   , constraint stores_PKC primary key (id)
@@ -30,6 +41,21 @@ create table stores (
 alter table stores add constraint stores_store_id_key
   unique (store_id) ;
 
+create index ix_stores_lat_lng
+  on stores(lat, lng) ;
+
+create index ix_stores_geocode_pending
+  on stores(id) where geocode_status = 'pending' ;
+
+create index ix_stores_earth
+  on stores using gist (ll_to_earth(lat, lng)) ;
+
+create index ix_stores_store_name_trgm
+  on stores using gin (store_name gin_trgm_ops) ;
+
+create index ix_stores_tags
+  on stores using gin (tags) ;
+
 -- 店舗とタグの中間テーブル
 -- * RestoreFromTempTable
 create table stores_tags (
@@ -45,6 +71,12 @@ create table stores_tags (
 alter table stores_tags add constraint stores_tags_stores_tags_id_key
   unique (stores_tags_id) ;
 
+alter table stores_tags add constraint uq_store_tag
+  unique (store_id, tag_id) ;
+
+create index ix_stores_tags_tag_id_store_id
+  on stores_tags(tag_id, store_id) ;
+
 -- タグ
 -- * RestoreFromTempTable
 create table tags (
@@ -59,6 +91,142 @@ create table tags (
 alter table tags add constraint tags_tag_id_key
   unique (tag_id) ;
 
+alter table tags add constraint tags_tag_name_key
+  unique (tag_name) ;
+
+alter table stores_tags add constraint stores_tags_store_id_fkey
+  foreign key (store_id) references stores (id) ;
+
+alter table stores_tags add constraint stores_tags_tag_id_fkey
+  foreign key (tag_id) references tags (id) ;
+
+-- 住所ジオコーディング結果のキャッシュ
+create table geocode_cache (
+  address_key character varying(200) not null
+  , found boolean not null
+  , lat double precision
+  , lng double precision
+  , expires_at timestamp(6) without time zone not null
+  , created_at timestamp(6) without time zone default CURRENT_TIMESTAMP not null
+  , updated_at timestamp(6) without time zone default CURRENT_TIMESTAMP not null
+  , constraint geocode_cache_PKC primary key (address_key)
+) ;
+
+create index ix_geocode_cache_expires_at
+  on geocode_cache(expires_at) ;
+
+-- データの変更回数(条件付きGETのETag用)
+create table data_versions (
+  name character varying(50) not null
+  , version bigint default 0 not null
+  , updated_at timestamp(6) with time zone default CURRENT_TIMESTAMP not null
+  , constraint data_versions_PKC primary key (name)
+) ;
+
+insert into data_versions (name) values ('stores') ;
+
+-- 店舗、タグ、中間テーブルへの書き込み(API、一括登録、ジオコーディング、手動更新)毎に加算する
+create or replace function bump_stores_version() returns trigger as $$
+begin
+  update data_versions
+  set version = version + 1, updated_at = clock_timestamp()
+  where name = 'stores' ;
+  return null ;
+end ;
+$$ language plpgsql ;
+
+create trigger trg_stores_version
+  after insert or update or delete or truncate on stores
+  for each statement execute function bump_stores_version() ;
+
+create trigger trg_stores_tags_version
+  after insert or update or delete or truncate on stores_tags
+  for each statement execute function bump_stores_version() ;
+
+create trigger trg_tags_version
+  after insert or update or delete or truncate on tags
+  for each statement execute function bump_stores_version() ;
+
+-- 店舗のタグ名配列(stores.tags)を中間テーブルから作り直す
+create or replace function refresh_store_tags(store_ids integer[]) returns void as $$
+  update stores st
+  set tags = coalesce((
+    select array_agg(t.tag_name order by t.tag_name)
+    from stores_tags sst
+    join tags t on t.id = sst.tag_id
+    where sst.store_id = st.id
+  ), '{}')
+  where st.id = any(store_ids) ;
+$$ language sql ;
+
+-- 中間テーブルの変更(文単位)で、変更のあった店舗のみ作り直す
+create or replace function stores_tags_inserted() returns trigger as $$
+begin
+  perform refresh_store_tags(array(select distinct store_id from new_rows)) ;
+  return null ;
+end ;
+$$ language plpgsql ;
+
+create or replace function stores_tags_deleted() returns trigger as $$
+begin
+  perform refresh_store_tags(array(select distinct store_id from old_rows)) ;
+  return null ;
+end ;
+$$ language plpgsql ;
+
+create or replace function stores_tags_updated() returns trigger as $$
+begin
+  perform refresh_store_tags(array(
+    select store_id from old_rows union select store_id from new_rows
+  )) ;
+  return null ;
+end ;
+$$ language plpgsql ;
+
+create trigger trg_stores_tags_insert_tags
+  after insert on stores_tags referencing new table as new_rows
+  for each statement execute function stores_tags_inserted() ;
+
+create trigger trg_stores_tags_delete_tags
+  after delete on stores_tags referencing old table as old_rows
+  for each statement execute function stores_tags_deleted() ;
+
+create trigger trg_stores_tags_update_tags
+  after update on stores_tags referencing old table as old_rows new table as new_rows
+  for each statement execute function stores_tags_updated() ;
+
+-- タグ名の変更時は、そのタグを持つ店舗を作り直す
+create or replace function tags_renamed() returns trigger as $$
+begin
+  perform refresh_store_tags(array(
+    select store_id from stores_tags where tag_id = new.id
+  )) ;
+  return null ;
+end ;
+$$ language plpgsql ;
+
+create trigger trg_tags_rename_tags
+  after update of tag_name on tags
+  for each row when (old.tag_name is distinct from new.tag_name)
+  execute function tags_renamed() ;
+
+-- 適用済みのマイグレーション(app/services/migrations.py)
+-- このファイルは全てのバージョンを適用した状態と同じため、記録のみ行う
+-- (バージョンを追加した場合はここにも追加する)
+create table schema_migrations (
+  version integer not null primary key
+  , description character varying(200) not null
+  , applied_at timestamp(6) with time zone default CURRENT_TIMESTAMP not null
+) ;
+
+insert into schema_migrations (version, description) values
+  (1, 'モデルからテーブルを作成')
+  , (2, 'ジオコーディングの状態')
+  , (3, '同名タグの統合とタグ名の一意制約')
+  , (4, '外部キー、一意制約と検索・更新用の索引')
+  , (5, '条件付きGET用のデータバージョン')
+  , (6, '店舗のタグ名配列') ;
+
 comment on table stores is '店舗';
 comment on column stores.id is 'ID';
 comment on column stores.store_id is '店舗UUID';
@@ -67,6 +235,10 @@ comment on column stores.address is '住所';
 comment on column stores.content is '店舗の説明・紹介文';
 comment on column stores.lat is '緯度';
 comment on column stores.lng is '経度';
+comment on column stores.geocode_status is 'ジオコーディング状態(pending/resolved/failed)';
+comment on column stores.geocode_attempts is 'ジオコーディング試行回数';
+comment on column stores.geocode_error is 'ジオコーディング失敗理由';
+comment on column stores.tags is 'タグ名(中間テーブルからトリガーで更新)';
 comment on column stores.created_at is '作成日時';
 comment on column stores.updated_at is '更新日時';
 
@@ -85,3 +257,16 @@ comment on column tags.tag_name is 'タグ名';
 comment on column tags.created_at is '作成日時';
 comment on column tags.updated_at is '更新日時';
 
+comment on table geocode_cache is '住所ジオコーディング結果のキャッシュ';
+comment on column geocode_cache.address_key is '正規化した住所';
+comment on column geocode_cache.found is '住所が見つかったか';
+comment on column geocode_cache.lat is '緯度';
+comment on column geocode_cache.lng is '経度';
+comment on column geocode_cache.expires_at is '有効期限';
+comment on column geocode_cache.created_at is '作成日時';
+comment on column geocode_cache.updated_at is '更新日時';
+
+comment on table data_versions is 'データの変更回数';
+comment on column data_versions.name is '対象データ名';
+comment on column data_versions.version is '変更回数';
+comment on column data_versions.updated_at is '最終変更日時';
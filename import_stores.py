@@ -0,0 +1,55 @@
+# import_stores.py
+# db/bkと同じ列構成のCSVから店舗を一括登録する
+#
+# 例) python import_stores.py --stores db/bk/public.stores.csv \
+#       --tags db/bk/public.tags.csv --stores-tags db/bk/public.stores_tags.csv
+import argparse
+import asyncio
+from logging import getLogger
+
+from app.config.constants import StoreImport
+from app.services.geocode_worker import resolve_jobs
+from app.services.gsi_api import close_http_client
+from app.services.store_import import import_stores
+from config.logging_config import setup_logger
+from database import dispose_engine, get_async_engine
+
+logger = getLogger("app")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="CSVから店舗を一括登録する")
+    parser.add_argument("--stores", required=True, help="店舗CSV")
+    parser.add_argument("--tags", help="タグCSV")
+    parser.add_argument("--stores-tags", help="店舗とタグの中間テーブルCSV")
+    parser.add_argument(
+        "--geocode-concurrency",
+        type=int,
+        default=StoreImport.GEOCODE_CONCURRENCY,
+        help="緯度経度のない店舗をジオコーディングする同時実行数",
+    )
+    parser.add_argument(
+        "--no-geocode",
+        action="store_true",
+        help="ジオコーディングを行わない(処理待ちの店舗はAPIサーバー起動時に処理される)",
+    )
+    return parser.parse_args()
+
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        async with get_async_engine().begin() as conn:
+            result = await import_stores(conn, args.stores, args.tags, args.stores_tags)
+
+        if result.pending and not args.no_geocode:
+            logger.info(f"ジオコーディング開始: {len(result.pending)}件")
+            statuses = await resolve_jobs(result.pending, args.geocode_concurrency)
+            logger.info(f"ジオコーディング終了: {dict(statuses)}")
+    finally:
+        await close_http_client()
+        await dispose_engine()
+
+
+if __name__ == "__main__":
+    setup_logger()
+    asyncio.run(main(parse_args()))
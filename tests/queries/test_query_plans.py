@@ -0,0 +1,209 @@
+"""
+店舗のSQLの実行計画の回帰テスト
+
+件数の多いデータを登録して統計情報を更新したうえで、APIと同じSQLをEXPLAIN (FORMAT JSON)し、
+stores、stores_tagsを全件走査(Seq Scan)しないこと、推定コストが上限以内であることを確認する
+(レスポンスの確認だけでは、索引を使えなくなる変更に気付けないため)
+"""
+import hashlib
+import json
+import uuid
+from typing import Any, Dict, Iterator, Optional
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import NullPool
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.queries.stores import (delete_store_stmt, delete_store_tags_stmt,
+                                select_store_for_delete_stmt, select_store_stmt,
+                                select_stores_stmt)
+from app.schemas.stores import StoreUpdateRequest
+from app.services.store_events import clear_store_caches
+from app.services.store_update import update_store_stmt
+from app.utils.geo import BoundingBox
+from database import ASYNC_DATABASE_URL, get_session_local
+
+STORES = 50000
+TAGS = 100
+TAGS_PER_STORE = 3
+
+# 全件走査してはいけないテーブル
+NO_SEQ_SCAN = {"stores", "stores_tags"}
+
+# 推定コストの上限(STORES件の店舗で、storesの全件走査は2000程度)
+POINT_COST = 100
+PAGE_COST = 1000
+PAGE_SIZE = 100
+
+_SEED = [
+    """
+    insert into stores (store_id, store_name, address, content, lat, lng)
+    select
+      md5('store' || i)::uuid
+      , 'サロン' || md5(i::text)
+      , '東京都千代田区' || i
+      , '内容' || i
+      , 24 + (i % 2000) * 0.01
+      , 123 + (i * 7 % 2300) * 0.01
+    from generate_series(1, :stores) i
+    """,
+    """
+    insert into tags (tag_id, tag_name)
+    select gen_random_uuid(), 'タグ' || n from generate_series(1, :tags) n
+    """,
+    """
+    insert into stores_tags (stores_tags_id, store_id, tag_id)
+    select gen_random_uuid(), st.id, t.id
+    from stores st
+    cross join generate_series(0, :tags_per_store - 1) k
+    join tags t on t.tag_name = 'タグ' || ((st.id * 7 + k * 31) % :tags + 1)
+    on conflict do nothing
+    """,
+]
+
+_CLEAR = ["delete from stores_tags", "delete from tags", "delete from stores"]
+
+
+class Explain(Executable, ClauseElement):
+    """SQLをEXPLAIN (FORMAT JSON)で実行する"""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "explain (format json) " + compiler.process(element.statement, **kw)
+
+
+def store_uuid(i: int) -> uuid.UUID:
+    """登録したi番目の店舗の店舗ID"""
+    return uuid.UUID(hashlib.md5(f"store{i}".encode()).hexdigest())
+
+
+def plan_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def seed_stores() -> int:
+    """
+    店舗、タグ、中間テーブルを登録する
+
+    Returns:
+        int: 中央(STORES // 2番目)の店舗の主キー(シーケンスはリセットしないため1からとは限らない)
+    """
+    SessionLocal = get_session_local()
+    with SessionLocal() as db:
+        for sql in _CLEAR:
+            db.execute(text(sql))
+        params = {"stores": STORES, "tags": TAGS, "tags_per_store": TAGS_PER_STORE}
+        for sql in _SEED:
+            db.execute(text(sql), params)
+        # 本番と同じく統計情報が最新の状態で計画させる
+        db.execute(text("analyze stores, tags, stores_tags"))
+        middle_pk = db.execute(
+            text("select id from stores where store_id = :store_id"),
+            {"store_id": str(store_uuid(STORES // 2))},
+        ).scalar_one()
+        db.commit()
+
+    clear_store_caches()
+    yield middle_pk
+
+    with SessionLocal() as db:
+        for sql in _CLEAR:
+            db.execute(text(sql))
+        db.commit()
+    clear_store_caches()
+
+
+async def explain(stmt, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    APIと同じドライバ(asyncpg)でSQLの実行計画を取得する(SQLは実行しない)
+    """
+    engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=NullPool)
+    try:
+        async with engine.connect() as conn:
+            result = (await conn.execute(Explain(stmt), params or {})).scalar_one()
+    finally:
+        await engine.dispose()
+    if isinstance(result, str):
+        result = json.loads(result)
+    return result[0]["Plan"]
+
+
+def assert_plan(plan: Dict[str, Any], max_cost: float) -> None:
+    seq_scans = [
+        node["Relation Name"] for node in plan_nodes(plan)
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in NO_SEQ_SCAN
+    ]
+    assert not seq_scans, f"全件走査: {seq_scans}\n{json.dumps(plan, ensure_ascii=False, indent=2)}"
+    assert plan["Total Cost"] <= max_cost, (
+        f"推定コスト {plan['Total Cost']} > {max_cost}\n{json.dumps(plan, ensure_ascii=False, indent=2)}"
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kwargs", [
+    pytest.param({}, id="first_page"),
+    # 前ページの最後は中央の店舗(主キーはseed_storesで取得)
+    pytest.param({"after_id": None}, id="cursor"),
+    pytest.param({"tag_names": ["タグ1"]}, id="tag"),
+    pytest.param({"tag_names": ["タグ1", "タグ32"]}, id="tags_all"),
+    pytest.param({"tag_names": ["タグ1", "タグ32"], "match_all": False}, id="tags_any"),
+    pytest.param({"bbox": BoundingBox(35.0, 35.5, 139.0, 140.0)}, id="bbox"),
+    pytest.param(
+        {"serach_name": hashlib.md5(b"12345").hexdigest()[:8]}, id="search_name"
+    ),
+    pytest.param(
+        {"serach_name": hashlib.md5(b"12345").hexdigest()[:8], "order_by_similarity": True},
+        id="search_name_similarity",
+    ),
+])
+async def test_read_stores_plan(kwargs, seed_stores):
+    """店舗一覧(1ページ分)が全件走査しないこと"""
+    if "after_id" in kwargs:
+        kwargs = {**kwargs, "after_id": seed_stores}
+    # read_storesは次ページの有無を判定するため1件多く取得する
+    stmt = select_stores_stmt(limit=PAGE_SIZE + 1, **kwargs)
+    assert_plan(await explain(stmt), PAGE_COST)
+
+
+@pytest.mark.asyncio
+async def test_read_store_plan():
+    """店舗取得が店舗IDの索引を使用すること"""
+    assert_plan(await explain(select_store_stmt(store_uuid(STORES // 2))), POINT_COST)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("tags", [
+    pytest.param(None, id="fields"),
+    pytest.param(["タグ1", "タグ2", "新規タグ"], id="replace_tags"),
+    pytest.param([], id="clear_tags"),
+])
+async def test_update_store_plan(tags):
+    """店舗更新(タグの置き換えを含む)が全件走査しないこと"""
+    store = StoreUpdateRequest(
+        storeId=store_uuid(STORES // 2), storeName="更新後", address="更新後住所", tags=tags
+    )
+    stmt, params = update_store_stmt(store)
+    assert_plan(await explain(stmt, params), POINT_COST)
+
+
+@pytest.mark.asyncio
+async def test_delete_store_plan(seed_stores):
+    """店舗削除の各SQLが全件走査しないこと"""
+    store_id = store_uuid(STORES // 2)
+    for stmt in (
+        select_store_for_delete_stmt(store_id),
+        delete_store_tags_stmt(seed_stores),
+        delete_store_stmt(store_id),
+    ):
+        assert_plan(await explain(stmt), POINT_COST)
@@ -0,0 +1,66 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from database import (get_async_engine, get_async_session_local, get_engine,
+                      get_session_local)
+
+
+def test_db_pool_status():
+    path = "/metrics/db"
+
+    with TestClient(app) as client:
+        response = client.get(path)
+        response_json = response.json()
+
+    assert response.status_code == 200
+    assert set(response_json.keys()) == {"sync", "async"}
+    for pool_status in response_json.values():
+        assert set(pool_status.keys()) == {
+            "size", "checkedIn", "checkedOut", "overflow", "waits", "timeouts"
+        }
+
+def test_cache_stats():
+    path = "/metrics/cache"
+
+    with TestClient(app) as client:
+        response = client.get(path)
+        response_json = response.json()
+
+    assert response.status_code == 200
+    assert set(response_json.keys()) == {"stores", "store", "clusters", "tiles", "tags"}
+    for stats in response_json.values():
+        assert set(stats.keys()) == {
+            "size", "maxsize", "hits", "misses", "evictions", "expirations"
+        }
+
+def test_engine_is_shared():
+    #エンジンとセッションファクトリはプロセス内で使い回される
+    assert get_engine() is get_engine()
+    assert get_session_local() is get_session_local()
+    assert get_async_engine() is get_async_engine()
+    assert get_async_session_local() is get_async_session_local()
+
+def test_gsi_stats():
+    path = "/metrics/gsi"
+
+    with TestClient(app) as client:
+        response = client.get(path)
+        response_json = response.json()
+
+    assert response.status_code == 200
+    assert set(response_json.keys()) == {
+        "state", "failures", "opened", "rejected", "retries"
+    }
+
+def test_geocoding_stats():
+    path = "/metrics/geocoding"
+
+    with TestClient(app) as client:
+        response = client.get(path)
+        response_json = response.json()
+
+    assert response.status_code == 200
+    assert set(response_json.keys()) == {
+        "coalesced", "inflight", "cache", "queued", "retrying"
+    }
@@ -0,0 +1,169 @@
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.main import app
+from app.models.store import Store
+from app.models.stores_tags_table import stores_tags_table
+from app.models.tag import Tag
+from database import get_async_db, get_session_local
+
+
+@pytest.fixture()
+def test_setup():
+    SessionLocal = get_session_local()
+    db = SessionLocal()
+
+    try:
+        #db初期化
+        db_init(db)
+        yield db
+
+    finally:
+        #db初期化
+        db_init(db)
+        db.close()
+
+def db_init(db:Session):
+    """
+    DB初期化
+
+    Args:
+        db (Session): dbセッション
+    """
+    db.execute(delete(stores_tags_table))
+    db.execute(delete(Tag))
+    db.execute(delete(Store))
+    db.commit()
+
+@pytest.fixture
+def sample_stores():
+
+    SessionLocal = get_session_local()
+    with SessionLocal() as db:
+        # 東京駅、新宿駅、大阪駅付近
+        store_datas = [
+            {
+                "store_id": "11111111-1111-1111-1111-111111111111",
+                "store_name": "東京",
+                "address": "住所1",
+                "content": "内容1",
+                "lat": 35.681236,
+                "lng": 139.767125
+            },
+            {
+                "store_id": "22222222-2222-2222-2222-222222222222",
+                "store_name": "新宿",
+                "address": "住所2",
+                "content": "内容2",
+                "lat": 35.690921,
+                "lng": 139.700258
+            },
+            {
+                "store_id": "33333333-3333-3333-3333-333333333333",
+                "store_name": "大阪",
+                "address": "住所3",
+                "content": "内容3",
+                "lat": 34.702485,
+                "lng": 135.495951
+            }
+        ]
+
+        store_ids = db.execute(
+            insert(Store).values(store_datas).returning(Store.id)
+        ).scalars().all()
+
+        tag_ids = db.execute(
+            insert(Tag).values([
+                {"tag_id":"aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa", "tag_name":"タグ1"}
+            ]).returning(Tag.id)
+        ).scalars().all()
+
+        db.execute(insert(stores_tags_table).values([
+            {
+                "stores_tags_id": "aaaaaaaa-1111-1111-1111-aaaaaaaaaaaa",
+                "store_id": store_ids[1],
+                "tag_id": tag_ids[0],
+            }
+        ]))
+        db.commit()
+
+@pytest.fixture(autouse=True)
+def clean_app_dependency():
+    # テスト前
+    yield
+    # テスト後（リセット）
+    app.dependency_overrides.clear()
+
+
+def test_success(test_setup,sample_stores):
+    # 新宿駅から近い順
+    path = "/stores/nearby?lat=35.690921&lng=139.700258&limit=2"
+
+    with TestClient(app) as client:
+        response = client.get(path)
+        response_json = response.json()
+
+    assert response.status_code == 200
+    stores = response_json["stores"]
+    assert [store["storeName"] for store in stores] == ["新宿", "東京"]
+    assert stores[0]["tags"] == ["タグ1"]
+    assert stores[0]["distanceM"] == pytest.approx(0, abs=1)
+    # 新宿駅〜東京駅は約6.1km
+    assert stores[1]["distanceM"] == pytest.approx(6100, rel=0.05)
+
+@pytest.mark.parametrize(
+    "radius_m,expected_names",
+    [
+        pytest.param(1000, ["東京"], id="正常系 半径1km"),
+        pytest.param(10000, ["東京", "新宿"], id="正常系 半径10km"),
+        # 上限(100km)。大阪(約400km)は含まない
+        pytest.param(100000, ["東京", "新宿"], id="正常系 半径100km"),
+    ]
+)
+def test_success_radius(radius_m,expected_names,test_setup,sample_stores):
+    path = f"/stores/nearby?lat=35.681236&lng=139.767125&radiusM={radius_m}"
+
+    with TestClient(app) as client:
+        response = client.get(path)
+        response_json = response.json()
+
+    assert response.status_code == 200
+    assert [store["storeName"] for store in response_json["stores"]] == expected_names
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        pytest.param("lng=139.7", id="緯度なし"),
+        pytest.param("lat=91&lng=139.7", id="緯度範囲外"),
+        pytest.param("lat=35.6&lng=139.7&limit=0", id="取得件数下限超過"),
+        pytest.param("lat=35.6&lng=139.7&limit=101", id="取得件数上限超過"),
+        pytest.param("lat=35.6&lng=139.7&radiusM=0", id="半径0"),
+        pytest.param("lat=35.6&lng=139.7&radiusM=100001", id="半径上限超過"),
+    ]
+)
+def test_validation(query,test_setup):
+    with TestClient(app) as client:
+        response = client.get(f"/stores/nearby?{query}")
+
+    assert response.status_code == 404
+
+def test_db_exception(test_setup):
+    mock_db = MagicMock()
+    mock_db.execute.side_effect = OperationalError(statement="SELECT 1", params=None, orig=Exception("DB接続失敗"))
+
+    class MockSession:
+        def execute(self,*args,**kwargs):
+            return mock_db.execute(*args,**kwargs)
+
+    app.dependency_overrides[get_async_db] = lambda: MockSession()
+
+    with TestClient(app) as client:
+        response = client.get("/stores/nearby?lat=35.6&lng=139.7")
+
+    assert response.status_code == 503
+    assert response.json() == {"detail":"データベースに接続できません"}
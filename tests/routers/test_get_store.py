@@ -8,7 +8,7 @@ from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, status
 from fastapi.testclient import TestClient
 from pytest_postgresql import factories
-from sqlalchemy import create_engine, delete, insert
+from sqlalchemy import create_engine, delete, insert, select, update
 from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
@@ -16,7 +16,8 @@ from app.main import app
 from app.models.store import Store
 from app.models.stores_tags_table import stores_tags_table
 from app.models.tag import Tag
-from database import get_db, get_session_local
+from app.services.store_events import clear_store_caches
+from database import get_async_db, get_session_local
 
 
 @pytest.fixture()
@@ -27,11 +28,13 @@ def test_setup():
     try:
         #db初期化
         db_init(db)
+        clear_store_caches()
         yield db
 
     finally:
         #db初期化
         db_init(db)
+        clear_store_caches()
         db.close()
 
 def db_init(db:Session):
@@ -186,6 +189,60 @@ def test_data_none(store_id,test_setup,sample_stores):
     assert response.status_code == 404
     assert response_json == {"detail":"該当する店舗が存在しませんでした"}
 
+def test_conditional_get(test_setup,sample_stores):
+    path = "/stores/11111111-1111-1111-1111-111111111111"
+    headers = {"Authorization": f"Bearer {os.getenv('API_TOKEN')}"}
+    with TestClient(app) as client:
+        response = client.get(path)
+        etag = response.headers["etag"]
+
+        not_modified = client.get(path, headers={"If-None-Match": etag})
+
+        #タグのみの更新でも更新日時とETagが変わる
+        client.patch(
+            "/stores",
+            json={"storeId": "11111111-1111-1111-1111-111111111111", "tags": ["タグ2"]},
+            headers=headers,
+        )
+        modified = client.get(path, headers={"If-None-Match": etag})
+
+    SessionLocal = get_session_local()
+    with SessionLocal() as db:
+        store = db.execute(
+            select(Store.created_at, Store.updated_at).where(
+                Store.store_id == "11111111-1111-1111-1111-111111111111"
+            )
+        ).one()
+
+    assert response.status_code == 200
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert modified.status_code == 200
+    assert modified.headers["etag"] != etag
+    assert modified.json()["tags"] == ["タグ2"]
+    assert store.updated_at > store.created_at
+
+def test_tags_follow_db_changes(test_setup,sample_stores):
+    path = "/stores/11111111-1111-1111-1111-111111111111"
+
+    #中間テーブル、タグ名を直接変更した場合もトリガーでstores.tagsが更新される
+    SessionLocal = get_session_local()
+    with SessionLocal() as db:
+        db.execute(update(Tag).where(Tag.tag_name == "タグ1").values(tag_name="タグ1改"))
+        db.commit()
+    with TestClient(app) as client:
+        renamed = client.get(path).json()
+
+    with SessionLocal() as db:
+        db.execute(delete(stores_tags_table))
+        db.commit()
+    clear_store_caches()
+    with TestClient(app) as client:
+        unlinked = client.get(path).json()
+
+    assert renamed["tags"] == ["タグ1改"]
+    assert unlinked["tags"] == []
+
 @pytest.fixture
 def mock_db_exception():
     def _mock(exc_class,**kwarges):
@@ -196,7 +253,7 @@ def mock_db_exception():
             def execute(self,*args,**kwargs):
                 return mock_db.execute(*args,**kwargs)
             
-        app.dependency_overrides[get_db] = lambda: MockSession()
+        app.dependency_overrides[get_async_db] = lambda: MockSession()
         return MockSession
     return _mock
 
@@ -238,7 +295,7 @@ def test_db_error(store_id,test_setup,clean_app_dependency):
         yield MockSession()
 
     app.dependency_overrides = { }
-    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_db
 
     with TestClient(app) as client:
         response = client.get(f"/stores/{store_id}")
@@ -0,0 +1,119 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.main import app
+from app.models.store import Store
+from app.models.stores_tags_table import stores_tags_table
+from app.models.tag import Tag
+from app.services.store_clusters import cluster_cache, invalidate_store_location
+from database import get_session_local
+
+# 日本全体を含む範囲
+JAPAN_BBOX = "122,20,154,46"
+
+
+@pytest.fixture()
+def test_setup():
+    SessionLocal = get_session_local()
+    db = SessionLocal()
+
+    try:
+        #db初期化
+        db_init(db)
+        cluster_cache.clear()
+        yield db
+
+    finally:
+        #db初期化
+        db_init(db)
+        cluster_cache.clear()
+        db.close()
+
+def db_init(db:Session):
+    """
+    DB初期化
+
+    Args:
+        db (Session): dbセッション
+    """
+    db.execute(delete(stores_tags_table))
+    db.execute(delete(Tag))
+    db.execute(delete(Store))
+    db.commit()
+
+def insert_stores(store_datas):
+    SessionLocal = get_session_local()
+    with SessionLocal() as db:
+        db.execute(insert(Store).values(store_datas))
+        db.commit()
+
+@pytest.fixture
+def sample_stores():
+    # 東京駅、新宿駅、大阪駅付近
+    insert_stores([
+        {"store_name": "東京", "address": "住所1", "content": "内容1", "lat": 35.681236, "lng": 139.767125},
+        {"store_name": "新宿", "address": "住所2", "content": "内容2", "lat": 35.690921, "lng": 139.700258},
+        {"store_name": "大阪", "address": "住所3", "content": "内容3", "lat": 34.702485, "lng": 135.495951},
+    ])
+
+
+def test_success(test_setup,sample_stores):
+    path = f"/stores/clusters?z=5&bbox={JAPAN_BBOX}"
+
+    with TestClient(app) as client:
+        response = client.get(path)
+        response_json = response.json()
+
+    assert response.status_code == 200
+    assert response_json["zoom"] == 5
+    clusters = sorted(response_json["clusters"], key=lambda c: c["count"])
+    assert [c["count"] for c in clusters] == [1, 2]
+    assert clusters[0]["lat"] == pytest.approx(34.702485)
+    # 東京と新宿の重心
+    assert clusters[1]["lat"] == pytest.approx((35.681236 + 35.690921) / 2)
+    assert clusters[1]["lng"] == pytest.approx((139.767125 + 139.700258) / 2)
+
+def test_high_zoom_splits_clusters(test_setup,sample_stores):
+    path = "/stores/clusters?z=14&bbox=139.6,35.6,139.8,35.75"
+
+    with TestClient(app) as client:
+        response = client.get(path)
+
+    assert response.status_code == 200
+    assert [c["count"] for c in response.json()["clusters"]] == [1, 1]
+
+def test_cache_invalidation(test_setup,sample_stores):
+    path = f"/stores/clusters?z=5&bbox={JAPAN_BBOX}"
+
+    with TestClient(app) as client:
+        first = client.get(path).json()
+
+        # キャッシュ済みのセルに店舗を追加
+        insert_stores([
+            {"store_name": "大阪2", "address": "住所4", "content": "内容4", "lat": 34.70, "lng": 135.50},
+        ])
+        cached = client.get(path).json()
+
+        invalidate_store_location(34.70, 135.50)
+        refreshed = client.get(path).json()
+
+    assert cached == first
+    assert sorted(c["count"] for c in refreshed["clusters"]) == [2, 2]
+
+@pytest.mark.parametrize(
+    "query,expected_port",
+    [
+        pytest.param("bbox=122,20,154,46", 404, id="ズームなし"),
+        pytest.param("z=21&bbox=122,20,154,46", 404, id="ズーム上限超過"),
+        pytest.param("z=5", 404, id="範囲なし"),
+        pytest.param("z=5&bbox=122,20,154", 400, id="範囲の形式不正"),
+        pytest.param("z=20&bbox=122,20,154,46", 400, id="セル数上限超過"),
+    ]
+)
+def test_validation(query,expected_port,test_setup):
+    with TestClient(app) as client:
+        response = client.get(f"/stores/clusters?{query}")
+
+    assert response.status_code == expected_port
@@ -0,0 +1,167 @@
+import csv
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.main import app
+from app.models.store import Store
+from app.models.stores_tags_table import stores_tags_table
+from app.models.tag import Tag
+from app.services.store_events import clear_store_caches
+from database import get_session_local
+
+
+@pytest.fixture()
+def test_setup():
+    SessionLocal = get_session_local()
+    db = SessionLocal()
+
+    try:
+        #db初期化
+        db_init(db)
+        clear_store_caches()
+        yield db
+
+    finally:
+        #db初期化
+        db_init(db)
+        clear_store_caches()
+        db.close()
+
+def db_init(db:Session):
+    """
+    DB初期化
+
+    Args:
+        db (Session): dbセッション
+    """
+    db.execute(delete(stores_tags_table))
+    db.execute(delete(Tag))
+    db.execute(delete(Store))
+    db.commit()
+
+@pytest.fixture
+def sample_stores():
+    SessionLocal = get_session_local()
+    with SessionLocal() as db:
+        store_datas = [
+            {
+                "store_id": "11111111-1111-1111-1111-111111111111",
+                "store_name": "store1",
+                "address": "住所1",
+                "content": "内容1, \"改行\"\nあり",
+                "lat": 30,
+                "lng": 25,
+            },
+            {
+                "store_id": "22222222-2222-2222-2222-222222222222",
+                "store_name": "store2",
+                "address": "住所2",
+                "content": "内容2",
+                "geocode_status": "pending",
+            },
+        ]
+        store_ids = db.execute(insert(Store).values(store_datas).returning(Store.id)).scalars().all()
+
+        tag_datas = [
+            {"tag_id": "aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa", "tag_name": "タグ2"},
+            {"tag_id": "bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb", "tag_name": "タグ1"},
+        ]
+        tag_ids = db.execute(insert(Tag).values(tag_datas).returning(Tag.id)).scalars().all()
+
+        stores_tags_datas = [
+            {
+                "stores_tags_id": "aaaaaaaa-1111-1111-1111-aaaaaaaaaaaa",
+                "store_id": store_ids[0],
+                "tag_id": tag_ids[0],
+            },
+            {
+                "stores_tags_id": "aaaaaaaa-2222-2222-2222-aaaaaaaaaaaa",
+                "store_id": store_ids[0],
+                "tag_id": tag_ids[1],
+            },
+        ]
+        db.execute(insert(stores_tags_table).values(stores_tags_datas))
+        db.commit()
+
+EXPECTED = [
+    {
+        "storeId": "11111111-1111-1111-1111-111111111111",
+        "storeName": "store1",
+        "address": "住所1",
+        "content": "内容1, \"改行\"\nあり",
+        "lat": 30.0,
+        "lng": 25.0,
+        "tags": ["タグ1", "タグ2"],
+    },
+    {
+        "storeId": "22222222-2222-2222-2222-222222222222",
+        "storeName": "store2",
+        "address": "住所2",
+        "content": "内容2",
+        "lat": None,
+        "lng": None,
+        "tags": [],
+    },
+]
+
+def without_timestamps(record):
+    assert record.pop("createdAt")
+    assert record.pop("updatedAt")
+    return record
+
+
+def test_export_ndjson(test_setup,sample_stores):
+    with TestClient(app) as client:
+        response = client.get("/stores/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"] == 'attachment; filename="stores.ndjson"'
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [without_timestamps(record) for record in records] == EXPECTED
+
+def test_export_csv(test_setup,sample_stores):
+    with TestClient(app) as client:
+        response = client.get("/stores/export", params={"format": "csv"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    records = list(csv.DictReader(io.StringIO(response.content.decode("utf-8-sig"))))
+    assert len(records) == 2
+    assert records[0]["content"] == EXPECTED[0]["content"]
+    assert json.loads(records[0]["tags"]) == ["タグ1", "タグ2"]
+    assert records[1]["lat"] == ""
+
+def test_export_geojson(test_setup,sample_stores):
+    with TestClient(app) as client:
+        response = client.get("/stores/export", params={"format": "geojson"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/geo+json"
+    collection = response.json()
+    assert collection["type"] == "FeatureCollection"
+    features = collection["features"]
+    assert features[0]["id"] == EXPECTED[0]["storeId"]
+    assert features[0]["geometry"] == {"type": "Point", "coordinates": [25.0, 30.0]}
+    assert features[0]["properties"]["tags"] == ["タグ1", "タグ2"]
+    #緯度経度がない店舗はgeometryがnull
+    assert features[1]["geometry"] is None
+
+def test_export_empty(test_setup):
+    with TestClient(app) as client:
+        ndjson = client.get("/stores/export")
+        geojson = client.get("/stores/export", params={"format": "geojson"})
+
+    assert ndjson.text == ""
+    assert geojson.json() == {"type": "FeatureCollection", "features": []}
+
+def test_export_invalid_format(test_setup):
+    with TestClient(app) as client:
+        response = client.get("/stores/export", params={"format": "xml"})
+
+    assert response.status_code == 404
@@ -0,0 +1,127 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.main import app
+from app.models.store import Store
+from app.models.stores_tags_table import stores_tags_table
+from app.models.tag import Tag
+from app.services.store_events import clear_store_caches
+from database import get_session_local
+
+
+@pytest.fixture()
+def test_setup():
+    SessionLocal = get_session_local()
+    db = SessionLocal()
+
+    try:
+        #db初期化
+        db_init(db)
+        clear_store_caches()
+        yield db
+
+    finally:
+        #db初期化
+        db_init(db)
+        clear_store_caches()
+        db.close()
+
+def db_init(db:Session):
+    """
+    DB初期化
+
+    Args:
+        db (Session): dbセッション
+    """
+    db.execute(delete(stores_tags_table))
+    db.execute(delete(Tag))
+    db.execute(delete(Store))
+    db.commit()
+
+@pytest.fixture
+def sample_stores():
+    SessionLocal = get_session_local()
+    with SessionLocal() as db:
+        store_datas = [
+            {
+                "store_id": "11111111-1111-1111-1111-111111111111",
+                "store_name": "store1",
+                "address": "住所1",
+                "content": "内容1",
+                "lat": 30,
+                "lng": 25,
+            },
+            {
+                "store_id": "22222222-2222-2222-2222-222222222222",
+                "store_name": "store2",
+                "address": "住所2",
+                "content": "内容2",
+                "geocode_status": "failed",
+                "geocode_attempts": 5,
+                "geocode_error": "国土地理院APIから応答がありません",
+            },
+        ]
+        db.execute(insert(Store).values(store_datas))
+        db.commit()
+
+
+@pytest.mark.parametrize(
+    "store_id,expected_response",
+    [
+        pytest.param(
+            "11111111-1111-1111-1111-111111111111",
+            {
+                "storeId": "11111111-1111-1111-1111-111111111111",
+                "geocodeStatus": "resolved",
+                "geocodeAttempts": 0,
+                "geocodeError": None,
+                "lat": 30.0,
+                "lng": 25.0,
+            },
+            id="正常系 ジオコーディング完了",
+        ),
+        pytest.param(
+            "22222222-2222-2222-2222-222222222222",
+            {
+                "storeId": "22222222-2222-2222-2222-222222222222",
+                "geocodeStatus": "failed",
+                "geocodeAttempts": 5,
+                "geocodeError": "国土地理院APIから応答がありません",
+                "lat": None,
+                "lng": None,
+            },
+            id="正常系 ジオコーディング失敗",
+        ),
+    ]
+)
+def test_success(store_id,expected_response,test_setup,sample_stores):
+    path = f"/stores/{store_id}/geocode"
+
+    with TestClient(app) as client:
+        response = client.get(path)
+        response_json = response.json()
+
+    assert response.status_code == 200
+    assert response_json == expected_response
+
+def test_data_none(test_setup,sample_stores):
+    path = "/stores/11111112-1111-1111-1111-111111111111/geocode"
+
+    with TestClient(app) as client:
+        response = client.get(path)
+
+    assert response.status_code == 404
+    assert response.json() == {"detail":"該当する店舗が存在しませんでした"}
+
+def test_pending_store_in_detail(test_setup,sample_stores):
+    #ジオコーディング未完了の店舗は緯度、経度がnullで返る
+    path = "/stores/22222222-2222-2222-2222-222222222222"
+
+    with TestClient(app) as client:
+        response = client.get(path)
+
+    assert response.status_code == 200
+    assert response.json()["lat"] is None
+    assert response.json()["lng"] is None
@@ -0,0 +1,139 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.main import app
+from app.models.store import Store
+from app.models.stores_tags_table import stores_tags_table
+from app.models.tag import Tag
+from app.services.store_events import store_changed
+from app.services.store_tiles import tile_cache
+from app.utils.geo import lat_to_tile_y, lng_to_tile_x
+from database import get_session_local
+from tests.utils.test_mvt import decode
+
+TOKYO = (35.681236, 139.767125)
+
+
+@pytest.fixture()
+def test_setup():
+    SessionLocal = get_session_local()
+    db = SessionLocal()
+
+    try:
+        #db初期化
+        db_init(db)
+        tile_cache.clear()
+        yield db
+
+    finally:
+        #db初期化
+        db_init(db)
+        tile_cache.clear()
+        db.close()
+
+def db_init(db:Session):
+    """
+    DB初期化
+
+    Args:
+        db (Session): dbセッション
+    """
+    db.execute(delete(stores_tags_table))
+    db.execute(delete(Tag))
+    db.execute(delete(Store))
+    db.commit()
+
+def insert_store(store_data, tag_name=None):
+    SessionLocal = get_session_local()
+    with SessionLocal() as db:
+        store_id = db.execute(insert(Store).values(store_data).returning(Store.id)).scalar_one()
+        if tag_name:
+            tag_id = db.execute(insert(Tag).values(tag_name=tag_name).returning(Tag.id)).scalar_one()
+            db.execute(insert(stores_tags_table).values(store_id=store_id, tag_id=tag_id))
+        db.commit()
+
+@pytest.fixture
+def sample_stores():
+    insert_store({
+        "store_id": "11111111-1111-1111-1111-111111111111",
+        "store_name": "東京", "address": "住所1", "content": "内容1",
+        "lat": TOKYO[0], "lng": TOKYO[1],
+    }, tag_name="タグ1")
+    insert_store({
+        "store_id": "33333333-3333-3333-3333-333333333333",
+        "store_name": "大阪", "address": "住所3", "content": "内容3",
+        "lat": 34.702485, "lng": 135.495951,
+    })
+
+def tile_path(lat, lng, z):
+    return f"/stores/tiles/{z}/{lng_to_tile_x(lng, z)}/{lat_to_tile_y(lat, z)}.mvt"
+
+
+def test_success(test_setup,sample_stores):
+    with TestClient(app) as client:
+        response = client.get(tile_path(*TOKYO, 12))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.mapbox-vector-tile"
+    assert response.headers["cache-control"] == "public, max-age=60"
+
+    name, extent, _, features = decode(response.content)
+    assert name == "stores"
+    assert len(features) == 1
+    assert 0 <= features[0]["x"] <= extent and 0 <= features[0]["y"] <= extent
+    assert features[0]["properties"] == {
+        "storeId": "11111111-1111-1111-1111-111111111111",
+        "storeName": "東京",
+        "tags": json.dumps(["タグ1"], ensure_ascii=False),
+    }
+
+def test_low_zoom_contains_all(test_setup,sample_stores):
+    with TestClient(app) as client:
+        response = client.get("/stores/tiles/0/0/0.mvt")
+
+    assert response.status_code == 200
+    assert len(decode(response.content)[3]) == 2
+
+def test_empty_tile(test_setup,sample_stores):
+    with TestClient(app) as client:
+        response = client.get("/stores/tiles/12/0/0.mvt")
+
+    assert response.status_code == 200
+    assert response.content == b""
+
+def test_cache_invalidation(test_setup,sample_stores):
+    path = tile_path(*TOKYO, 12)
+
+    with TestClient(app) as client:
+        first = client.get(path).content
+
+        insert_store({
+            "store_name": "東京2", "address": "住所4", "content": "内容4",
+            "lat": TOKYO[0] + 0.001, "lng": TOKYO[1],
+        })
+        cached = client.get(path).content
+
+        store_changed(None, (TOKYO[0] + 0.001, TOKYO[1]))
+        refreshed = client.get(path).content
+
+    assert cached == first
+    assert len(decode(refreshed)[3]) == 2
+
+@pytest.mark.parametrize(
+    "path,expected_port",
+    [
+        pytest.param("/stores/tiles/2/4/0.mvt", 400, id="タイルX範囲外"),
+        pytest.param("/stores/tiles/2/0/4.mvt", 400, id="タイルY範囲外"),
+        pytest.param("/stores/tiles/23/0/0.mvt", 404, id="ズーム上限超過"),
+        pytest.param("/stores/tiles/a/0/0.mvt", 404, id="ズームが数値以外"),
+    ]
+)
+def test_validation(path,expected_port,test_setup):
+    with TestClient(app) as client:
+        response = client.get(path)
+
+    assert response.status_code == expected_port
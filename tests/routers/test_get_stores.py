@@ -8,7 +8,7 @@ from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, status
 from fastapi.testclient import TestClient
 from pytest_postgresql import factories
-from sqlalchemy import create_engine, delete, insert
+from sqlalchemy import create_engine, delete, insert, select
 from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
@@ -16,7 +16,8 @@ from app.main import app
 from app.models.store import Store
 from app.models.stores_tags_table import stores_tags_table
 from app.models.tag import Tag
-from database import get_db, get_session_local
+from app.services.store_events import clear_store_caches, store_changed
+from database import get_async_db, get_session_local
 
 postgresql_noproc = factories.postgresql_noproc()
 postgresql_fixture = factories.postgresql(
@@ -32,11 +33,13 @@ def test_setup():
     try:
         #db初期化
         db_init(db)
+        clear_store_caches()
         yield db
 
     finally:
         #db初期化
         db_init(db)
+        clear_store_caches()
         db.close()
 
 def db_init(db:Session):
@@ -240,6 +243,247 @@ def test_success_tag_name_filter(key,value,test_setup,sample_stores):
     assert response.status_code == 200
     assert response_json == expected_response
 
+@pytest.mark.parametrize(
+    "query,expected_store_ids",
+    [
+        pytest.param("minLat=25", ["11111111-1111-1111-1111-111111111111"], id="正常系 最小緯度"),
+        pytest.param("maxLat=25&maxLng=20", ["22222222-2222-2222-2222-222222222222"], id="正常系 最大緯度経度"),
+        pytest.param("minLat=10&maxLat=40&minLng=10&maxLng=30", ["11111111-1111-1111-1111-111111111111", "22222222-2222-2222-2222-222222222222"], id="正常系 全店舗を含む範囲"),
+        pytest.param("minLat=40&maxLat=50", [], id="正常系 範囲内に店舗なし"),
+    ]
+)
+def test_success_bounding_box_filter(query,expected_store_ids,test_setup,sample_stores):
+    path = f"/stores?{query}"
+
+    with TestClient(app) as client:
+        response = client.get(path)
+        response_json = response.json()
+
+    assert response.status_code == 200
+    assert [store["storeId"] for store in response_json["stores"]] == expected_store_ids
+
+@pytest.mark.parametrize(
+    "query,expected_port",
+    [
+        pytest.param("minLat=30&maxLat=20", 400, id="最小緯度が最大緯度を超過"),
+        pytest.param("minLng=30&maxLng=20", 400, id="最小経度が最大経度を超過"),
+        pytest.param("minLat=91", 404, id="バリデーションチェックエラー 緯度範囲外"),
+        pytest.param("maxLng=-181", 404, id="バリデーションチェックエラー 経度範囲外"),
+    ]
+)
+def test_bounding_box_validation(query,expected_port,test_setup):
+    path = f"/stores?{query}"
+
+    with TestClient(app) as client:
+        response = client.get(path)
+
+    assert response.status_code == expected_port
+
+def test_success_pagination(test_setup,sample_stores):
+    with TestClient(app) as client:
+        first_page = client.get("/stores?limit=1").json()
+        second_page = client.get(f"/stores?limit=1&cursor={first_page['nextCursor']}").json()
+
+    assert [store["storeId"] for store in first_page["stores"]] == ["11111111-1111-1111-1111-111111111111"]
+    assert [store["storeId"] for store in second_page["stores"]] == ["22222222-2222-2222-2222-222222222222"]
+    # 最終ページはnextCursorを返さない
+    assert "nextCursor" not in second_page
+
+def test_success_pagination_last_page_exact(test_setup,sample_stores):
+    with TestClient(app) as client:
+        response_json = client.get("/stores?limit=2").json()
+
+    assert len(response_json["stores"]) == 2
+    assert "nextCursor" not in response_json
+
+@pytest.mark.parametrize(
+    "cursor_query",
+    [
+        pytest.param("cursor=invalid", id="カーソルの形式不正"),
+        pytest.param("cursor={cursor}&serach_name=store", id="検索条件が異なる"),
+    ]
+)
+def test_pagination_invalid_cursor(cursor_query,test_setup,sample_stores):
+    with TestClient(app) as client:
+        cursor = client.get("/stores?limit=1").json()["nextCursor"]
+        response = client.get(f"/stores?limit=1&{cursor_query.format(cursor=cursor)}")
+
+    assert response.status_code == 400
+    assert response.json() == {"detail":"カーソルが不正です"}
+
+@pytest.mark.parametrize(
+    "limit,expected_port",
+    [
+        pytest.param(0, 404, id="取得件数下限超過"),
+        pytest.param(1001, 404, id="取得件数上限超過"),
+    ]
+)
+def test_pagination_validation(limit,expected_port,test_setup):
+    with TestClient(app) as client:
+        response = client.get(f"/stores?limit={limit}")
+
+    assert response.status_code == expected_port
+
+@pytest.mark.parametrize(
+    "serach_name,expected_store_ids",
+    [
+        pytest.param("STORE", ["11111111-1111-1111-1111-111111111111", "22222222-2222-2222-2222-222222222222"], id="正常系 大文字小文字を区別しない"),
+        pytest.param("%", [], id="正常系 ワイルドカードをエスケープ"),
+        pytest.param("_", [], id="正常系 1文字ワイルドカードをエスケープ"),
+    ]
+)
+def test_success_search_name_escape(serach_name,expected_store_ids,test_setup,sample_stores):
+    with TestClient(app) as client:
+        response = client.get("/stores", params={"serach_name": serach_name})
+
+    assert response.status_code == 200
+    assert [store["storeId"] for store in response.json()["stores"]] == expected_store_ids
+
+def test_success_sort_similarity(test_setup,sample_stores):
+    with TestClient(app) as client:
+        response = client.get("/stores?serach_name=store2&sort=similarity")
+
+    assert response.status_code == 200
+    assert [store["storeId"] for store in response.json()["stores"]] == ["22222222-2222-2222-2222-222222222222"]
+
+@pytest.mark.parametrize(
+    "query,expected_port",
+    [
+        pytest.param("sort=name", 404, id="並び順の値不正"),
+        pytest.param("sort=similarity&serach_name=store&cursor=abc", 400, id="類似度順でカーソル指定"),
+    ]
+)
+def test_sort_validation(query,expected_port,test_setup):
+    with TestClient(app) as client:
+        response = client.get(f"/stores?{query}")
+
+    assert response.status_code == expected_port
+
+@pytest.fixture
+def sample_stores_multi_tags(sample_stores):
+    #store1にタグ2を追加し、タグ1・タグ2の両方を持つ店舗にする
+    SessionLocal = get_session_local()
+    with SessionLocal() as db:
+        store_id = db.execute(
+            select(Store.id).where(Store.store_id == "11111111-1111-1111-1111-111111111111")
+        ).scalar_one()
+        tag_id = db.execute(select(Tag.id).where(Tag.tag_name == "タグ2")).scalar_one()
+        db.execute(insert(stores_tags_table).values(store_id=store_id, tag_id=tag_id))
+        db.commit()
+
+@pytest.mark.parametrize(
+    "query,expected_store_ids",
+    [
+        pytest.param("tags=タグ1&tags=タグ2", ["11111111-1111-1111-1111-111111111111"], id="正常系 全て含む"),
+        pytest.param("tags=タグ1&tags=タグ2&match=any", ["11111111-1111-1111-1111-111111111111", "22222222-2222-2222-2222-222222222222"], id="正常系 いずれかを含む"),
+        pytest.param("tag_name=タグ1&tags=タグ2", ["11111111-1111-1111-1111-111111111111"], id="正常系 tag_nameとtagsの併用"),
+        pytest.param("tags=タグ2", ["11111111-1111-1111-1111-111111111111", "22222222-2222-2222-2222-222222222222"], id="正常系 1件指定"),
+        pytest.param("tags=タグ1&tags=タグなし", [], id="正常系 存在しないタグを含む"),
+    ]
+)
+def test_success_multi_tags_filter(query,expected_store_ids,test_setup,sample_stores_multi_tags):
+    with TestClient(app) as client:
+        response = client.get(f"/stores?{query}")
+
+    assert response.status_code == 200
+    assert [store["storeId"] for store in response.json()["stores"]] == expected_store_ids
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        pytest.param("tags=タグ1&match=none", id="一致条件の値不正"),
+        pytest.param(f"tags={'t' * 101}", id="タグ名101文字"),
+    ]
+)
+def test_multi_tags_validation(query,test_setup):
+    with TestClient(app) as client:
+        response = client.get(f"/stores?{query}")
+
+    assert response.status_code == 404
+
+def test_response_cache(test_setup,sample_stores):
+    with TestClient(app) as client:
+        first = client.get("/stores").json()
+
+        # キャッシュ済みの状態で店舗を追加
+        SessionLocal = get_session_local()
+        with SessionLocal() as db:
+            db.execute(insert(Store).values(
+                store_id="33333333-3333-3333-3333-333333333333",
+                store_name="store3", address="住所3", content="内容3", lat=10, lng=15,
+            ))
+            db.commit()
+        cached = client.get("/stores").json()
+
+        store_changed("33333333-3333-3333-3333-333333333333", (10, 15))
+        refreshed = client.get("/stores").json()
+
+        stats = client.get("/metrics/cache").json()["stores"]
+
+    assert cached == first
+    assert len(refreshed["stores"]) == 3
+    assert stats["hits"] >= 1
+    assert stats["misses"] >= 2
+
+def test_geojson(test_setup,sample_stores):
+    with TestClient(app) as client:
+        response = client.get("/stores?format=geojson&limit=1")
+        cached = client.get("/stores?format=geojson&limit=1")
+        #JSON形式のキャッシュとは区別される
+        json_response = client.get("/stores?limit=1")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/geo+json"
+    collection = response.json()
+    assert collection["type"] == "FeatureCollection"
+    assert collection["features"] == [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [25.0, 30.0]},
+            "properties": {"storeName": "store1", "tags": ["タグ1"]},
+            "id": "11111111-1111-1111-1111-111111111111",
+        }
+    ]
+    assert collection["nextCursor"]
+    assert cached.json() == collection
+    assert "stores" in json_response.json()
+
+def test_conditional_get(test_setup,sample_stores):
+    with TestClient(app) as client:
+        response = client.get("/stores")
+        etag = response.headers["etag"]
+        last_modified = response.headers["last-modified"]
+
+        #キャッシュ使用時
+        cached = client.get("/stores", headers={"If-None-Match": etag})
+        #キャッシュ未使用時(一覧のSQLを実行せずに判定)
+        clear_store_caches()
+        not_modified = client.get("/stores", headers={"If-None-Match": etag})
+        not_modified_since = client.get("/stores", headers={"If-Modified-Since": last_modified})
+
+        #DBを直接更新した場合もトリガーでバージョンが加算される
+        SessionLocal = get_session_local()
+        with SessionLocal() as db:
+            db.execute(insert(Store).values(
+                store_id="44444444-4444-4444-4444-444444444444",
+                store_name="store4", address="住所4", content="内容4", lat=10, lng=15,
+            ))
+            db.commit()
+        clear_store_caches()
+        modified = client.get("/stores", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert etag.startswith('W/"')
+    assert response.headers["cache-control"] == "no-cache"
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+    assert not_modified_since.status_code == 304
+    assert modified.status_code == 200
+    assert modified.headers["etag"] != etag
+    assert len(modified.json()["stores"]) == 4
+
 @pytest.fixture
 def mock_db_exception():
     def _mock(exc_class,**kwarges):
@@ -250,7 +494,7 @@ def mock_db_exception():
             def execute(self,*args,**kwargs):
                 return mock_db.execute(*args,**kwargs)
             
-        app.dependency_overrides[get_db] = lambda: MockSession()
+        app.dependency_overrides[get_async_db] = lambda: MockSession()
         return MockSession
     return _mock
 
@@ -286,7 +530,7 @@ def test_db_error(test_setup,clean_app_dependency):
         yield MockSession()
 
     app.dependency_overrides = { }
-    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_db
 
     with TestClient(app) as client:
         response = client.get("/stores")
@@ -0,0 +1,105 @@
+import os
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.config.constants import StoreBatch
+from app.main import app
+from app.models.store import Store
+from app.models.stores_tags_table import stores_tags_table
+from app.models.tag import Tag
+from app.services.store_events import clear_store_caches
+from database import get_session_local
+
+
+@pytest.fixture()
+def test_setup():
+    SessionLocal = get_session_local()
+    db = SessionLocal()
+
+    try:
+        #db初期化
+        db_init(db)
+        clear_store_caches()
+        yield db
+
+    finally:
+        #db初期化
+        db_init(db)
+        clear_store_caches()
+        db.close()
+
+def db_init(db:Session):
+    """
+    DB初期化
+
+    Args:
+        db (Session): dbセッション
+    """
+    db.execute(delete(stores_tags_table))
+    db.execute(delete(Tag))
+    db.execute(delete(Store))
+    db.commit()
+
+#POSTは認証が必要
+HEADERS = {"Authorization": f"Bearer {os.getenv('API_TOKEN')}"}
+
+
+def store(i, tags):
+    return {
+        "storeName": f"store{i}",
+        "address": f"住所{i % 3}",
+        "content": f"内容{i}",
+        "tags": tags,
+    }
+
+
+def test_create_stores_batch(test_setup):
+    stores = [store(i, ["タグ1", f"タグ{i % 2 + 2}"]) for i in range(10)]
+    geocode_address = AsyncMock(return_value=(35.6, 139.7))
+    with patch("app.services.geocode_worker.geocode_address", geocode_address):
+        with TestClient(app) as client:
+            response = client.post("/stores/batch", json=stores, headers=HEADERS)
+            store_ids = [s["storeId"] for s in response.json()["stores"]]
+            responses = [client.get(f"/stores/{store_id}").json() for store_id in store_ids]
+
+    SessionLocal = get_session_local()
+    with SessionLocal() as db:
+        tag_names = db.execute(select(Tag.tag_name).order_by(Tag.tag_name)).scalars().all()
+        links = db.execute(select(func.count()).select_from(stores_tags_table)).scalar_one()
+
+    assert response.status_code == 202
+    assert len(store_ids) == 10
+    #リクエスト順に店舗IDを返す
+    assert [r["storeName"] for r in responses] == [f"store{i}" for i in range(10)]
+    assert sorted(responses[0]["tags"]) == ["タグ1", "タグ2"]
+    assert sorted(responses[1]["tags"]) == ["タグ1", "タグ3"]
+    assert tag_names == ["タグ1", "タグ2", "タグ3"]
+    assert links == 20
+
+@pytest.mark.parametrize(
+    "count",
+    [
+        pytest.param(0, id="0件"),
+        pytest.param(StoreBatch.MAX_SIZE + 1, id="上限超過"),
+    ]
+)
+def test_create_stores_batch_size(count,test_setup):
+    with TestClient(app) as client:
+        response = client.post(
+            "/stores/batch", json=[store(i, []) for i in range(count)], headers=HEADERS
+        )
+
+    assert response.status_code == 400
+    assert response.json() == {
+        "detail": f"一度に登録できる店舗は1件以上{StoreBatch.MAX_SIZE}件以下です"
+    }
+
+def test_create_stores_batch_unauthorized(test_setup):
+    with TestClient(app) as client:
+        response = client.post("/stores/batch", json=[store(0, [])])
+
+    assert response.status_code == 401
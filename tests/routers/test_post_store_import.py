@@ -0,0 +1,148 @@
+import csv
+import os
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.main import app
+from app.models.store import Store
+from app.models.stores_tags_table import stores_tags_table
+from app.models.tag import Tag
+from app.services.store_events import clear_store_caches
+from database import get_session_local
+
+BK_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "db", "bk")
+STORES_CSV = os.path.join(BK_DIR, "public.stores.csv")
+TAGS_CSV = os.path.join(BK_DIR, "public.tags.csv")
+STORES_TAGS_CSV = os.path.join(BK_DIR, "public.stores_tags.csv")
+
+#POSTは認証が必要
+HEADERS = {"Authorization": f"Bearer {os.getenv('API_TOKEN')}"}
+
+
+@pytest.fixture()
+def test_setup():
+    SessionLocal = get_session_local()
+    db = SessionLocal()
+
+    try:
+        #db初期化
+        db_init(db)
+        clear_store_caches()
+        yield db
+
+    finally:
+        #db初期化
+        db_init(db)
+        clear_store_caches()
+        db.close()
+
+def db_init(db:Session):
+    """
+    DB初期化
+
+    Args:
+        db (Session): dbセッション
+    """
+    db.execute(delete(stores_tags_table))
+    db.execute(delete(Tag))
+    db.execute(delete(Store))
+    db.commit()
+
+def csv_rows(path):
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        return list(csv.DictReader(f))
+
+def post_import(client, files):
+    return client.post(
+        "/stores/import",
+        files={name: open(path, "rb") for name, path in files.items()},
+        headers=HEADERS,
+    )
+
+ALL_FILES = {"stores": STORES_CSV, "tags": TAGS_CSV, "stores_tags": STORES_TAGS_CSV}
+
+
+def test_import_bk(test_setup):
+    stores = csv_rows(STORES_CSV)
+    tags = csv_rows(TAGS_CSV)
+    stores_tags = csv_rows(STORES_TAGS_CSV)
+
+    with TestClient(app) as client:
+        response = post_import(client, ALL_FILES)
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "storesInserted": len(stores),
+        "storesUpdated": 0,
+        "tagsInserted": len({tag["tag_name"] for tag in tags}),
+        "storesTagsInserted": len(stores_tags),
+        "geocodePending": 0,
+    }
+
+    db = test_setup
+    assert db.scalar(select(func.count()).select_from(Store)) == len(stores)
+    #CSVの店舗UUIDは{}を除いて登録される
+    store = db.execute(
+        select(Store.store_name, Store.lat, Store.geocode_status)
+        .where(Store.store_id == stores[0]["store_id"].strip("{}"))
+    ).one()
+    assert store.store_name == stores[0]["store_name"]
+    assert store.lat == float(stores[0]["lat"])
+    assert store.geocode_status == "resolved"
+
+def test_import_twice_updates(test_setup):
+    stores = csv_rows(STORES_CSV)
+
+    with TestClient(app) as client:
+        post_import(client, ALL_FILES)
+        response = post_import(client, ALL_FILES)
+
+    #同じ店舗UUID、タグ名、店舗とタグの組み合わせは重複登録しない
+    assert response.status_code == 200
+    assert response.json() == {
+        "storesInserted": 0,
+        "storesUpdated": len(stores),
+        "tagsInserted": 0,
+        "storesTagsInserted": 0,
+        "geocodePending": 0,
+    }
+
+def test_import_without_coordinates(test_setup, tmp_path):
+    path = tmp_path / "stores.csv"
+    path.write_text(
+        '"id","store_id","store_name","address","content","lat","lng","created_at","updated_at"\n'
+        '1,,"store1","東京都中央区銀座6-13-9","内容1",,,,\n',
+        encoding="utf-8",
+    )
+
+    with patch(
+        "app.services.geocode_worker.geocode_address",
+        AsyncMock(return_value=(35.6, 139.7)),
+    ):
+        with TestClient(app) as client:
+            response = post_import(client, {"stores": path})
+
+    assert response.status_code == 200
+    assert response.json()["storesInserted"] == 1
+    assert response.json()["geocodePending"] == 1
+
+def test_import_invalid_csv(test_setup, tmp_path):
+    path = tmp_path / "stores.csv"
+    path.write_text(
+        '"id","store_id","store_name","address","content","lat","lng","created_at","updated_at"\n'
+        '1,not-a-uuid,"store1","住所1","内容1",abc,def,,\n',
+        encoding="utf-8",
+    )
+
+    with TestClient(app) as client:
+        response = post_import(client, {"stores": path})
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "CSVの形式が不正です"}
+
+    db = test_setup
+    assert db.scalar(select(func.count()).select_from(Store)) == 0
@@ -0,0 +1,196 @@
+import os
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.main import app
+from app.models.store import Store
+from app.models.stores_tags_table import stores_tags_table
+from app.models.tag import Tag
+from app.services.store_events import clear_store_caches
+from database import get_session_local
+
+
+@pytest.fixture()
+def test_setup():
+    SessionLocal = get_session_local()
+    db = SessionLocal()
+
+    try:
+        #db初期化
+        db_init(db)
+        clear_store_caches()
+        yield db
+
+    finally:
+        #db初期化
+        db_init(db)
+        clear_store_caches()
+        db.close()
+
+def db_init(db:Session):
+    """
+    DB初期化
+
+    Args:
+        db (Session): dbセッション
+    """
+    db.execute(delete(stores_tags_table))
+    db.execute(delete(Tag))
+    db.execute(delete(Store))
+    db.commit()
+
+def wait_geocode(client, store_id, timeout=5):
+    """ジオコーディングが処理待ちでなくなるまで待つ"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response_json = client.get(f"/stores/{store_id}/geocode").json()
+        if response_json["geocodeStatus"] != "pending":
+            return response_json
+        time.sleep(0.05)
+    raise AssertionError("ジオコーディングが完了しませんでした")
+
+#POST、PATCHは認証が必要
+HEADERS = {"Authorization": f"Bearer {os.getenv('API_TOKEN')}"}
+
+STORE = {
+    "storeName": "store1",
+    "address": "東京都中央区銀座6-13-9",
+    "content": "内容1",
+    "tags": ["タグ1"],
+}
+
+
+def test_create_store_accepted(test_setup):
+    with patch(
+        "app.services.geocode_worker.geocode_address",
+        AsyncMock(return_value=(35.6, 139.7)),
+    ):
+        with TestClient(app) as client:
+            response = client.post("/stores/", json=STORE, headers=HEADERS)
+            store_id = response.json()["storeId"]
+
+            assert response.status_code == 202
+            assert response.json()["geocodeStatus"] == "pending"
+            assert response.headers["Location"] == f"/stores/{store_id}/geocode"
+
+            geocode = wait_geocode(client, store_id)
+            store = client.get(f"/stores/{store_id}").json()
+
+    assert geocode["geocodeStatus"] == "resolved"
+    assert geocode["geocodeAttempts"] == 1
+    assert (store["lat"], store["lng"]) == (35.6, 139.7)
+
+def test_create_store_tags_not_duplicated(test_setup):
+    with patch(
+        "app.services.geocode_worker.geocode_address",
+        AsyncMock(return_value=(35.6, 139.7)),
+    ):
+        with TestClient(app) as client:
+            first = client.post("/stores/", json=STORE, headers=HEADERS).json()["storeId"]
+            #キャッシュ未使用でも既存のタグを使用する
+            clear_store_caches()
+            second = client.post(
+                "/stores/", json={**STORE, "tags": ["タグ1", "タグ2", "タグ2"]}, headers=HEADERS
+            ).json()["storeId"]
+
+            first_tags = client.get(f"/stores/{first}").json()["tags"]
+            second_tags = client.get(f"/stores/{second}").json()["tags"]
+
+    SessionLocal = get_session_local()
+    with SessionLocal() as db:
+        tag_names = db.execute(select(Tag.tag_name).order_by(Tag.tag_name)).scalars().all()
+
+    assert tag_names == ["タグ1", "タグ2"]
+    assert first_tags == ["タグ1"]
+    assert sorted(second_tags) == ["タグ1", "タグ2"]
+
+def test_create_store_address_not_found(test_setup):
+    with patch(
+        "app.services.geocode_worker.geocode_address",
+        AsyncMock(return_value=None),
+    ):
+        with TestClient(app) as client:
+            store_id = client.post("/stores/", json=STORE, headers=HEADERS).json()["storeId"]
+            geocode = wait_geocode(client, store_id)
+
+    assert geocode["geocodeStatus"] == "failed"
+    assert geocode["geocodeError"] == "該当する住所が見つかりません"
+    assert geocode["lat"] is None
+
+def test_create_store_gsi_error_retried(test_setup):
+    geocode_address = AsyncMock(side_effect=[
+        HTTPException(status_code=503, detail="国土地理院APIが一時的に利用できません"),
+        (35.6, 139.7),
+    ])
+    with patch("app.services.geocode_worker.geocode_address", geocode_address), \
+         patch("app.services.geocode_worker.retry_delay", return_value=0):
+        with TestClient(app) as client:
+            response = client.post("/stores/", json=STORE, headers=HEADERS)
+            geocode = wait_geocode(client, response.json()["storeId"])
+
+    #国土地理院APIの障害時も登録自体は成功する
+    assert response.status_code == 202
+    assert geocode["geocodeStatus"] == "resolved"
+    assert geocode["geocodeAttempts"] == 2
+
+def test_update_store_address_accepted(test_setup):
+    with patch(
+        "app.services.geocode_worker.geocode_address",
+        AsyncMock(side_effect=[(35.6, 139.7), (34.7, 135.5)]),
+    ):
+        with TestClient(app) as client:
+            store_id = client.post("/stores/", json=STORE, headers=HEADERS).json()["storeId"]
+            wait_geocode(client, store_id)
+
+            response = client.patch(
+                "/stores/",
+                json={"storeId": store_id, "address": "大阪府大阪市北区梅田1-1"},
+                headers=HEADERS,
+            )
+            assert response.status_code == 202
+            geocode = wait_geocode(client, store_id)
+
+            #住所を含まない更新は204
+            response = client.patch(
+                "/stores/", json={"storeId": store_id, "content": "内容2"}, headers=HEADERS
+            )
+            assert response.status_code == 204
+
+    assert geocode["geocodeStatus"] == "resolved"
+    assert (geocode["lat"], geocode["lng"]) == (34.7, 135.5)
+
+def test_update_store_address_not_found(test_setup):
+    with patch(
+        "app.services.geocode_worker.geocode_address",
+        AsyncMock(side_effect=[(35.6, 139.7), None]),
+    ):
+        with TestClient(app) as client:
+            store_id = client.post("/stores/", json=STORE, headers=HEADERS).json()["storeId"]
+            wait_geocode(client, store_id)
+            #変更前の住所の地点で検索される
+            nearby_before = client.get("/stores/nearby?lat=35.6&lng=139.7").json()["stores"]
+
+            response = client.patch(
+                "/stores/",
+                json={"storeId": store_id, "address": "存在しない住所"},
+                headers=HEADERS,
+            )
+            assert response.status_code == 202
+            geocode = wait_geocode(client, store_id)
+
+            store = client.get(f"/stores/{store_id}").json()
+            nearby_after = client.get("/stores/nearby?lat=35.6&lng=139.7").json()["stores"]
+
+    #変更前の住所の緯度経度は残さない
+    assert geocode["geocodeStatus"] == "failed"
+    assert geocode["geocodeError"] == "該当する住所が見つかりません"
+    assert (geocode["lat"], geocode["lng"]) == (None, None)
+    assert (store["lat"], store["lng"]) == (None, None)
+    assert [s["storeId"] for s in nearby_before] == [store_id]
+    assert nearby_after == []
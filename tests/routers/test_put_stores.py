@@ -1,11 +1,16 @@
+import os
+
 import pytest
+from fastapi.testclient import TestClient
 from pytest_postgresql import factories
-from sqlalchemy import create_engine, delete, insert
+from sqlalchemy import create_engine, delete, insert, select
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
+from app.main import app
 from app.models.store import Store
 from app.models.stores_tags_table import stores_tags_table
 from app.models.tag import Tag
+from app.services.store_events import clear_store_caches
 from database import get_db, get_session_local
 
 postgresql_noproc = factories.postgresql_noproc()
@@ -44,4 +49,75 @@ def db_init(db:Session):
     db.execute(delete_store_stmt)
     db.commit()
 
+#PATCHは認証が必要
+HEADERS = {"Authorization": f"Bearer {os.getenv('API_TOKEN')}"}
+
+STORE_ID = "11111111-1111-1111-1111-111111111111"
+
+
+@pytest.fixture
+def sample_store():
+    SessionLocal = get_session_local()
+    with SessionLocal() as db:
+        store_pk = db.execute(insert(Store).values(
+            store_id=STORE_ID, store_name="store1", address="住所1", content="内容1", lat=30, lng=25,
+        ).returning(Store.id)).scalar_one()
+        tag_pks = db.execute(insert(Tag).values([
+            {"tag_id": "aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa", "tag_name": "タグ1"},
+            {"tag_id": "bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb", "tag_name": "タグ2"},
+        ]).returning(Tag.id)).scalars().all()
+        db.execute(insert(stores_tags_table).values([
+            {"stores_tags_id": "aaaaaaaa-1111-1111-1111-aaaaaaaaaaaa", "store_id": store_pk, "tag_id": tag_pks[0]},
+        ]))
+        db.commit()
+    clear_store_caches()
+
+
+def patch_store(body):
+    with TestClient(app) as client:
+        response = client.patch("/stores/", json={"storeId": STORE_ID, **body}, headers=HEADERS)
+        store = client.get(f"/stores/{STORE_ID}").json()
+    return response, store
+
+
+@pytest.mark.parametrize(
+    "tags,expected_tags",
+    [
+        pytest.param(["タグ1", "タグ2"], ["タグ1", "タグ2"], id="既存タグを追加"),
+        pytest.param(["タグ2", "タグ3"], ["タグ2", "タグ3"], id="既存タグと新規タグに置き換え"),
+        pytest.param(["タグ3", "タグ3"], ["タグ3"], id="重複指定"),
+        pytest.param([], [], id="全て解除"),
+    ]
+)
+def test_update_tags(tags,expected_tags,test_setup,sample_store):
+    response, store = patch_store({"tags": tags})
+
+    SessionLocal = get_session_local()
+    with SessionLocal() as db:
+        tag_names = db.execute(select(Tag.tag_name)).scalars().all()
+
+    assert response.status_code == 204
+    assert sorted(store["tags"]) == expected_tags
+    assert store["storeName"] == "store1"
+    #同名のタグは重複して作成されない
+    assert len(tag_names) == len(set(tag_names))
+
+def test_update_without_tags(test_setup,sample_store):
+    response, store = patch_store({"storeName": "store1-2"})
+
+    assert response.status_code == 204
+    assert store["storeName"] == "store1-2"
+    assert store["content"] == "内容1"
+    assert store["tags"] == ["タグ1"]
+
+def test_update_not_found(test_setup):
+    response, _ = patch_store({"tags": ["タグ1"]})
+
+    SessionLocal = get_session_local()
+    with SessionLocal() as db:
+        tag_names = db.execute(select(Tag.tag_name)).scalars().all()
 
+    assert response.status_code == 404
+    assert response.json() == {"detail": "該当する店舗が存在しませんでした"}
+    #存在しない店舗のタグは作成しない
+    assert tag_names == []
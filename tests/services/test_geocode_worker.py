@@ -0,0 +1,71 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+from uuid import UUID
+
+import pytest
+from fastapi import HTTPException
+
+from app.config.constants import GeocodeStatus, GeocodeWorker
+from app.services import geocode_worker
+from app.services.geocode_worker import (GeocodeJob, enqueue_geocode,
+                                         process_job, retry_delay)
+
+JOB = GeocodeJob(UUID("11111111-1111-1111-1111-111111111111"), "銀座")
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    queue = asyncio.Queue(maxsize=1)
+    monkeypatch.setattr(geocode_worker, "_queue", queue)
+    return queue
+
+
+def test_enqueue_without_worker(monkeypatch):
+    """ワーカー未起動の場合は登録しないこと"""
+    monkeypatch.setattr(geocode_worker, "_queue", None)
+    assert not enqueue_geocode(*JOB)
+
+@pytest.mark.asyncio
+async def test_enqueue_queue_full(queue):
+    """キューが上限に達している場合は登録しないこと"""
+    assert enqueue_geocode(*JOB)
+    assert not enqueue_geocode(*JOB)
+    assert queue.qsize() == 1
+
+def test_retry_delay():
+    for attempts in range(1, 10):
+        delay = min(GeocodeWorker.RETRY_MAX, GeocodeWorker.RETRY_BASE * 2 ** (attempts - 1))
+        assert delay / 2 <= retry_delay(attempts) <= delay
+
+@pytest.mark.asyncio
+async def test_process_job_resolved(queue):
+    """座標が取得できた場合は結果を反映し、リトライしないこと"""
+    with patch.object(geocode_worker, "geocode_address", AsyncMock(return_value=(35.6, 139.7))), \
+         patch.object(geocode_worker, "_apply_result", AsyncMock(return_value=(GeocodeStatus.RESOLVED, 1))) as mock_apply:
+        await process_job(JOB)
+
+    mock_apply.assert_awaited_once_with(JOB, (35.6, 139.7), None)
+    assert queue.empty()
+
+@pytest.mark.asyncio
+async def test_process_job_retry(queue):
+    """一時的なエラーの場合は待機後にキューへ再登録すること"""
+    error = HTTPException(status_code=503, detail="国土地理院APIが一時的に利用できません")
+    with patch.object(geocode_worker, "geocode_address", AsyncMock(side_effect=error)), \
+         patch.object(geocode_worker, "_apply_result", AsyncMock(return_value=(GeocodeStatus.PENDING, 1))) as mock_apply, \
+         patch.object(geocode_worker, "retry_delay", return_value=0):
+        await process_job(JOB)
+        assert len(geocode_worker._retrying) == 1
+        assert await asyncio.wait_for(queue.get(), timeout=1) == JOB
+
+    mock_apply.assert_awaited_once_with(JOB, None, "国土地理院APIが一時的に利用できません")
+
+@pytest.mark.asyncio
+async def test_process_job_stale(queue):
+    """住所が変更済みの場合は結果を破棄すること"""
+    with patch.object(geocode_worker, "geocode_address", AsyncMock(return_value=(35.6, 139.7))), \
+         patch.object(geocode_worker, "_apply_result", AsyncMock(return_value=None)):
+        await process_job(JOB)
+
+    assert queue.empty()
+    assert not geocode_worker._retrying
@@ -0,0 +1,141 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.config.constants import Geocoding
+from app.services import geocoding
+from app.services.geocoding import _MISSING, geocode_address, geocoding_stats
+
+
+@pytest.fixture(autouse=True)
+def clear_memory_cache():
+    geocoding.memory_cache.clear()
+    yield
+    geocoding.memory_cache.clear()
+
+
+def gsi_response(data):
+    response = MagicMock()
+    response.json.return_value = data
+    return response
+
+
+@pytest.mark.asyncio
+async def test_geocode_address_fetch_and_cache():
+    """APIの結果がメモリとDBに保存され、2回目はAPIを呼び出さないこと"""
+    data = [{"geometry": {"coordinates": [139.7, 35.6]}}]
+    with patch.object(geocoding, "fetch_coordinates_from_gsi", AsyncMock(return_value=gsi_response(data))) as mock_fetch, \
+         patch.object(geocoding, "_load_from_db", AsyncMock(return_value=_MISSING)), \
+         patch.object(geocoding, "_save_to_db", AsyncMock()) as mock_save:
+        assert await geocode_address("東京都中央区銀座６－１３－９") == (35.6, 139.7)
+        #表記揺れがあっても同じキャッシュを使用する
+        assert await geocode_address("東京都中央区銀座6-13-9") == (35.6, 139.7)
+
+    mock_fetch.assert_awaited_once_with({"q": "東京都中央区銀座６－１３－９"})
+    mock_save.assert_awaited_once_with(
+        "東京都中央区銀座6-13-9", (35.6, 139.7), Geocoding.FOUND_TTL
+    )
+
+@pytest.mark.asyncio
+async def test_geocode_address_db_hit():
+    """DBのキャッシュがある場合はAPIを呼び出さず、メモリにも保存すること"""
+    with patch.object(geocoding, "fetch_coordinates_from_gsi", AsyncMock()) as mock_fetch, \
+         patch.object(geocoding, "_load_from_db", AsyncMock(return_value=(100.0, (35.6, 139.7)))) as mock_load:
+        assert await geocode_address("銀座") == (35.6, 139.7)
+        assert await geocode_address("銀座") == (35.6, 139.7)
+
+    mock_fetch.assert_not_awaited()
+    mock_load.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_geocode_address_not_found_cached():
+    """住所が見つからない結果も短い有効期限でキャッシュすること"""
+    with patch.object(geocoding, "fetch_coordinates_from_gsi", AsyncMock(return_value=gsi_response([]))) as mock_fetch, \
+         patch.object(geocoding, "_load_from_db", AsyncMock(return_value=_MISSING)), \
+         patch.object(geocoding, "_save_to_db", AsyncMock()) as mock_save:
+        assert await geocode_address("存在しない住所") is None
+        assert await geocode_address("存在しない住所") is None
+
+    mock_fetch.assert_awaited_once()
+    mock_save.assert_awaited_once_with("存在しない住所", None, Geocoding.NOT_FOUND_TTL)
+
+@pytest.mark.asyncio
+async def test_geocode_address_db_error_ignored():
+    """キャッシュ用DBの障害時もAPIの結果を返すこと"""
+    data = [{"geometry": {"coordinates": [139.7, 35.6]}}]
+    with patch.object(geocoding, "fetch_coordinates_from_gsi", AsyncMock(return_value=gsi_response(data))), \
+         patch.object(geocoding, "_load_from_db", AsyncMock(side_effect=Exception("db down"))), \
+         patch.object(geocoding, "_save_to_db", AsyncMock(side_effect=Exception("db down"))):
+        assert await geocode_address("銀座") == (35.6, 139.7)
+
+@pytest.mark.asyncio
+async def test_geocode_address_coalesced():
+    """同じ住所の同時リクエストはAPI呼び出しを1回にまとめること"""
+    data = [{"geometry": {"coordinates": [139.7, 35.6]}}]
+    release = asyncio.Event()
+
+    async def slow_fetch(params):
+        await release.wait()
+        return gsi_response(data)
+
+    coalesced = geocoding_stats()["coalesced"]
+    with patch.object(geocoding, "fetch_coordinates_from_gsi", AsyncMock(side_effect=slow_fetch)) as mock_fetch, \
+         patch.object(geocoding, "_load_from_db", AsyncMock(return_value=_MISSING)), \
+         patch.object(geocoding, "_save_to_db", AsyncMock()):
+        tasks = [
+            asyncio.create_task(geocode_address(address))
+            for address in ["銀座６－１３－９", "銀座6-13-9", "銀座6‐13‐9"]
+        ]
+        await asyncio.sleep(0)
+        assert geocoding_stats()["inflight"] == 1
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+    assert results == [(35.6, 139.7)] * 3
+    mock_fetch.assert_awaited_once()
+    assert geocoding_stats()["coalesced"] == coalesced + 2
+    assert geocoding_stats()["inflight"] == 0
+
+@pytest.mark.asyncio
+async def test_geocode_address_coalesced_error():
+    """共有している取得処理の例外は全ての呼び出し元に伝わること"""
+    release = asyncio.Event()
+
+    async def failing_fetch(params):
+        await release.wait()
+        raise HTTPException(status_code=400, detail="国土地理院APIから応答がありません")
+
+    with patch.object(geocoding, "fetch_coordinates_from_gsi", AsyncMock(side_effect=failing_fetch)) as mock_fetch, \
+         patch.object(geocoding, "_load_from_db", AsyncMock(return_value=_MISSING)):
+        tasks = [asyncio.create_task(geocode_address("銀座")) for _ in range(2)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert all(isinstance(result, HTTPException) for result in results)
+    mock_fetch.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_geocode_address_caller_cancelled():
+    """呼び出し元がキャンセルされても他の呼び出し元は結果を受け取れること"""
+    data = [{"geometry": {"coordinates": [139.7, 35.6]}}]
+    release = asyncio.Event()
+
+    async def slow_fetch(params):
+        await release.wait()
+        return gsi_response(data)
+
+    with patch.object(geocoding, "fetch_coordinates_from_gsi", AsyncMock(side_effect=slow_fetch)), \
+         patch.object(geocoding, "_load_from_db", AsyncMock(return_value=_MISSING)), \
+         patch.object(geocoding, "_save_to_db", AsyncMock()):
+        first = asyncio.create_task(geocode_address("銀座"))
+        second = asyncio.create_task(geocode_address("銀座"))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        assert await second == (35.6, 139.7)
+        with pytest.raises(asyncio.CancelledError):
+            await first
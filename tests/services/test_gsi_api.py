@@ -5,9 +5,17 @@ from fastapi import HTTPException
 from httpx import HTTPStatusError, Request, RequestError, Response
 
 from app.config.constants import GSIAPI
+from app.services import gsi_api
 from app.services.gsi_api import fetch_coordinates_from_gsi
 
 
+@pytest.fixture(autouse=True)
+def reset_breaker():
+    gsi_api.breaker.reset()
+    yield
+    gsi_api.breaker.reset()
+
+
 @pytest.mark.asyncio
 async def test_fetch_coordinates_from_gsi_success():
     """国土地理院APIからの座標取得成功テスト"""
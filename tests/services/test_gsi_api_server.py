@@ -0,0 +1,115 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+
+from app.config.constants import GSIAPI
+from app.services import gsi_api
+from app.services.gsi_api import close_http_client, fetch_coordinates_from_gsi
+
+COORDINATES = [{"geometry": {"coordinates": [139.7, 35.6]}}]
+
+
+class StubGSIServer:
+    """国土地理院APIの代わりに応答するローカルHTTPサーバー"""
+
+    def __init__(self):
+        self.statuses = []
+        self.requests = 0
+        self.client_ports = set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            #keep-aliveを有効にするためHTTP/1.1で応答する
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                stub.requests += 1
+                stub.client_ports.add(self.client_address[1])
+                status = stub.statuses.pop(0) if stub.statuses else 200
+                body = json.dumps(COORDINATES if status == 200 else {}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/address-search/AddressSearch"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest_asyncio.fixture
+async def stub_server(monkeypatch):
+    server = StubGSIServer()
+    monkeypatch.setattr(GSIAPI, "ADDRESS_SEARCH", server.url)
+    #テストが遅くならないようバックオフは行わない
+    monkeypatch.setattr(gsi_api, "_backoff", lambda attempt: 0)
+    gsi_api.breaker.reset()
+    yield server
+    await close_http_client()
+    gsi_api.breaker.reset()
+    server.close()
+
+
+@pytest.mark.asyncio
+async def test_connection_reused(stub_server):
+    """keep-aliveにより同じ接続が再利用されること"""
+    for _ in range(3):
+        resp = await fetch_coordinates_from_gsi({"q": "Tokyo"})
+        assert resp.json() == COORDINATES
+
+    assert stub_server.requests == 3
+    assert len(stub_server.client_ports) == 1
+
+@pytest.mark.asyncio
+async def test_retry_transient_error(stub_server):
+    """5xx・429の場合はリトライして成功すること"""
+    stub_server.statuses = [503, 429]
+
+    resp = await fetch_coordinates_from_gsi({"q": "Tokyo"})
+
+    assert resp.json() == COORDINATES
+    assert stub_server.requests == 3
+    assert gsi_api.breaker.stats()["failures"] == 0
+
+@pytest.mark.asyncio
+async def test_no_retry_client_error(stub_server):
+    """4xxの場合はリトライせず、サーキットブレーカーの失敗にも数えないこと"""
+    stub_server.statuses = [404]
+
+    with pytest.raises(HTTPException) as exc:
+        await fetch_coordinates_from_gsi({"q": "Tokyo"})
+
+    assert exc.value.status_code == 400
+    assert stub_server.requests == 1
+    assert gsi_api.breaker.stats()["failures"] == 0
+
+@pytest.mark.asyncio
+async def test_circuit_opens(stub_server, monkeypatch):
+    """連続で失敗した場合はAPIを呼び出さずに503を返すこと"""
+    monkeypatch.setattr(GSIAPI, "MAX_RETRIES", 0)
+    stub_server.statuses = [500] * GSIAPI.FAILURE_THRESHOLD
+
+    for _ in range(GSIAPI.FAILURE_THRESHOLD):
+        with pytest.raises(HTTPException) as exc:
+            await fetch_coordinates_from_gsi({"q": "Tokyo"})
+        assert exc.value.status_code == 400
+
+    with pytest.raises(HTTPException) as exc:
+        await fetch_coordinates_from_gsi({"q": "Tokyo"})
+
+    assert exc.value.status_code == 503
+    assert exc.value.detail == "国土地理院APIが一時的に利用できません"
+    assert stub_server.requests == GSIAPI.FAILURE_THRESHOLD
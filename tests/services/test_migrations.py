@@ -0,0 +1,172 @@
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import text
+
+from app.services import migrations
+from app.services.migrations import (
+    EXPECTED_TRIGGERS,
+    MIGRATIONS,
+    expected_foreign_keys,
+    expected_indexes,
+    migrate,
+)
+from database import get_engine
+
+
+def mock_engine(applied):
+    """schema_migrationsに指定したバージョンが記録済みのエンジン"""
+    conn = MagicMock()
+    conn.exec_driver_sql = AsyncMock(
+        side_effect=lambda sql: [SimpleNamespace(version=v) for v in applied]
+        if sql.startswith("select version") else None
+    )
+    conn.execute = AsyncMock()
+    conn.run_sync = AsyncMock()
+    conn.commit = AsyncMock()
+    conn.rollback = AsyncMock()
+
+    engine = MagicMock()
+    engine.connect.return_value.__aenter__ = AsyncMock(return_value=conn)
+    engine.connect.return_value.__aexit__ = AsyncMock(return_value=False)
+    return engine, conn
+
+
+def test_versions_increasing():
+    """バージョンが重複せず昇順であること"""
+    versions = [m.version for m in MIGRATIONS]
+    assert versions == sorted(set(versions))
+
+
+def test_expected_indexes():
+    """検索・更新で使用する索引と一意制約が確認対象に含まれること"""
+    assert {
+        "ix_stores_tags",
+        "ix_stores_lat_lng",
+        "ix_stores_earth",
+        "ix_stores_store_name_trgm",
+        "ix_stores_tags_tag_id_store_id",
+        "uq_store_tag",
+        "tags_tag_name_key",
+        "stores_store_id_key",
+    } <= expected_indexes()
+
+
+def test_expected_foreign_keys():
+    """中間テーブルの外部キーが確認対象に含まれること"""
+    assert expected_foreign_keys() == {"stores_tags_store_id_fkey", "stores_tags_tag_id_fkey"}
+
+
+def test_expected_triggers_created():
+    """確認対象のトリガーが全てマイグレーションで作成されること"""
+    created = " ".join(
+        step for m in MIGRATIONS for step in m.steps if isinstance(step, str)
+    )
+    for name in EXPECTED_TRIGGERS:
+        assert f"create trigger {name} " in created
+
+
+@pytest.mark.asyncio
+async def test_migrate_pending_only(monkeypatch):
+    """適用済みのバージョンは実行せず、未適用のバージョンのみ記録すること"""
+    monkeypatch.setattr(migrations, "MIGRATIONS", [
+        migrations.Migration(1, "v1", ["select 1"]),
+        migrations.Migration(2, "v2", ["select 2", "select 3"]),
+    ])
+    engine, conn = mock_engine(applied=[1])
+
+    assert await migrate(engine) == [2]
+
+    executed = [call.args[0] for call in conn.exec_driver_sql.await_args_list]
+    assert "select 1" not in executed
+    assert executed.index("select 2") < executed.index("select 3")
+    assert executed[-1] == f"select pg_advisory_unlock({migrations.LOCK_ID})"
+    assert conn.execute.await_args.args[1] == {"version": 2, "description": "v2"}
+
+
+@pytest.mark.asyncio
+async def test_migrate_failure_rolls_back(monkeypatch):
+    """失敗したバージョンはロールバックし、ロックを解放すること"""
+    monkeypatch.setattr(migrations, "MIGRATIONS", [
+        migrations.Migration(1, "v1", ["select 1"]),
+    ])
+    engine, conn = mock_engine(applied=[])
+    conn.execute.side_effect = RuntimeError("失敗")
+
+    with pytest.raises(RuntimeError):
+        await migrate(engine)
+
+    conn.rollback.assert_awaited_once()
+    assert conn.exec_driver_sql.await_args.args[0] == f"select pg_advisory_unlock({migrations.LOCK_ID})"
+
+
+def test_merge_duplicate_tags_with_unique_links():
+    """
+    同名タグの統合(バージョン3)が、uq_store_tagのあるDBで紐付けの重複なく完了すること
+    (ロールバックするため既存のデータは変更しない)
+    """
+    merge = next(m for m in MIGRATIONS if m.version == 3)
+
+    with get_engine().connect() as conn:
+        try:
+            # 同名タグを作成するため一意制約を一時的に外す
+            conn.exec_driver_sql("alter table tags drop constraint if exists tags_tag_name_key")
+            store_ids = conn.execute(text(
+                "insert into stores (store_id, store_name, address, content, lat, lng)"
+                " select gen_random_uuid(), 'store' || i, '住所', '内容', 35, 139"
+                " from generate_series(1, 2) i returning id"
+            )).scalars().all()
+            store_ids.sort()
+            # 統合先(IDが最小)のタグと、同名のタグ2件
+            keep_id, dup_id, dup2_id = sorted(conn.execute(text(
+                "insert into tags (tag_id, tag_name)"
+                " select gen_random_uuid(), '統合タグ' from generate_series(1, 3)"
+                " returning id"
+            )).scalars().all())
+
+            link = text(
+                "insert into stores_tags (stores_tags_id, store_id, tag_id)"
+                " values (gen_random_uuid(), :store_id, :tag_id)"
+            )
+            # 店舗1: 重複タグへの紐付け(IDが小さい)の後に統合先への紐付け
+            conn.execute(link, {"store_id": store_ids[0], "tag_id": dup_id})
+            conn.execute(link, {"store_id": store_ids[0], "tag_id": keep_id})
+            # 店舗2: 重複タグへの紐付けのみ2件
+            conn.execute(link, {"store_id": store_ids[1], "tag_id": dup2_id})
+            conn.execute(link, {"store_id": store_ids[1], "tag_id": dup_id})
+
+            for step in merge.steps:
+                conn.exec_driver_sql(step)
+
+            links = conn.execute(text(
+                "select store_id, tag_id from stores_tags"
+                " where store_id = any(:store_ids) order by store_id"
+            ), {"store_ids": store_ids}).all()
+            assert [tuple(row) for row in links] == [
+                (store_ids[0], keep_id),
+                (store_ids[1], keep_id),
+            ]
+            tags = conn.execute(text(
+                "select id from tags where tag_name = '統合タグ'"
+            )).scalars().all()
+            assert tags == [keep_id]
+            assert conn.execute(text(
+                "select count(*) from pg_constraint where conname = 'tags_tag_name_key'"
+            )).scalar() == 1
+        finally:
+            conn.rollback()
+
+
+def test_create_sql_matches_migrations():
+    """db/create.sqlが全てのバージョンを記録し、確認対象の索引・外部キー・トリガーを全て作成すること"""
+    sql = (Path(__file__).parents[2] / "db" / "create.sql").read_text(encoding="utf-8")
+
+    for migration in MIGRATIONS:
+        assert f"({migration.version}, '{migration.description}')" in sql
+
+    for name in expected_indexes() | expected_foreign_keys():
+        assert f"add constraint {name}\n" in sql or f"create index {name}\n" in sql, name
+    for name in EXPECTED_TRIGGERS:
+        assert f"create trigger {name}\n" in sql, name
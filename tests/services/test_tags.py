@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.tags import cache_tag_ids, resolve_tag_ids, tag_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_tag_cache():
+    tag_cache.clear()
+    yield
+    tag_cache.clear()
+
+
+def mock_db(*results):
+    """executeの呼び出し毎に指定した行を返すセッション"""
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=[
+        MagicMock(all=MagicMock(return_value=[SimpleNamespace(id=id, tag_name=name) for name, id in rows.items()]))
+        for rows in results
+    ])
+    return db
+
+
+@pytest.mark.asyncio
+async def test_resolve_cached():
+    """キャッシュ済みのタグはDBにアクセスしないこと"""
+    cache_tag_ids({"タグ1": 1, "タグ2": 2})
+    db = mock_db()
+
+    assert await resolve_tag_ids(db, ["タグ1", "タグ2", "タグ1"]) == {"タグ1": 1, "タグ2": 2}
+    db.execute.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_resolve_missing():
+    """未キャッシュのタグのみ1回のSQLで追加・取得し、キャッシュはしないこと"""
+    cache_tag_ids({"タグ1": 1})
+    db = mock_db({"タグ2": 2, "タグ3": 3})
+
+    assert await resolve_tag_ids(db, ["タグ1", "タグ2", "タグ3"]) == {"タグ1": 1, "タグ2": 2, "タグ3": 3}
+    assert db.execute.await_count == 1
+    assert tag_cache.get("タグ2") is None
+
+@pytest.mark.asyncio
+async def test_resolve_raced():
+    """同時に追加されたタグは取得し直すこと"""
+    db = mock_db({"タグ1": 1}, {"タグ2": 2})
+
+    assert await resolve_tag_ids(db, ["タグ1", "タグ2"]) == {"タグ1": 1, "タグ2": 2}
+    assert db.execute.await_count == 2
@@ -0,0 +1,16 @@
+from app.utils.address import normalize_address
+
+
+def test_normalize_full_width():
+    assert normalize_address("東京都中央区銀座６－１３－９") == "東京都中央区銀座6-13-9"
+
+def test_normalize_hyphen_variants():
+    assert normalize_address("銀座6‐13―9") == "銀座6-13-9"
+    assert normalize_address("銀座6ー13ｰ9") == "銀座6-13-9"
+
+def test_normalize_keeps_long_vowel():
+    #数字に挟まれていない長音記号はそのまま
+    assert normalize_address("コーポ101") == "コーポ101"
+
+def test_normalize_whitespace():
+    assert normalize_address("　東京都  中央区　銀座 ") == "東京都 中央区 銀座"
@@ -0,0 +1,56 @@
+from unittest.mock import patch
+
+from app.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def test_open_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+    breaker.record_failure()
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.stats()["opened"] == 1
+    assert breaker.stats()["rejected"] == 1
+
+def test_success_resets_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == CLOSED
+
+def test_half_open_allows_single_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    with patch("app.utils.circuit_breaker.time.monotonic", return_value=100):
+        breaker.record_failure()
+    with patch("app.utils.circuit_breaker.time.monotonic", return_value=110):
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow()
+        #試行中は他の呼び出しを拒否する
+        assert not breaker.allow()
+
+        breaker.record_success()
+        assert breaker.state == CLOSED
+
+def test_half_open_failure_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    with patch("app.utils.circuit_breaker.time.monotonic", return_value=100):
+        breaker.record_failure()
+    with patch("app.utils.circuit_breaker.time.monotonic", return_value=110):
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+    assert breaker.stats()["opened"] == 2
+
+def test_release_ends_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    with patch("app.utils.circuit_breaker.time.monotonic", return_value=100):
+        breaker.record_failure()
+    with patch("app.utils.circuit_breaker.time.monotonic", return_value=110):
+        assert breaker.allow()
+        breaker.release()
+        assert breaker.allow()
@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.utils.conditional import (Validators, etag_matches, is_not_modified,
+                                   make_etag, not_modified_response,
+                                   validator_headers)
+
+LAST_MODIFIED = datetime(2025, 10, 1, 12, 30, 15, 500000, tzinfo=timezone.utc)
+VALIDATORS = Validators(make_etag("stores", 42), LAST_MODIFIED)
+
+
+def test_make_etag():
+    assert make_etag("stores", 42) == 'W/"stores-42"'
+
+@pytest.mark.parametrize(
+    "if_none_match,expected",
+    [
+        pytest.param('W/"stores-42"', True, id="一致"),
+        pytest.param('"stores-42"', True, id="強いETag(弱い比較)"),
+        pytest.param('W/"stores-41", W/"stores-42"', True, id="複数指定"),
+        pytest.param("*", True, id="ワイルドカード"),
+        pytest.param('W/"stores-41"', False, id="不一致"),
+    ]
+)
+def test_etag_matches(if_none_match,expected):
+    assert etag_matches(if_none_match, VALIDATORS.etag) is expected
+
+@pytest.mark.parametrize(
+    "headers,expected",
+    [
+        pytest.param({}, False, id="条件なし"),
+        pytest.param({"if-none-match": 'W/"stores-42"'}, True, id="ETag一致"),
+        pytest.param({"if-none-match": 'W/"stores-41"'}, False, id="ETag不一致"),
+        pytest.param({"if-modified-since": "Wed, 01 Oct 2025 12:30:15 GMT"}, True, id="秒未満は切り捨て"),
+        pytest.param({"if-modified-since": "Wed, 01 Oct 2025 12:30:14 GMT"}, False, id="更新あり"),
+        pytest.param({"if-modified-since": "invalid"}, False, id="日付不正"),
+        pytest.param(
+            {"if-none-match": 'W/"stores-41"', "if-modified-since": "Wed, 01 Oct 2025 12:30:15 GMT"},
+            False,
+            id="If-None-Match優先",
+        ),
+    ]
+)
+def test_is_not_modified(headers,expected):
+    assert is_not_modified(headers, VALIDATORS) is expected
+
+def test_validator_headers():
+    assert validator_headers(VALIDATORS) == {
+        "ETag": 'W/"stores-42"',
+        "Cache-Control": "no-cache",
+        "Last-Modified": "Wed, 01 Oct 2025 12:30:15 GMT",
+    }
+
+def test_not_modified_response():
+    response = not_modified_response(VALIDATORS)
+
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == 'W/"stores-42"'
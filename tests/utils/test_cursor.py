@@ -0,0 +1,40 @@
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.utils.cursor import MAX_CURSOR_ID, decode_cursor, encode_cursor
+
+FINGERPRINT = "0123456789abcdef"
+
+
+def forge_cursor(last_id) -> str:
+    payload = json.dumps({"id": last_id, "f": FINGERPRINT})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+@pytest.mark.parametrize("last_id", [1, 12345, MAX_CURSOR_ID])
+def test_round_trip(last_id):
+    assert decode_cursor(encode_cursor(last_id, FINGERPRINT), FINGERPRINT) == last_id
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        pytest.param("!!!", id="base64不正"),
+        pytest.param(forge_cursor("1"), id="文字列"),
+        pytest.param(forge_cursor(True), id="真偽値"),
+        pytest.param(forge_cursor(0), id="0"),
+        pytest.param(forge_cursor(-1), id="負数"),
+        pytest.param(forge_cursor(MAX_CURSOR_ID + 1), id="上限超過"),
+        pytest.param(forge_cursor(2**63), id="bigint範囲外"),
+        pytest.param(encode_cursor(1, "fedcba9876543210"), id="検索条件が異なる"),
+    ],
+)
+def test_invalid(cursor):
+    with pytest.raises(HTTPException) as e:
+        decode_cursor(cursor, FINGERPRINT)
+
+    assert e.value.status_code == 400
+    assert e.value.detail == "カーソルが不正です"
@@ -0,0 +1,47 @@
+import asyncpg.exceptions
+import pytest
+from sqlalchemy.exc import DBAPIError, IntegrityError, OperationalError
+
+from app.utils.db_exceptions import is_data_exception
+
+
+class AdaptedError(Exception):
+    """SQLAlchemyのasyncpgアダプタが変換した例外(sqlstateを持つ)"""
+
+    def __init__(self, sqlstate, cause=None):
+        super().__init__("error")
+        self.sqlstate = sqlstate
+        self.__cause__ = cause
+
+
+def dbapi_error(orig, cls=DBAPIError):
+    return cls(statement="select 1", params=None, orig=orig)
+
+
+@pytest.mark.parametrize(
+    "exc",
+    [
+        pytest.param(asyncpg.exceptions.InvalidTextRepresentationError("uuid"), id="COPYの型変換"),
+        pytest.param(dbapi_error(AdaptedError("22P02")), id="不正なUUID"),
+        pytest.param(dbapi_error(AdaptedError("22007")), id="不正な日時"),
+        pytest.param(
+            dbapi_error(AdaptedError(None, asyncpg.exceptions.NumericValueOutOfRangeError("x"))),
+            id="sqlstateなし",
+        ),
+    ],
+)
+def test_data_exception(exc):
+    assert is_data_exception(exc)
+
+
+@pytest.mark.parametrize(
+    "exc",
+    [
+        pytest.param(dbapi_error(AdaptedError("23505"), IntegrityError), id="一意制約違反"),
+        pytest.param(dbapi_error(AdaptedError("08006"), OperationalError), id="接続失敗"),
+        pytest.param(dbapi_error(Exception("x")), id="sqlstateなし"),
+        pytest.param(ValueError("x"), id="DB以外"),
+    ],
+)
+def test_not_data_exception(exc):
+    assert not is_data_exception(exc)
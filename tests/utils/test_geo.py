@@ -0,0 +1,48 @@
+import pytest
+from fastapi import HTTPException
+
+from app.utils.geo import (BoundingBox, lat_to_tile_y, lng_to_tile_x,
+                           parse_bbox, point_tiles, tile_bounds)
+
+
+@pytest.mark.parametrize(
+    "lat,lng,zoom,expected",
+    [
+        pytest.param(0, 0, 0, (0, 0), id="ズーム0"),
+        pytest.param(35.681236, 139.767125, 10, (909, 403), id="東京駅 ズーム10"),
+        pytest.param(35.681236, 139.767125, 16, (58211, 25806), id="東京駅 ズーム16"),
+        pytest.param(90, 180, 2, (3, 0), id="上限に丸める"),
+    ]
+)
+def test_point_to_tile(lat,lng,zoom,expected):
+    assert (lng_to_tile_x(lng, zoom), lat_to_tile_y(lat, zoom)) == expected
+
+def test_tile_bounds_contains_point():
+    x, y = lng_to_tile_x(139.767125, 12), lat_to_tile_y(35.681236, 12)
+    bbox = tile_bounds(x, y, x, y, 12)
+
+    assert bbox.min_lat <= 35.681236 <= bbox.max_lat
+    assert bbox.min_lng <= 139.767125 <= bbox.max_lng
+
+def test_point_tiles_on_boundary():
+    #経度0はタイル境界上のため隣接タイルも含まれる
+    assert point_tiles(10, 0, 1) == {(0, 0), (1, 0)}
+    assert point_tiles(10, 10, 1) == {(1, 0)}
+
+def test_parse_bbox():
+    assert parse_bbox("139.6,35.5,139.9,35.8") == BoundingBox(35.5, 35.8, 139.6, 139.9)
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        pytest.param("139.6,35.5,139.9", id="要素不足"),
+        pytest.param("a,b,c,d", id="数値以外"),
+        pytest.param("139.6,95,139.9,35.8", id="緯度範囲外"),
+        pytest.param("139.9,35.5,139.6,35.8", id="経度が逆転"),
+    ]
+)
+def test_parse_bbox_invalid(value):
+    with pytest.raises(HTTPException) as exc:
+        parse_bbox(value)
+
+    assert exc.value.status_code == 400
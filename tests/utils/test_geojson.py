@@ -0,0 +1,16 @@
+from app.utils.geojson import point_feature
+
+
+def test_point_feature():
+    assert point_feature(139.7, 35.6, {"name": "a"}, "1") == {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [139.7, 35.6]},
+        "properties": {"name": "a"},
+        "id": "1",
+    }
+
+def test_point_feature_without_coordinates():
+    feature = point_feature(None, None, {})
+
+    assert feature["geometry"] is None
+    assert "id" not in feature
@@ -0,0 +1,74 @@
+import uuid
+from collections import namedtuple
+
+import humps
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.routers.stores import STORE_FIELDS
+from app.schemas.stores import StoreResponse, StoresResponse
+from app.utils.json_response import dumps, rows_to_dicts
+
+Row = namedtuple("Row", ["id", *STORE_FIELDS])
+
+ROWS = [
+    Row(1, uuid.UUID("11111111-1111-1111-1111-111111111111"), "store1", "東京都中央区銀座6-13-9",
+        "改行\nタブ\t\"引用\" \\ \x1f", 35.689501, 139.691722, ["タグ1", "タグ2"]),
+    Row(2, uuid.uuid4(), "store2", "住所2", "内容2", 30.0, -120.5, []),
+    #ジオコーディング未完了
+    Row(3, uuid.uuid4(), "store3", "住所3", "内容3", None, None, ["😀"]),
+]
+
+
+async def legacy_body(model, content, exclude_none):
+    """レスポンスモデルを介した従来の出力(FastAPIのルーティングと同じ処理)"""
+    field = create_response_field(name="Response", type_=model)
+    value = await serialize_response(
+        field=field, response_content=content, exclude_none=exclude_none
+    )
+    return JSONResponse(value).body
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("next_cursor", [None, "eyJpZCI6IDN9"])
+async def test_stores_byte_compatible(next_cursor):
+    expected = await legacy_body(
+        StoresResponse,
+        {"stores": humps.camelize([row._asdict() for row in ROWS]), "nextCursor": next_cursor},
+        exclude_none=False,
+    )
+    # 最終ページではnextCursorを出力しない
+    expected = expected.replace(b',"nextCursor":null', b"")
+
+    response = {"stores": rows_to_dicts(ROWS, STORE_FIELDS)}
+    if next_cursor is not None:
+        response["nextCursor"] = next_cursor
+
+    assert dumps(response) == expected
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("row", ROWS)
+async def test_store_byte_compatible(row):
+    expected = await legacy_body(
+        StoreResponse, humps.camelize(row._asdict()), exclude_none=False
+    )
+
+    assert dumps(rows_to_dicts([row], STORE_FIELDS)[0]) == expected
+
+def test_rows_to_dicts_keys():
+    assert list(rows_to_dicts(ROWS[:1], STORE_FIELDS)[0]) == [
+        "storeId", "storeName", "address", "content", "lat", "lng", "tags"
+    ]
+
+
+def test_pending_store_same_format():
+    """ジオコーディング未完了の店舗は、一覧と店舗取得のどちらも緯度経度をnullで出力すること"""
+    pending = rows_to_dicts(ROWS[2:], STORE_FIELDS)[0]
+    assert pending["lat"] is None and pending["lng"] is None
+
+    listed = dumps({"stores": rows_to_dicts(ROWS[2:], STORE_FIELDS)})
+    detail = dumps(pending)
+    assert b'"lat":null,"lng":null' in detail
+    assert listed == b'{"stores":[' + detail + b"]}"
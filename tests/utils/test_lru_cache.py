@@ -0,0 +1,50 @@
+from unittest.mock import patch
+
+from app.utils.lru_cache import LRUCache
+
+
+def test_get_set():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("b", "default") == "default"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+def test_lru_eviction():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    #aを参照して最近使用したことにする
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.stats()["evictions"] == 1
+
+def test_ttl_expiration():
+    cache = LRUCache(maxsize=2, ttl=10)
+    with patch("app.utils.lru_cache.time.monotonic", return_value=100):
+        cache.set("a", 1)
+    with patch("app.utils.lru_cache.time.monotonic", return_value=109):
+        assert cache.get("a") == 1
+    with patch("app.utils.lru_cache.time.monotonic", return_value=110):
+        assert cache.get("a") is None
+
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 0
+
+def test_pop_clear():
+    cache = LRUCache(maxsize=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.pop("a")
+    cache.pop("unknown")
+
+    assert "a" not in cache
+    cache.clear()
+    assert len(cache) == 0
@@ -0,0 +1,91 @@
+from app.utils.mvt import PointFeature, encode_point_layer
+
+
+def read_varint(data, pos):
+    result, shift = 0, 0
+    while True:
+        b = data[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return result, pos
+        shift += 7
+
+def read_fields(data):
+    """protobufのメッセージを(フィールド番号, 値)のリストに分解する"""
+    fields, pos = [], 0
+    while pos < len(data):
+        key, pos = read_varint(data, pos)
+        field, wire_type = key >> 3, key & 0x7
+        if wire_type == 0:
+            value, pos = read_varint(data, pos)
+        else:
+            length, pos = read_varint(data, pos)
+            value, pos = data[pos:pos + length], pos + length
+        fields.append((field, value))
+    return fields
+
+def read_packed(data):
+    values, pos = [], 0
+    while pos < len(data):
+        value, pos = read_varint(data, pos)
+        values.append(value)
+    return values
+
+def unzigzag(value):
+    return (value >> 1) ^ -(value & 1)
+
+def decode(tile):
+    """テスト用の簡易デコーダ"""
+    (layer_field, layer), = read_fields(tile)
+    assert layer_field == 3
+
+    fields = read_fields(layer)
+    keys = [v.decode() for f, v in fields if f == 3]
+    values = [read_fields(v)[0][1].decode() for f, v in fields if f == 4]
+    features = []
+    for f, v in fields:
+        if f != 2:
+            continue
+        feature = dict(read_fields(v))
+        tags = read_packed(feature[2])
+        command, x, y = read_packed(feature[4])
+        assert command == 9
+        features.append({
+            "id": feature.get(1),
+            "type": feature[3],
+            "x": unzigzag(x),
+            "y": unzigzag(y),
+            "properties": {keys[k]: values[v] for k, v in zip(tags[::2], tags[1::2])},
+        })
+    layer_info = {f: v for f, v in fields if f in (1, 5, 15)}
+    return layer_info[1].decode(), layer_info[5], layer_info[15], features
+
+
+def test_encode_point_layer():
+    tile = encode_point_layer(
+        "stores",
+        [
+            PointFeature(100, 200, {"storeName": "店舗1", "tags": '["タグ1"]'}, id=1),
+            PointFeature(-5, 4100, {"storeName": "店舗2", "tags": '["タグ1"]'}, id=300),
+        ],
+    )
+
+    name, extent, version, features = decode(tile)
+
+    assert (name, extent, version) == ("stores", 4096, 2)
+    assert features == [
+        {"id": 1, "type": 1, "x": 100, "y": 200, "properties": {"storeName": "店舗1", "tags": '["タグ1"]'}},
+        {"id": 300, "type": 1, "x": -5, "y": 4100, "properties": {"storeName": "店舗2", "tags": '["タグ1"]'}},
+    ]
+
+def test_encode_without_id():
+    """地物IDを指定しない場合は出力しないこと"""
+    tile = encode_point_layer("stores", [PointFeature(1, 2, {"storeId": "a"})])
+
+    _, _, _, features = decode(tile)
+
+    assert features == [{"id": None, "type": 1, "x": 1, "y": 2, "properties": {"storeId": "a"}}]
+
+def test_encode_empty_layer():
+    assert encode_point_layer("stores", []) == b""